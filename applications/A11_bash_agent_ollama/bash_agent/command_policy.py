@@ -0,0 +1,141 @@
+"""Approval policy for shell commands proposed by the model.
+
+`is_read_only(command)` recognises commands that only inspect the system: every
+part of a pipeline or command list starts with an allowlisted program (and,
+for programs like kubectl or git, an allowlisted subcommand), and the command
+has no output redirection, command substitution, background jobs, variable
+assignments (`GIT_PAGER=... git log`, `${VAR:=value}`, `printf -v`) or flags
+that make a reading program write or run other programs (`find -delete`,
+`sort -uo`, `rg --pre`, ...). Anything the policy doesn't understand counts as not
+read-only and is asked for.
+
+`BASH_AGENT_AUTO_APPROVE` selects what runs without asking:
+- `read-only` (default): read-only commands
+- `none`: nothing, every command is part of the approval prompt
+"""
+
+import os
+import re
+import shlex
+from typing import List, Optional
+
+
+AUTO_APPROVE = os.environ.get("BASH_AGENT_AUTO_APPROVE", "read-only").lower()
+
+READ_ONLY_PROGRAMS = {
+    "ls", "pwd", "cat", "head", "tail", "grep", "egrep", "fgrep", "rg", "wc", "sort", "uniq", "cut",
+    "tr", "column", "echo", "printf", "date", "cal", "uptime", "whoami", "id", "uname", "printenv",
+    "which", "type", "file", "stat", "du", "df", "free", "ps", "pgrep", "lsof", "ss", "netstat",
+    "dig", "nslookup", "host", "tree", "realpath", "basename", "dirname", "md5sum", "sha256sum",
+    "diff", "jq", "yq", "find", "seq", "sleep", "true", "test", "[",
+}
+
+# Program -> read-only subcommands
+READ_ONLY_SUBCOMMANDS = {
+    "kubectl": {"get", "describe", "logs", "top", "explain", "api-resources", "api-versions",
+                "version", "cluster-info", "auth", "events"},
+    "helm": {"list", "ls", "status", "get", "history", "show", "search", "version"},
+    "git": {"status", "log", "diff", "show", "branch", "remote", "rev-parse", "blame", "ls-files", "describe"},
+    "docker": {"ps", "images", "logs", "inspect", "version", "info", "stats"},
+    "systemctl": {"status", "list-units", "list-unit-files", "is-active", "is-enabled", "show"},
+    "journalctl": None,  # Any arguments
+}
+
+# Flags that make an otherwise reading program change something
+WRITING_FLAGS = {
+    "find": ("-delete", "-exec", "-execdir", "-ok", "-okdir", "-fprint", "-fprintf", "-fls"),
+    "sort": ("-o", "--output", "--compress-program"),
+    "rg": ("--pre", "--pre-glob"),
+    "git": ("--output",),
+    "tree": ("-o",),
+    "date": ("-s", "--set"),
+    "yq": ("-i", "--inplace"),
+    "printf": ("-v",),  # Assigns a variable of the (persistent) shell, e.g. PATH
+    "ss": ("-K", "--kill"),
+    "file": ("-C", "--compile"),
+    "journalctl": ("--vacuum", "--rotate", "--flush", "--setup-keys"),
+}
+
+# Subcommands that only read without further arguments ("git branch x" creates a branch)
+BARE_SUBCOMMANDS = {("git", "branch"), ("git", "remote")}
+
+# Programs that write to their second file argument ("uniq in out")
+MAX_FILE_ARGUMENTS = {"uniq": 1}
+
+# Redirections that don't write anything, only accepted as whole words
+_ALLOWED_REDIRECTION = re.compile(r"(?<!\S)2>(?:&1|/dev/null)(?!\S)")
+# Shell syntax that can write files, run hidden commands or assign
+# variables (${VAR:=value})
+_UNSAFE_SYNTAX = re.compile(r"[<>`]|\$\(|\$\{[^}]*=|&(?!&)|\n")
+_SEPARATORS = re.compile(r"\|\||&&|[|;]")
+_ASSIGNMENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*=")
+
+
+def _segments(command: str) -> Optional[List[List[str]]]:
+    """Words of every simple command of a pipeline/list, None for syntax the policy doesn't handle."""
+    command = _ALLOWED_REDIRECTION.sub(" ", command)
+    if _UNSAFE_SYNTAX.search(command):
+        return None
+    segments = []
+    for part in _SEPARATORS.split(command):
+        try:
+            words = shlex.split(part)
+        except ValueError:
+            return None
+        # VAR=value in front of a command can make it run other programs
+        # (GIT_PAGER, PAGER, LD_PRELOAD, ...), so it isn't allowed at all
+        if not words or _ASSIGNMENT.match(words[0]):
+            return None
+        segments.append(words)
+    return segments
+
+
+def _has_flag(args: List[str], flag: str) -> bool:
+    """Whether the flag is given, also inside combined short flags ("-uo" contains "-o")."""
+    for arg in args:
+        if arg == "--":
+            return False
+        if arg.startswith(flag):
+            return True
+        cluster = re.match(r"^-([A-Za-z0-9]+)", arg)
+        if len(flag) == 2 and flag[1] != "-" and cluster and flag[1] in cluster.group(1):
+            return True
+    return False
+
+
+def _read_only_segment(words: List[str]) -> bool:
+    program = os.path.basename(words[0])
+    args = words[1:]
+    if any(_has_flag(args, flag) for flag in WRITING_FLAGS.get(program, ())):
+        return False
+    if program in MAX_FILE_ARGUMENTS:
+        if len([arg for arg in args if not arg.startswith("-")]) > MAX_FILE_ARGUMENTS[program]:
+            return False
+    if program in READ_ONLY_PROGRAMS:
+        return True
+    if program not in READ_ONLY_SUBCOMMANDS:
+        return False
+    subcommands = READ_ONLY_SUBCOMMANDS[program]
+    if subcommands is None:
+        return True
+    positional = [arg for arg in args if not arg.startswith("-")]
+    if not positional or positional[0] not in subcommands:
+        return False
+    if program == "kubectl" and positional[0] == "auth":
+        return positional[1:2] == ["can-i"]
+    if (program, positional[0]) in BARE_SUBCOMMANDS:
+        return len(positional) == 1
+    return True
+
+
+def is_read_only(command: str) -> bool:
+    """Whether the command only reads (see the module docstring)."""
+    segments = _segments(command)
+    return segments is not None and all(_read_only_segment(words) for words in segments)
+
+
+def auto_approved(command: str, policy: str = AUTO_APPROVE) -> bool:
+    """Whether the command runs without asking under the policy."""
+    if policy == "read-only":
+        return is_read_only(command)
+    return False
@@ -1,12 +1,31 @@
-from langchain_ollama import ChatOllama
+from ai_common.llm_cache import LLMResponseCache, tool_result_ttl
+from ai_common.ollama_chat import SharedChatOllama
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessageChunk, BaseMessage, ToolMessage, convert_to_messages, message_chunk_to_message
+from langchain_core.outputs import ChatGeneration
 from langchain_core.tools import tool
-import subprocess
+from typing import List
 import inquirer
+import os
+import sys
+import uuid
+
+from ai_common.output_capture import read_spooled
+from command_policy import auto_approved, is_read_only
+from shell_session import ShellPool
+
+# Commands of one conversation share a long-lived shell (cwd and variables carry over)
+shell_pool = ShellPool(workdir=os.environ.get("BASH_AGENT_WORKDIR"))
+conversation_id = uuid.uuid4().hex
+COMMAND_TIMEOUT = 30
 
 @tool
 def shell_command(command: str) -> str:
     """Execute a shell command and return the output.
 
+    Commands run in a shell session that is kept for the conversation, so the
+    working directory and exported variables carry over to the next command.
+
     Args:
         command: The shell command to execute
 
@@ -14,94 +33,216 @@ def shell_command(command: str) -> str:
         The output of the command
     """
     try:
-        questions = [
-            inquirer.List('action',
-                         message=f"Do you want to execute this command: {command}",
-                         choices=['Yes', 'No', 'View command details'],
-                         ),
-        ]
-        answers = inquirer.prompt(questions)
-        
-        if answers['action'] == 'No':
-            return "Command execution cancelled by user."
-        elif answers['action'] == 'View command details':
-            print(f"\nCommand: {command}")
-            print("This command will be executed in a shell with 30 second timeout.")
-            # Ask again after showing details
-            confirm = inquirer.List('confirm',
-                                   message="Proceed with execution?",
-                                   choices=['Yes', 'No'])
-            if inquirer.prompt([confirm])['confirm'] == 'No':
-                return "Command execution cancelled by user."
-
-        result = subprocess.run(
+        # Stream the output to the terminal while the command runs
+        result = shell_pool.run(
             command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=30
+            conversation_id=conversation_id,
+            timeout=COMMAND_TIMEOUT,
+            on_output=lambda chunk: print(chunk, end="", flush=True)
         )
-        return result.stdout if result.stdout else result.stderr
+        print()
+        return result.to_text()
     except Exception as e:
         return f"Error executing command: {str(e)}"
 
 shell_tool = shell_command
 
 
+@tool
+def read_output(output_id: str, offset: int = 0) -> str:
+    """Read more of a long command output that was shortened.
+
+    Long outputs are returned as head and tail with a marker like
+    "... [N bytes omitted ..., read them with read_output(output_id="ab12cd34", offset=6000)] ...".
+    Use this to read the omitted part, page by page.
+
+    Args:
+        output_id: The id from the marker
+        offset: Byte offset to start reading at (from the marker or the previous page)
+
+    Returns:
+        The part of the output and the offset of the next page
+    """
+    return read_spooled(output_id, offset)
+
+
+
+# Shell output is live data: answers built from it expire quickly
+response_cache = LLMResponseCache(ttl_policy=tool_result_ttl(ttl=600, live_ttl=30))
 
-model = ChatOllama(
+model = SharedChatOllama(
     model="llama3.1:8b",
     temperature=0,
+    cache=response_cache,
     # other params...
 )
 
-tools = [shell_tool]
+tools = [shell_tool, read_output]
 tools_by_name = {tool.name: tool for tool in tools}
 
 # Bind tools with strict mode if available
 model_with_tools = model.bind_tools(tools)
 
 
-messages = [
-    (
-        "system",
-        "You are a helpful assistant with access to shell commands. Help the user with their tasks.",
-    ),
-    ("human", "List pods on the default namespace"),
-]
-
-# Invoke the model with tools
-ai_msg = model_with_tools.invoke(messages)
-
-print("AI Response:", ai_msg.content)
-print("\nTool Calls:", ai_msg.tool_calls if hasattr(ai_msg, 'tool_calls') else "None")
-
-# If there are tool calls, execute them and get final response
-if hasattr(ai_msg, 'tool_calls') and ai_msg.tool_calls:
-    # Add the AI message to the conversation
-    messages.append(ai_msg)
-
-    for tool_call in ai_msg.tool_calls:
-        tool_name = tool_call.get('name')
-        tool_args = tool_call.get('args', {})
-
-        if tool_name in tools_by_name:
-            print(f"\nExecuting tool: {tool_name}")
-            print(f"Arguments: {tool_args}")
-            result = tools_by_name[tool_name].invoke(tool_args)
-            print(f"Result: {result}")
-
-            # Add tool result to messages
-            messages.append({
-                "role": "tool",
-                "content": result,
-                "tool_call_id": tool_call.get('id'),
-                "name": tool_name
-            })
-
-    # Get final response from model with tool results
-    print("\n" + "="*50)
-    print("Getting final response from model...")
-    print("="*50)
-    final_response = model_with_tools.invoke(messages)
-    print("\nFinal AI Response:", final_response.content)
\ No newline at end of file
+MAX_STEPS = 15  # Model turns per task
+
+SYSTEM_PROMPT = (
+    "You are a helpful assistant with access to shell commands. Help the user with their tasks. "
+    "Work step by step: run commands, look at their output and continue until the task is done. "
+    "Commands you request in the same turn may run at the same time, so only request several "
+    "commands at once when they don't depend on each other. Long outputs are shortened to their "
+    "beginning and end, use read_output to read the omitted part when you need it."
+)
+
+
+def _cache_key(messages: list) -> tuple:
+    """(prompt, llm_string) as ChatModel.invoke builds them for its cache."""
+    normalized = [
+        message.model_copy(update={"id": None}) if message.id is not None else message
+        for message in convert_to_messages(messages)
+    ]
+    return dumps(normalized), model._get_llm_string(stop=None, **model_with_tools.kwargs)
+
+
+def stream_response(messages: list) -> BaseMessage:
+    """One model turn, printing the answer token by token."""
+    # .stream() bypasses the model's cache, so look it up and fill it here
+    prompt, llm_string = _cache_key(messages)
+    cached = response_cache.lookup(prompt, llm_string)
+    if cached:
+        message = cached[0].message
+        print(message.content)
+        return message
+
+    response = None
+    for chunk in model_with_tools.stream(messages):
+        if chunk.content:
+            print(chunk.content, end="", flush=True)
+        response = chunk if response is None else response + chunk
+    print()
+    if response is None:
+        return AIMessageChunk(content="")
+    message = message_chunk_to_message(response)
+    response_cache.update(prompt, llm_string, [ChatGeneration(message=message)])
+    return message
+
+
+def approve(commands: List[str]) -> List[bool]:
+    """Ask once for the commands of a turn; commands the policy allows run without asking."""
+    approved = [auto_approved(command) for command in commands]
+    print(f"\nPlan ({len(commands)} command{'s' if len(commands) > 1 else ''}):")
+    for number, (command, auto) in enumerate(zip(commands, approved), start=1):
+        print(f"  {number}. {command}" + ("  [auto-approved, read-only]" if auto else ""))
+
+    pending = [index for index, auto in enumerate(approved) if not auto]
+    if not pending:
+        return approved
+    if len(pending) == 1:
+        question = inquirer.List('action',
+                                 message=f"Do you want to execute this command: {commands[pending[0]]}",
+                                 choices=['Yes', 'No'])
+        selected = pending if inquirer.prompt([question])['action'] == 'Yes' else []
+    else:
+        question = inquirer.List('action',
+                                 message=f"Execute the {len(pending)} commands that need approval?",
+                                 choices=['Run all', 'Choose commands', 'Run none'])
+        action = inquirer.prompt([question])['action']
+        if action == 'Run all':
+            selected = pending
+        elif action == 'Choose commands':
+            choices = [(commands[index], index) for index in pending]
+            checkbox = inquirer.Checkbox('selected', message="Commands to execute", choices=choices)
+            selected = inquirer.prompt([checkbox])['selected']
+        else:
+            selected = []
+    for index in selected:
+        approved[index] = True
+    return approved
+
+
+def execute(commands: List[str]) -> List[str]:
+    """
+    Run approved commands in order. Consecutive read-only commands are
+    independent of each other and run at the same time, other commands run
+    one by one in the conversation's shell.
+    """
+    results: List[str] = [""] * len(commands)
+    index = 0
+    while index < len(commands):
+        group = [index]
+        while group[-1] + 1 < len(commands) and is_read_only(commands[group[0]]) \
+                and is_read_only(commands[group[-1] + 1]):
+            group.append(group[-1] + 1)
+
+        if len(group) == 1:
+            print(f"\n$ {commands[index]}")
+            results[index] = shell_command.invoke({"command": commands[index]})
+        else:
+            print(f"\nRunning {len(group)} read-only commands in parallel...")
+            try:
+                outputs = [result.to_text() for result in shell_pool.run_parallel(
+                    [commands[i] for i in group], conversation_id=conversation_id, timeout=COMMAND_TIMEOUT)]
+            except Exception as e:
+                outputs = [f"Error executing command: {str(e)}"] * len(group)
+            for i, output in zip(group, outputs):
+                print(f"\n$ {commands[i]}\n{output}")
+                results[i] = output
+        index = group[-1] + 1
+    return results
+
+
+def run_task(messages: list) -> None:
+    """Agent loop: model turn, approval, execution, until the model answers without tool calls."""
+    for step in range(MAX_STEPS):
+        print("\nAI: ", end="", flush=True)
+        ai_msg = stream_response(messages)
+        messages.append(ai_msg)
+        if not ai_msg.tool_calls:
+            return
+
+        tool_calls = ai_msg.tool_calls
+        commands = [str(call.get('args', {}).get('command', '')) for call in tool_calls]
+        runnable = [call.get('name') == shell_tool.name and bool(command) for call, command in zip(tool_calls, commands)]
+        approved = approve([command for command, ok in zip(commands, runnable) if ok]) if any(runnable) else []
+
+        approved_iter = iter(approved)
+        to_run = []
+        outputs = {}
+        for index, (call, ok) in enumerate(zip(tool_calls, runnable)):
+            if not ok and call.get('name') in tools_by_name and call.get('name') != shell_tool.name:
+                # Other tools only read what the agent already has
+                try:
+                    outputs[index] = tools_by_name[call.get('name')].invoke(call.get('args', {}))
+                except Exception as e:
+                    outputs[index] = f"Error: {str(e)}"
+            elif not ok:
+                outputs[index] = f"Error: unknown tool call {call.get('name')} with arguments {call.get('args')}"
+            elif next(approved_iter):
+                to_run.append(index)
+            else:
+                outputs[index] = "Command execution cancelled by user."
+        outputs.update(zip(to_run, execute([commands[index] for index in to_run])))
+
+        for index, call in enumerate(tool_calls):
+            messages.append(ToolMessage(content=outputs[index], tool_call_id=call.get('id'), name=call.get('name')))
+
+    print(f"\nStopped after {MAX_STEPS} steps.")
+
+
+def main() -> None:
+    task = " ".join(sys.argv[1:]) or "List pods on the default namespace"
+    messages = [("system", SYSTEM_PROMPT)]
+    try:
+        while task:
+            messages.append(("human", task))
+            run_task(messages)
+            task = input("\nNext task (empty to quit): ").strip()
+    except (KeyboardInterrupt, EOFError):
+        print()
+    finally:
+        shell_pool.release(conversation_id)
+        print("\nLLM cache:", response_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
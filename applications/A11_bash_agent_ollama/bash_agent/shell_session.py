@@ -0,0 +1,466 @@
+"""Long-lived shell sessions for the shell_command tool.
+
+Every command used to run in a fresh `subprocess.run(shell=True)`, so `cd`,
+exported variables and activated environments were lost between the steps of
+a task, and every step paid a shell start. A `ShellSession` is one bash
+process on a pseudo-terminal that runs the commands of a conversation one
+after another:
+
+- framing: each command is sent base64 encoded to `eval`, followed by a
+  `printf` of a sentinel line with a per-command id and the exit code. Output
+  is read until that sentinel, so commands with syntax errors, missing final
+  newlines or their own prompts can't confuse the framing.
+- timeout: the foreground job gets Ctrl-C (the shell has job control, so only
+  the job is interrupted). If the shell doesn't answer a new sentinel either,
+  it is killed and the next command starts in a new session.
+- streaming and byte cap: output chunks go to `on_output` as they arrive and
+  into an `OutputCapture` (ai_common.output_capture), which keeps head and
+  tail within `max_output_bytes` and spools larger outputs to a file the
+  model can page through with the read_output tool.
+- sandbox: own session/process group, working directory `workdir`, an
+  environment restricted to `ENV_ALLOWLIST`, no core dumps and a file size
+  limit.
+
+`ShellPool` keeps warm sessions and gives each conversation its own.
+`run_parallel` runs independent commands of a conversation at the same time:
+the first in the conversation's session, the others in helper sessions that
+get its working directory and exported variables first.
+"""
+
+import atexit
+import base64
+import codecs
+import fcntl
+import os
+import pty
+import re
+import resource
+import secrets
+import select
+import signal
+import subprocess
+import termios
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_common.output_capture import DEFAULT_MAX_BYTES, CapturedOutput, OutputCapture
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+DEFAULT_TIMEOUT = 30.0
+MAX_FILE_BYTES = 1024 * 1024 * 1024  # RLIMIT_FSIZE of the shell and its commands
+INTERRUPT_GRACE = 3.0  # Seconds the shell gets to come back after Ctrl-C
+READ_CHUNK = 65536
+SNAPSHOT_MAX_BYTES = 1024 * 1024
+MAX_PARALLEL = 4  # Sessions per conversation running commands at the same time
+
+# Variables passed from the agent's environment to the shells
+ENV_ALLOWLIST = (
+    "PATH", "HOME", "USER", "LOGNAME", "LANG", "LC_ALL", "LC_CTYPE", "TZ", "TMPDIR",
+    "KUBECONFIG", "http_proxy", "https_proxy", "no_proxy", "HTTP_PROXY", "HTTPS_PROXY", "NO_PROXY",
+)
+
+
+class CommandResult(NamedTuple):
+    captured: CapturedOutput
+    exit_code: Optional[int]  # None after a timeout or when the shell died
+    timed_out: bool
+    duration: float
+
+    @property
+    def output(self) -> str:
+        """The output, elided to head and tail if it was too long."""
+        return self.captured.to_text()
+
+    def to_text(self) -> str:
+        """Result as tool output for the LLM."""
+        text = self.output
+        notes = []
+        if self.timed_out:
+            notes.append(f"timed out after {self.duration:.0f}s and was interrupted")
+        elif self.exit_code is None:
+            notes.append("the shell exited, the next command starts a new shell (cwd and variables are reset)")
+        elif self.exit_code != 0:
+            notes.append(f"exit code {self.exit_code}")
+        if notes:
+            text += ("\n" if text and not text.endswith("\n") else "") + f"[{'; '.join(notes)}]"
+        return text or "[no output]"
+
+
+class ShellError(Exception):
+    """The shell session can't run commands (it died or didn't start)."""
+
+
+def sandbox_env(extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Environment of a shell: the allowlisted variables plus a quiet, non-paging terminal setup."""
+    env = {name: os.environ[name] for name in ENV_ALLOWLIST if name in os.environ}
+    env.update({
+        "TERM": "dumb",
+        "PAGER": "cat",
+        "GIT_PAGER": "cat",
+        "PS1": "",
+        "PS2": "",
+        "PROMPT_COMMAND": "",
+        "HISTFILE": "/dev/null",
+    })
+    env.update(extra or {})
+    return env
+
+
+def _limit_resources() -> None:
+    """preexec_fn: make the pty the controlling terminal (for job control) and set limits."""
+    fcntl.ioctl(0, termios.TIOCSCTTY, 0)
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (MAX_FILE_BYTES, MAX_FILE_BYTES))
+
+
+class ShellSession:
+    """One bash process on a pty, running one command at a time."""
+
+    def __init__(
+        self,
+        workdir: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        max_output_bytes: int = DEFAULT_MAX_BYTES,
+        shell: str = "/bin/bash"
+    ):
+        """
+        Start the shell.
+
+        Args:
+            workdir: Initial working directory (default: the current one)
+            env: Extra environment variables
+            max_output_bytes: Output kept per command for the model (head and tail)
+            shell: Bash executable
+        """
+        self.workdir = workdir or os.getcwd()
+        self.max_output_bytes = max_output_bytes
+        self._token = secrets.token_hex(8)
+        self._counter = 0
+        self._lock = threading.Lock()
+        self.commands = 0
+
+        master, slave = pty.openpty()
+        attributes = termios.tcgetattr(slave)
+        # No echo of the commands, no \r\n translation of the output
+        attributes[3] &= ~termios.ECHO
+        attributes[1] &= ~termios.ONLCR
+        termios.tcsetattr(slave, termios.TCSANOW, attributes)
+        try:
+            self.process = subprocess.Popen(
+                [shell, "--noprofile", "--norc", "--noediting", "-i"],
+                stdin=slave,
+                stdout=slave,
+                stderr=slave,
+                cwd=self.workdir,
+                env=sandbox_env(env),
+                start_new_session=True,
+                preexec_fn=_limit_resources,
+                close_fds=True
+            )
+        except Exception:
+            os.close(master)
+            raise
+        finally:
+            os.close(slave)
+        self._master = master
+
+        # Wait until the shell reads commands, dropping its startup messages
+        _, exit_code, _ = self._run_framed(":", DEFAULT_TIMEOUT, None)
+        if exit_code is None:
+            self.close()
+            raise ShellError(f"Shell {shell} did not start")
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _next_sentinel(self) -> bytes:
+        self._counter += 1
+        return f"__SHELL_DONE_{self._token}_{self._counter}__".encode()
+
+    def _send(self, data: bytes) -> None:
+        while data:
+            written = os.write(self._master, data)
+            data = data[written:]
+
+    def _frame(self, command: str, sentinel: bytes) -> bytes:
+        encoded = base64.b64encode(command.encode("utf-8")).decode("ascii")
+        # eval: a syntax error in the command fails the command, not the framing.
+        # One line: bash has read the sentinel before the command runs. stdin is
+        # /dev/null, a command waiting for input would only wait for the timeout
+        return (f"eval \"$(printf '%s' {encoded} | base64 -d)\" < /dev/null; "
+                f"printf '\\n%s:%d\\n' '{sentinel.decode()}' \"$?\"\n").encode()
+
+    def _read_until(
+        self,
+        sentinel: bytes,
+        deadline: float,
+        on_output: Optional[Callable[[str], None]],
+        capture: Optional[OutputCapture] = None
+    ):
+        """
+        Read output until the sentinel line.
+
+        Returns:
+            (captured output, exit code or None if the deadline passed, eof)
+        """
+        marker = b"\n" + sentinel + b":"
+        pattern = re.compile(re.escape(marker) + rb"(\d+)\n")
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        if capture is None:
+            capture = OutputCapture(max_bytes=self.max_output_bytes)
+        pending = b""
+
+        def emit(data: bytes) -> None:
+            if not data:
+                return
+            capture.write(data)
+            if on_output is not None:
+                on_output(decoder.decode(data))
+
+        while True:
+            match = pattern.search(pending)
+            if match:
+                emit(pending[:match.start()])
+                return capture.close(), int(match.group(1)), False
+            # The sentinel line can be split over reads: hold back a possible start of it
+            start = pending.rfind(b"\n")
+            if start == -1 or not (marker.startswith(pending[start:]) or pending[start:].startswith(marker)):
+                start = len(pending)
+            emit(pending[:start])
+            pending = pending[start:]
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                emit(pending)
+                return capture.close(), None, False
+            ready, _, _ = select.select([self._master], [], [], remaining)
+            if not ready:
+                continue
+            try:
+                chunk = os.read(self._master, READ_CHUNK)
+            except OSError:
+                chunk = b""
+            if not chunk:
+                # EIO: the shell exited
+                emit(pending)
+                return capture.close(), None, True
+            pending += chunk
+
+    def _run_framed(
+        self,
+        command: str,
+        timeout: float,
+        on_output: Optional[Callable[[str], None]],
+        capture: Optional[OutputCapture] = None
+    ):
+        sentinel = self._next_sentinel()
+        self._send(self._frame(command, sentinel))
+        return self._read_until(sentinel, time.monotonic() + timeout, on_output, capture)
+
+    def run(
+        self,
+        command: str,
+        timeout: float = DEFAULT_TIMEOUT,
+        on_output: Optional[Callable[[str], None]] = None,
+        capture: Optional[OutputCapture] = None
+    ) -> CommandResult:
+        """
+        Run a command in the session (cwd and variables carry over to the next command).
+
+        Args:
+            command: Shell command line, may span several lines
+            timeout: Seconds until the command is interrupted
+            on_output: Called with every decoded output chunk as it arrives
+            capture: Where the output goes (default: max_output_bytes, spooled)
+
+        Raises:
+            ShellError: If the shell is not running
+        """
+        with self._lock:
+            if not self.alive:
+                raise ShellError("Shell session has exited")
+            started = time.monotonic()
+            self.commands += 1
+            try:
+                captured, exit_code, eof = self._run_framed(command, timeout, on_output, capture)
+            except OSError as e:
+                raise ShellError(f"Shell session failed: {e}")
+            timed_out = exit_code is None and not eof
+            if timed_out:
+                self._interrupt()
+            elif eof:
+                self.close()
+            return CommandResult(
+                captured=captured,
+                exit_code=exit_code,
+                timed_out=timed_out,
+                duration=time.monotonic() - started
+            )
+
+    def snapshot(self) -> str:
+        """Script that recreates the working directory and exported variables of this session."""
+        # The whole script is needed, not head and tail
+        capture = OutputCapture(max_bytes=SNAPSHOT_MAX_BYTES, spool=False)
+        result = self.run("printf 'cd %q\\n' \"$PWD\"; export -p", capture=capture)
+        if result.exit_code != 0 or not result.captured.complete:
+            raise ShellError(f"Could not read the session state: {result.output}")
+        return result.output
+
+    def _interrupt(self) -> None:
+        """Ctrl-C the foreground job and resync; kill the shell if it doesn't come back."""
+        try:
+            self._send(b"\x03")
+            _, exit_code, _ = self._run_framed(":", INTERRUPT_GRACE, None)
+        except OSError:
+            exit_code = None
+        if exit_code is None:
+            self.close()
+
+    def close(self) -> None:
+        """Kill the shell and everything it started."""
+        if self.alive:
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        self.process.wait()
+        try:
+            os.close(self._master)
+        except OSError:
+            pass
+
+
+class ShellPool:
+    """Warm shell sessions, one per conversation (plus helpers for parallel commands)."""
+
+    def __init__(
+        self,
+        warm: int = 1,
+        workdir: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+        max_output_bytes: int = DEFAULT_MAX_BYTES,
+        max_parallel: int = MAX_PARALLEL
+    ):
+        """
+        Args:
+            warm: Idle sessions kept started for new conversations
+            workdir: Initial working directory of the sessions
+            env: Extra environment variables of the sessions
+            max_output_bytes: Output kept per command
+            max_parallel: Commands of one conversation run_parallel runs at the same time
+        """
+        self.warm = warm
+        self.workdir = workdir
+        self.env = env
+        self.max_output_bytes = max_output_bytes
+        self.max_parallel = max_parallel
+        self._lock = threading.Lock()
+        self._idle: List[ShellSession] = []
+        # (conversation id, slot) -> session, slot 0 is the conversation's own shell
+        self._sessions: Dict[Tuple[str, int], ShellSession] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="shell-pool")
+        self._closed = False
+        atexit.register(self.close)
+
+    def _new_session(self) -> ShellSession:
+        return ShellSession(workdir=self.workdir, env=self.env, max_output_bytes=self.max_output_bytes)
+
+    def _replenish(self) -> None:
+        """Start idle sessions up to `warm` in the background."""
+        def fill():
+            while True:
+                with self._lock:
+                    if self._closed or len(self._idle) >= self.warm:
+                        return
+                session = self._new_session()
+                with self._lock:
+                    if self._closed:
+                        session.close()
+                        return
+                    self._idle.append(session)
+
+        threading.Thread(target=fill, name="shell-pool-warmup", daemon=True).start()
+
+    def session(self, conversation_id: str = "default", slot: int = 0) -> ShellSession:
+        """The conversation's session, started (or taken from the warm ones) on first use or after it died."""
+        key = (conversation_id, slot)
+        with self._lock:
+            if self._closed:
+                raise ShellError("Shell pool is closed")
+            session = self._sessions.get(key)
+            if session is not None and session.alive:
+                return session
+            session = None
+            while self._idle and session is None:
+                candidate = self._idle.pop()
+                if candidate.alive:
+                    session = candidate
+        if session is None:
+            session = self._new_session()
+        with self._lock:
+            self._sessions[key] = session
+        self._replenish()
+        return session
+
+    def run(
+        self,
+        command: str,
+        conversation_id: str = "default",
+        timeout: float = DEFAULT_TIMEOUT,
+        on_output: Optional[Callable[[str], None]] = None
+    ) -> CommandResult:
+        """Run a command in the conversation's session."""
+        return self.session(conversation_id).run(command, timeout=timeout, on_output=on_output)
+
+    def run_parallel(
+        self,
+        commands: List[str],
+        conversation_id: str = "default",
+        timeout: float = DEFAULT_TIMEOUT
+    ) -> List[CommandResult]:
+        """
+        Run independent commands at the same time, at most max_parallel at once.
+
+        The first command of every group runs in the conversation's session,
+        the others in helper sessions with the same working directory and
+        exported variables. Changes the helpers make to their shell state are
+        not carried back, so only use this for commands that don't change it.
+
+        Returns:
+            The results in the order of the commands
+        """
+        results: List[CommandResult] = []
+        for start in range(0, len(commands), self.max_parallel):
+            group = commands[start:start + self.max_parallel]
+            state = self.session(conversation_id).snapshot() if len(group) > 1 else ""
+
+            def run_in_slot(slot: int, command: str) -> CommandResult:
+                session = self.session(conversation_id, slot)
+                if slot:
+                    session.run(state)
+                return session.run(command, timeout=timeout)
+
+            futures = [self._executor.submit(run_in_slot, slot, command) for slot, command in enumerate(group)]
+            results.extend(future.result() for future in futures)
+        return results
+
+    def release(self, conversation_id: str) -> None:
+        """End a conversation: its shells are closed (state is never passed to another conversation)."""
+        with self._lock:
+            keys = [key for key in self._sessions if key[0] == conversation_id]
+            sessions = [self._sessions.pop(key) for key in keys]
+        for session in sessions:
+            session.close()
+
+    def close(self) -> None:
+        """Close all sessions."""
+        with self._lock:
+            self._closed = True
+            sessions = list(self._sessions.values()) + self._idle
+            self._sessions, self._idle = {}, []
+        for session in sessions:
+            session.close()
+        self._executor.shutdown(wait=False)
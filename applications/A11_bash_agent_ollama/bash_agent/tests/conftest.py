@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The agent runs as a script (`uv run main.py`), its modules are imported by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
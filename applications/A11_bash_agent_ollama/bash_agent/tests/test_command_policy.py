@@ -0,0 +1,67 @@
+import pytest
+
+from command_policy import auto_approved, is_read_only
+
+
+@pytest.mark.parametrize("command", [
+    "ls -la",
+    "kubectl get pods -A | grep -v Running",
+    "git log --oneline -n 5",
+    "git diff HEAD~1 2>&1",
+    "sort -u names.txt",
+    "sort -k2 -t, data.csv",
+    "uniq -c counts.txt",
+    "rg -n TODO src",
+    "find . -name '*.py'",
+    "ls /missing 2>/dev/null | wc -l",
+    "echo ${HOME:-/root}",
+    "printf '%s\\n' a b",
+])
+def test_read_only(command):
+    assert is_read_only(command)
+
+
+@pytest.mark.parametrize("command", [
+    # Environment assignments can make the program run other programs
+    "GIT_PAGER='touch /tmp/pwned' git log",
+    "PAGER='sh -c id' git log",
+    "LD_PRELOAD=/tmp/x.so ls",
+    # Flags that run programs or write files
+    "rg --pre rm foo .",
+    "rg --pre-glob '*.x' --pre=rm foo .",
+    "uniq a.txt b.txt",
+    "sort -uo out in",
+    "sort -o out in",
+    "sort --output=out in",
+    "git log --output=/tmp/x",
+    "git diff --output=/tmp/x",
+    "git diff --output /tmp/x",
+    "find . -delete",
+    "printf -v PATH %s /tmp/x",
+    "ss -K dst 10.0.0.1",
+    "ss --kill state established",
+    "file -C -m magic",
+    "file --compile -m magic",
+    # Redirections only count as harmless as whole words
+    "ls 2>/dev/nullfoo",
+    "echo hi 2>&1x",
+    "ls 2>/dev/null>out",
+    "cat < /etc/shadow",
+    # Variable assignment in parameter expansion
+    "echo ${PATH:=/tmp/x}",
+    "echo ${X=1}",
+    # Shell syntax
+    "ls > files.txt",
+    "echo $(rm -rf /)",
+    "sleep 100 &",
+    "git branch new-branch",
+    "rm -rf /tmp/x",
+])
+def test_not_read_only(command):
+    assert not is_read_only(command)
+
+
+def test_auto_approve_policy():
+    assert auto_approved("ls", policy="read-only")
+    assert not auto_approved("ls", policy="none")
+    assert not auto_approved("GIT_PAGER=x git log", policy="read-only")
@@ -1,9 +1,9 @@
 
-from langchain_ollama import ChatOllama
+from ai_common.ollama_chat import SharedChatOllama
 
 used_model = "gemma3:1b"
 
-llm = ChatOllama(
+llm = SharedChatOllama(
     model=used_model,
     temperature=0,
     # other params...
@@ -1,34 +1,27 @@
+from ai_common.ollama_chat import SharedChatOllama
 
-from langchain_ollama import ChatOllama
-
+from summarizer import summarize_snippets
 from youtube import youtube
 
 used_model = "gemma4:e4b" #"gemma3:4b" #"gemma3:1b"
 
-llm = ChatOllama(
+llm = SharedChatOllama(
     model=used_model,
     temperature=0,
+    num_ctx=8192,  # Fits the chunks of summarizer.DEFAULT_MAX_CHARS
     # other params...
 )
 
 
 def summarize_youtube_video(url: str):
-    transcript = youtube.get_transcript(url)
-
-    #print(transcript)
+    snippets = youtube.get_snippets(url)
 
-    messages = [
-        (
-            "system",
-            "You are an expert summarization assistant. Your task is to analyze the provided transcript of a YouTube video and generate a clear, concise, and engaging summary. Focus on the main topic, key points, and any important details that capture the essence of the video. Avoid unnecessary details and ensure the summary is easy to understand.",
-        ),
-        ("human", f"The following is a transcript of a YouTube video. Please summarize it and explain what the video is about: {transcript}"),
-    ]
-    ai_msg = llm.invoke(messages)
+    #print(youtube.join_snippets(snippets))
 
-    print(ai_msg.content)
+    print(summarize_snippets(llm, snippets))
 
 
-yt_link = input("youtube link: ")
-#summarize_youtube_video("https://www.youtube.com/watch?v=eur8dUO9mvE")
-summarize_youtube_video(yt_link)
\ No newline at end of file
+if __name__ == "__main__":
+    yt_link = input("youtube link: ")
+    #summarize_youtube_video("https://www.youtube.com/watch?v=eur8dUO9mvE")
+    summarize_youtube_video(yt_link)
@@ -0,0 +1,97 @@
+"""
+Map-reduce summarization of transcripts.
+
+A transcript that fits `max_chars` is summarized with one request, as before.
+Longer ones (hours of video are 100k+ characters, far more than the context
+of a small local model) are split by the timestamp-aware chunker and
+
+- map: every chunk is summarized on its own, the requests run in parallel
+  (`max_concurrency`, the shared Ollama client limits them further to
+  `OLLAMA_NUM_PARALLEL`);
+- reduce: the partial summaries, labeled with their time ranges, are combined
+  into the final summary. If they don't fit one request either, they are
+  combined in groups first, level by level, until they do.
+"""
+
+from typing import List, Sequence, Tuple
+
+from langchain_core.language_models import BaseChatModel
+
+from youtube.chunker import Chunk, chunk_snippets
+from youtube.youtube import Snippet, join_snippets
+
+
+# Characters per request, ~4 characters per token: leaves room for the prompt
+# and the answer in an 8k context
+DEFAULT_MAX_CHARS = 12000
+DEFAULT_MAX_CONCURRENCY = 4
+
+SYSTEM_PROMPT = "You are an expert summarization assistant. Your task is to analyze the provided transcript of a YouTube video and generate a clear, concise, and engaging summary. Focus on the main topic, key points, and any important details that capture the essence of the video. Avoid unnecessary details and ensure the summary is easy to understand."
+SUMMARY_PROMPT = "The following is a transcript of a YouTube video. Please summarize it and explain what the video is about: {text}"
+MAP_PROMPT = "The following is the part {label} of the transcript of a YouTube video. Summarize the key points of this part in a few sentences, without an introduction: {text}"
+COMBINE_PROMPT = "The following are summaries of consecutive parts of a YouTube video, each labeled with its time range. Combine them into one summary of these parts, keeping the order and the time ranges of the key points:\n\n{text}"
+REDUCE_PROMPT = "The following are summaries of consecutive parts of a YouTube video, each labeled with its time range. Write a clear, concise summary of the whole video: explain what the video is about and its key points, and mention where in the video the most important ones are:\n\n{text}"
+
+Messages = List[Tuple[str, str]]
+
+
+def _messages(prompt: str, **values: str) -> Messages:
+    return [("system", SYSTEM_PROMPT), ("human", prompt.format(**values))]
+
+
+def _batch(llm: BaseChatModel, requests: Sequence[Messages], max_concurrency: int) -> List[str]:
+    answers = llm.batch(list(requests), config={"max_concurrency": max_concurrency})
+    return [answer.content for answer in answers]
+
+
+def _group(parts: List[Chunk], max_chars: int) -> List[List[Chunk]]:
+    """Consecutive parts in groups of at most max_chars (at least two parts per group)."""
+    groups: List[List[Chunk]] = [[]]
+    length = 0
+    for part in parts:
+        size = len(part.label) + len(part.text) + 2
+        if len(groups[-1]) >= 2 and length + size > max_chars:
+            groups.append([])
+            length = 0
+        groups[-1].append(part)
+        length += size
+    return groups
+
+
+def _labeled(parts: List[Chunk]) -> str:
+    return "\n\n".join(f"{part.label} {part.text}" for part in parts)
+
+
+def summarize_snippets(
+    llm: BaseChatModel,
+    snippets: List[Snippet],
+    max_chars: int = DEFAULT_MAX_CHARS,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+) -> str:
+    """
+    Summarize a transcript.
+
+    Args:
+        llm: Chat model
+        snippets: Transcript snippets (see youtube.youtube)
+        max_chars: Transcript/summary characters per request
+        max_concurrency: Map/combine requests in flight at a time
+
+    Returns:
+        The summary
+    """
+    text = join_snippets(snippets)
+    if len(text) <= max_chars:
+        return llm.invoke(_messages(SUMMARY_PROMPT, text=text)).content
+
+    chunks = chunk_snippets(snippets, max_chars)
+    summaries = _batch(llm, [_messages(MAP_PROMPT, label=c.label, text=c.text) for c in chunks], max_concurrency)
+    parts = [Chunk(start=c.start, end=c.end, text=s) for c, s in zip(chunks, summaries)]
+
+    # Combine groups of partial summaries until the rest fits one request
+    while len(parts) > 1 and len(_labeled(parts)) > max_chars:
+        groups = _group(parts, max_chars)
+        summaries = _batch(llm, [_messages(COMBINE_PROMPT, text=_labeled(g)) for g in groups], max_concurrency)
+        parts = [Chunk(start=g[0].start, end=g[-1].end, text=s) for g, s in zip(groups, summaries)]
+
+    return llm.invoke(_messages(REDUCE_PROMPT, text=_labeled(parts))).content
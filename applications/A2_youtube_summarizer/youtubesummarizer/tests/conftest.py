@@ -0,0 +1,5 @@
+import os
+import sys
+
+# main.py runs from the app directory, its modules are imported from there
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,146 @@
+"""Transcript store, chunker and map-reduce summary on a recorded transcript, without network."""
+
+import json
+import os
+import re
+import shutil
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+import summarizer
+from summarizer import summarize_snippets
+from youtube import youtube
+from youtube.chunker import chunk_snippets, format_timestamp
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+VIDEO_ID = "fixture0001"
+LABEL = re.compile(r"\[(\d+(?::\d\d)+)-(\d+(?::\d\d)+)\]")
+
+
+def no_network(video_id):
+    raise AssertionError(f"fetched {video_id} from YouTube")
+
+
+class RecordingChatModel(BaseChatModel):
+    """Answers every prompt with a fixed-size summary and records the prompts."""
+
+    prompts: list = []
+    answer_chars: int = 150
+
+    @property
+    def _llm_type(self) -> str:
+        return "recording"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.prompts.append(messages[-1].content)
+        text = f"summary {len(self.prompts)} ".ljust(self.answer_chars, ".")
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+def stage(prompt):
+    for name in ("MAP_PROMPT", "COMBINE_PROMPT", "REDUCE_PROMPT", "SUMMARY_PROMPT"):
+        if prompt.startswith(getattr(summarizer, name).split("{")[0]):
+            return name
+    raise AssertionError(f"unknown prompt: {prompt[:60]}")
+
+
+def seconds(timestamp):
+    total = 0
+    for part in timestamp.split(":"):
+        total = total * 60 + int(part)
+    return total
+
+
+@pytest.fixture
+def store(tmp_path):
+    shutil.copy(os.path.join(FIXTURES, f"{VIDEO_ID}.json"), tmp_path)
+    return youtube.TranscriptStore(str(tmp_path), fetcher=no_network)
+
+
+@pytest.fixture
+def snippets(store):
+    return youtube.get_snippets(f"https://www.youtube.com/watch?v={VIDEO_ID}&t=10s", store)
+
+
+def test_store_reads_recorded_transcript(store, snippets):
+    assert len(snippets) == 37
+    assert snippets[0] == {"text": "welcome back to the channel", "start": 0.0, "duration": 2.5}
+    text = youtube.join_snippets(snippets)
+    # Snippets are separated by a space
+    assert text.startswith("welcome back to the channel today we are going to talk about how")
+
+
+def test_store_fetches_once(tmp_path):
+    fetched = []
+
+    def fetcher(video_id):
+        fetched.append(video_id)
+        return [{"text": "hello\nworld", "start": 0, "duration": 1.5}]
+
+    store = youtube.TranscriptStore(str(tmp_path / "cache"), fetcher=fetcher)
+    assert youtube.get_transcript("https://youtu.be/abcdefghijk", store) == "hello world"
+    assert youtube.get_transcript("https://youtu.be/abcdefghijk", store) == "hello world"
+    assert fetched == ["abcdefghijk"]
+    with open(tmp_path / "cache" / "abcdefghijk.json", encoding="utf-8") as f:
+        assert json.load(f) == [{"text": "hello\nworld", "start": 0.0, "duration": 1.5}]
+
+    with pytest.raises(ValueError):
+        store.get("../../etc/passwd")
+
+
+def test_chunks_keep_text_and_time(snippets):
+    chunks = chunk_snippets(snippets, max_chars=300)
+    assert len(chunks) > 3
+    assert all(len(chunk.text) <= 300 for chunk in chunks)
+    assert " ".join(chunk.text for chunk in chunks) == youtube.join_snippets(snippets)
+    assert chunks[0].start == 0.0
+    assert chunks[-1].end == pytest.approx(snippets[-1]["start"] + snippets[-1]["duration"])
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert previous.end <= chunk.start
+    # Chunks end at sentence ends or pauses where possible
+    assert sum(chunk.text.endswith(".") for chunk in chunks) >= len(chunks) // 2
+
+
+def test_format_timestamp():
+    assert format_timestamp(59.9) == "00:59"
+    assert format_timestamp(4459.3) == "1:14:19"
+
+
+def test_short_transcript_is_one_request(snippets):
+    llm = RecordingChatModel(prompts=[])
+    summary = summarize_snippets(llm, snippets, max_chars=100000)
+    assert summary.startswith("summary 1")
+    assert [stage(prompt) for prompt in llm.prompts] == ["SUMMARY_PROMPT"]
+
+
+def test_map_reduce_levels_and_labels(snippets):
+    llm = RecordingChatModel(prompts=[])
+    chunks = chunk_snippets(snippets, max_chars=400)
+    summary = summarize_snippets(llm, snippets, max_chars=400, max_concurrency=3)
+
+    stages = [stage(prompt) for prompt in llm.prompts]
+    maps = stages.count("MAP_PROMPT")
+    combines = stages.count("COMBINE_PROMPT")
+    # One map request per chunk, combine levels until the summaries fit, one reduce
+    assert maps == len(chunks)
+    assert stages[:maps] == ["MAP_PROMPT"] * maps
+    assert stages[-1] == "REDUCE_PROMPT" and stages.count("REDUCE_PROMPT") == 1
+    assert combines >= 2
+    assert summary.startswith(f"summary {len(stages)}")
+
+    # Map prompts (sent in parallel, in any order) are labeled with the time range of their chunk
+    map_labels = sorted(LABEL.search(prompt).group(0) for prompt in llm.prompts[:maps])
+    assert map_labels == sorted(chunk.label for chunk in chunks)
+
+    # The reduce prompt covers the whole video in consecutive time ranges
+    ranges = [(seconds(a), seconds(b)) for a, b in LABEL.findall(llm.prompts[-1])]
+    assert len(ranges) >= 2
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == 4459  # 1:14:19
+    for previous, current in zip(ranges, ranges[1:]):
+        assert previous[1] <= current[0]
+    assert "1:14:19]" in llm.prompts[-1]
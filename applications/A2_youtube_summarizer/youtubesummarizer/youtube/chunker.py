@@ -0,0 +1,89 @@
+"""
+Timestamp-aware chunking of transcripts.
+
+A long video doesn't fit the model context in one piece, so the summarizer
+works on chunks. `chunk_snippets` groups consecutive snippets into chunks of
+about `max_chars` characters and keeps the time range of every chunk, so the
+partial summaries can say where in the video something was said. A chunk is
+closed at the first snippet boundary after `min_chars` that ends a sentence or
+is followed by a pause, and at the latest before `max_chars` is exceeded
+(a single snippet longer than that is a chunk of its own).
+"""
+
+from dataclasses import dataclass
+from typing import List
+
+from youtube.youtube import Snippet
+
+
+PAUSE_SECONDS = 2.0  # Silence that counts as a natural break
+_SENTENCE_END = (".", "!", "?", "…")
+
+
+@dataclass
+class Chunk:
+    """Consecutive snippets of a transcript."""
+    start: float  # Seconds
+    end: float
+    text: str
+
+    @property
+    def label(self) -> str:
+        return f"[{format_timestamp(self.start)}-{format_timestamp(self.end)}]"
+
+
+def format_timestamp(seconds: float) -> str:
+    """hh:mm:ss (mm:ss for videos shorter than an hour)."""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def chunk_snippets(snippets: List[Snippet], max_chars: int, min_chars: int = 0) -> List[Chunk]:
+    """
+    Group snippets into chunks.
+
+    Args:
+        snippets: Transcript snippets in time order
+        max_chars: Upper limit of the chunk text length
+        min_chars: Length after which a chunk ends at the next natural break
+            (default: 3/4 of max_chars)
+
+    Returns:
+        Chunks in time order
+    """
+    min_chars = min_chars or max_chars * 3 // 4
+    chunks: List[Chunk] = []
+    texts: List[str] = []
+    length = 0
+    start = end = 0.0
+
+    def close() -> None:
+        nonlocal texts, length
+        if texts:
+            chunks.append(Chunk(start=start, end=end, text=" ".join(texts)))
+        texts, length = [], 0
+
+    for i, snippet in enumerate(snippets):
+        text = " ".join(str(snippet["text"]).split())
+        if not text:
+            continue
+        snippet_start = float(snippet["start"])
+        if texts and length + 1 + len(text) > max_chars:
+            close()
+        if not texts:
+            start = snippet_start
+        texts.append(text)
+        length += len(text) + (1 if length else 0)
+        end = snippet_start + float(snippet.get("duration", 0.0))
+
+        if length >= min_chars:
+            following = snippets[i + 1] if i + 1 < len(snippets) else None
+            pause = following is not None and float(following["start"]) - end >= PAUSE_SECONDS
+            if text.endswith(_SENTENCE_END) or pause:
+                close()
+    close()
+    return chunks
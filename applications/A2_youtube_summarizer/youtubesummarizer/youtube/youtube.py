@@ -1,7 +1,29 @@
+"""
+YouTube transcripts, cached on disk by video id.
+
+Fetching a transcript is the slow and rate-limited part of a summary, and the
+same video is often summarized more than once (another model, another prompt).
+`TranscriptStore` keeps every fetched transcript as `<video id>.json` (a list
+of snippets with `text`, `start` and `duration` in seconds) in
+`TRANSCRIPT_CACHE_DIR` (default `~/.cache/youtubesummarizer/transcripts`). A
+directory of recorded transcripts in the same format works without network.
+"""
+
+import json
+import os
 import re
+import tempfile
+from typing import Callable, Dict, List, Optional
+
 from youtube_transcript_api import YouTubeTranscriptApi
 
 
+Snippet = Dict[str, object]  # {"text": str, "start": float, "duration": float}
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "youtubesummarizer", "transcripts")
+CACHE_DIR = os.environ.get("TRANSCRIPT_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+_VIDEO_ID = re.compile(r"^[A-Za-z0-9_-]{6,64}$")
 
 
 def extract_video_id(url: str) -> str:
@@ -11,7 +33,7 @@ def extract_video_id(url: str) -> str:
         r'youtube\.com/embed/([^&\n?#]+)',
         r'youtube\.com/v/([^&\n?#]+)',
     ]
-    
+
     for pattern in patterns:
         match = re.search(pattern, url)
         if match:
@@ -19,16 +41,72 @@ def extract_video_id(url: str) -> str:
     return url
 
 
-def get_transcript(url: str) -> str:
-    video_id = extract_video_id(url) or url
+def fetch_snippets(video_id: str) -> List[Snippet]:
+    """Download the transcript of a video from YouTube."""
+    return YouTubeTranscriptApi().fetch(video_id).to_raw_data()
+
+
+class TranscriptStore:
+    """Transcripts by video id, fetched once and then read from the cache directory."""
 
-    ytt_api = YouTubeTranscriptApi()
-    fetched_transcript = ytt_api.fetch(video_id)
-    ret = ""
-    for snippet in fetched_transcript.snippets:
-        ret += snippet.text
+    def __init__(self, cache_dir: str = CACHE_DIR, fetcher: Callable[[str], List[Snippet]] = fetch_snippets):
+        """
+        Args:
+            cache_dir: Directory of `<video id>.json` files
+            fetcher: Called with the video id on a cache miss
+        """
+        self.cache_dir = cache_dir
+        self.fetcher = fetcher
 
-    return ret
+    def path(self, video_id: str) -> str:
+        if not _VIDEO_ID.match(video_id):
+            raise ValueError(f"Invalid video id: {video_id!r}")
+        return os.path.join(self.cache_dir, f"{video_id}.json")
+
+    def load(self, video_id: str) -> Optional[List[Snippet]]:
+        """Cached transcript, None if it isn't cached (or the file is broken)."""
+        path = self.path(video_id)
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, video_id: str, snippets: List[Snippet]) -> None:
+        # Write to a temp file and rename, so readers never see half a file
+        path = self.path(video_id)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(snippets, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def get(self, video_id: str) -> List[Snippet]:
+        """Transcript snippets of the video, from the cache or fetched (and cached)."""
+        snippets = self.load(video_id)
+        if snippets is None:
+            snippets = [
+                {"text": s["text"], "start": float(s["start"]), "duration": float(s["duration"])}
+                for s in self.fetcher(video_id)
+            ]
+            self.save(video_id, snippets)
+        return snippets
+
+
+def join_snippets(snippets: List[Snippet]) -> str:
+    """Transcript text, snippets separated by a space."""
+    texts = (" ".join(str(s["text"]).split()) for s in snippets)
+    return " ".join(text for text in texts if text)
+
+
+def get_snippets(url: str, store: Optional[TranscriptStore] = None) -> List[Snippet]:
+    video_id = extract_video_id(url) or url
+    return (store or TranscriptStore()).get(video_id)
 
 
-get_transcript("https://www.youtube.com/watch?v=eur8dUO9mvE")
\ No newline at end of file
+def get_transcript(url: str, store: Optional[TranscriptStore] = None) -> str:
+    return join_snippets(get_snippets(url, store))
@@ -0,0 +1,359 @@
+"""
+Batch Knowledge Graph Extraction
+
+Extracts knowledge graphs from many documents (directories, files or glob
+patterns) in a single process: the LLM client, the transformer and the worker
+pool are created once and shared by all documents. Writes one graph per
+document and optionally merges them into one graph; interrupted runs resume
+from the progress file.
+"""
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from LLMGraphTransformer import LLMGraphTransformer
+from LLMGraphTransformer.schema import GraphDocument
+from ai_common.ollama_chat import SharedChatOllama
+
+from extraction import (
+    DEFAULT_CACHE_DIR,
+    BatchProgress,
+    DocumentResult,
+    ExtractionCache,
+    discover_documents,
+    extract_documents,
+    extraction_fingerprint,
+    merge_graph_documents,
+    summarize_timings,
+)
+from main import DEFAULT_ADDITIONAL_INSTRUCTIONS, export_to_json, get_default_schemas
+from resolution import resolve_entities
+from storage import FORMATS, load_graph, save_graph_store
+
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+FORMAT_EXTENSIONS = {
+    "json": ".json",
+    "compact": ".json",
+    "ndjson": ".ndjson",
+}
+
+
+def output_path_for(document_path: str, root: str, output_dir: str, json_format: str) -> str:
+    """
+    Path of a document's graph, mirroring the document's location below `root`.
+
+    Args:
+        document_path: Input document
+        root: Common directory of all input documents
+        output_dir: Directory of the per-document graphs
+        json_format: Export format (selects the file extension)
+
+    Returns:
+        Output file path
+    """
+    relative = Path(os.path.relpath(document_path, root))
+    return str(Path(output_dir) / relative.with_suffix(FORMAT_EXTENSIONS[json_format]))
+
+
+def merge_outputs(
+    records: List[Dict],
+    node_schemas: Optional[List] = None,
+    entity_resolution: bool = True
+) -> Optional[GraphDocument]:
+    """
+    Merge the per-document graphs of a batch into one graph.
+
+    Args:
+        records: Progress records of the completed documents
+        node_schemas: Node schemas used for entity resolution
+        entity_resolution: Whether to resolve entities across documents
+
+    Returns:
+        Merged graph, or None if no document graph could be loaded
+    """
+    graph_documents = []
+    for record in records:
+        try:
+            graph_documents.append(load_graph(record["output"]))
+        except Exception as e:
+            logger.error(f"Could not load {record['output']} of {record['path']}: {e}")
+    if not graph_documents:
+        return None
+
+    graph_document = merge_graph_documents(graph_documents)
+    if entity_resolution:
+        graph_document = resolve_entities(graph_document, node_schemas)
+    return graph_document
+
+
+def parse_arguments() -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Returns:
+        Parsed command line arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Extract knowledge graphs from many documents in one run"
+    )
+
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="Documents, directories or glob patterns (quote patterns with '**')"
+    )
+
+    parser.add_argument(
+        "--pattern",
+        type=str,
+        default="*.txt",
+        help="File name pattern used inside directories (default: *.txt)"
+    )
+
+    parser.add_argument(
+        "--output-dir",
+        type=str,
+        default="graphs",
+        help="Directory of the per-document graphs (default: graphs)"
+    )
+
+    parser.add_argument(
+        "--merged-output",
+        type=str,
+        help="Also merge all document graphs into this file (.kgs writes a binary graph store)"
+    )
+
+    parser.add_argument(
+        "--json-format",
+        type=str,
+        choices=FORMATS,
+        default="compact",
+        help="Format of the graph files: json, compact or ndjson (default: compact)"
+    )
+
+    parser.add_argument(
+        "--progress-file",
+        type=str,
+        help="Progress file used to resume an interrupted batch (default: <output-dir>/progress.jsonl)"
+    )
+
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore the progress file and process every document again"
+    )
+
+    parser.add_argument(
+        "--model",
+        type=str,
+        default="gemma3:4b",
+        help="Ollama model to use (default: gemma3:4b)"
+    )
+
+    parser.add_argument(
+        "--temperature",
+        type=float,
+        default=0.0,
+        help="LLM temperature (default: 0.0)"
+    )
+
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1000,
+        help="Token budget per LLM call (default: 1000)"
+    )
+
+    parser.add_argument(
+        "--overlap",
+        type=int,
+        default=100,
+        help="Tokens shared between consecutive chunks (default: 100)"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Concurrent LLM calls for the whole batch, match OLLAMA_NUM_PARALLEL (default: 4)"
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=DEFAULT_CACHE_DIR,
+        help=f"Directory of the extraction cache (default: {DEFAULT_CACHE_DIR})"
+    )
+
+    parser.add_argument(
+        "--cache-size-mb",
+        type=int,
+        default=512,
+        help="Maximum size of the extraction cache (default: 512)"
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write the extraction cache"
+    )
+
+    parser.add_argument(
+        "--no-entity-resolution",
+        action="store_true",
+        help="Don't merge entities that differ only in spelling"
+    )
+
+    parser.add_argument(
+        "--log-level",
+        type=str,
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        default="INFO",
+        help="Logging level (default: INFO)"
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function."""
+    args = parse_arguments()
+    logging.getLogger().setLevel(getattr(logging, args.log_level))
+
+    if args.chunk_size <= 0 or not 0 <= args.overlap < args.chunk_size:
+        logger.error("--chunk-size must be positive and --overlap in [0, chunk-size)")
+        sys.exit(1)
+
+    if args.workers < 1:
+        logger.error("--workers must be at least 1")
+        sys.exit(1)
+
+    paths = discover_documents(args.inputs, pattern=args.pattern)
+    if not paths:
+        logger.error("No documents found")
+        sys.exit(1)
+    root = os.path.commonpath([os.path.abspath(os.path.dirname(path)) for path in paths])
+    logger.info(f"Found {len(paths)} documents")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    progress_path = args.progress_file or os.path.join(args.output_dir, "progress.jsonl")
+    if args.restart and os.path.exists(progress_path):
+        os.remove(progress_path)
+    progress = BatchProgress(progress_path)
+
+    # One client, transformer and cache for the whole batch
+    node_schemas, relationship_schemas = get_default_schemas()
+    try:
+        logger.info(f"Initializing Ollama model: {args.model}")
+        llm = SharedChatOllama(model=args.model, temperature=args.temperature)
+        llm_transformer = LLMGraphTransformer(
+            llm=llm,
+            allowed_nodes=node_schemas,
+            allowed_relationships=relationship_schemas,
+            additional_instructions=DEFAULT_ADDITIONAL_INSTRUCTIONS
+        )
+    except Exception as e:
+        logger.error(f"Error initializing LLM: {e}")
+        sys.exit(1)
+    fingerprint = extraction_fingerprint(
+        node_schemas, relationship_schemas, DEFAULT_ADDITIONAL_INSTRUCTIONS, llm
+    )
+
+    cache = None
+    if not args.no_cache:
+        try:
+            cache = ExtractionCache(args.cache_dir, max_bytes=args.cache_size_mb * 1024 * 1024)
+        except Exception as e:
+            logger.warning(f"Extraction cache disabled, could not open {args.cache_dir}: {e}")
+
+    processed: List[DocumentResult] = []
+    skipped = failed = 0
+    try:
+        results = extract_documents(
+            paths,
+            llm_transformer,
+            fingerprint,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            overlap=args.overlap,
+            cache=cache,
+            progress=progress
+        )
+        for position, result in enumerate(results, start=1):
+            if result.skipped:
+                skipped += 1
+                logger.debug(f"[{position}/{len(paths)}] {result.path}: already done")
+                continue
+
+            output = None
+            if result.error is None:
+                graph_document = result.graph_document
+                if not args.no_entity_resolution:
+                    graph_document = resolve_entities(graph_document, node_schemas)
+                output = output_path_for(
+                    os.path.abspath(result.path), root, args.output_dir, args.json_format
+                )
+                os.makedirs(os.path.dirname(output), exist_ok=True)
+                if not export_to_json(graph_document, output, json_format=args.json_format):
+                    result.error = f"Could not write {output}"
+                    output = None
+
+            progress.record(result, output)
+            # The graph is on disk now, don't keep thousands of them in memory
+            result.graph_document = None
+            if result.error:
+                failed += 1
+                logger.error(f"[{position}/{len(paths)}] {result.path}: {result.error}")
+            else:
+                processed.append(result)
+                logger.info(f"[{position}/{len(paths)}] {result.path}: {result.chunks} chunks, "
+                           f"{result.seconds:.1f}s")
+                if result.failed_chunks:
+                    logger.warning(f"{result.path}: {result.failed_chunks} chunks failed, "
+                                   f"rerun the same command to retry them")
+    except KeyboardInterrupt:
+        logger.warning(f"Interrupted, rerun the same command to resume from {progress_path}")
+        sys.exit(130)
+    finally:
+        progress.close()
+        if cache is not None:
+            logger.info(f"Extraction cache: {cache.hits} hits, {cache.misses} misses")
+            cache.close()
+
+    timings = summarize_timings(processed)
+    logger.info(f"Batch complete: {len(processed)} extracted, {skipped} already done, {failed} failed")
+    logger.info(f"Extraction time: {timings['total_seconds']:.1f}s total, "
+               f"{timings['mean_seconds']:.1f}s per document")
+    for path, seconds in timings["slowest"]:
+        logger.info(f"  slowest: {path} ({seconds:.1f}s)")
+
+    if args.merged_output:
+        records = [progress.done[path] for path in paths if path in progress.done]
+        graph_document = merge_outputs(records, node_schemas, not args.no_entity_resolution)
+        if graph_document is None:
+            logger.error("Nothing to merge")
+            sys.exit(1)
+        if args.merged_output.endswith(".kgs"):
+            save_graph_store(graph_document, args.merged_output)
+        elif not export_to_json(graph_document, args.merged_output, json_format=args.json_format):
+            sys.exit(1)
+        logger.info(f"Merged graph ({len(graph_document.nodes)} nodes, "
+                   f"{len(graph_document.relationships)} relationships) saved to {args.merged_output}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Extraction module - chunks large texts and extracts their graphs in parallel."""
+
+from .batch import (
+    BatchProgress,
+    DocumentResult,
+    discover_documents,
+    extract_documents,
+    summarize_timings,
+)
+from .cache import DEFAULT_CACHE_DIR, ExtractionCache, cache_key, extraction_fingerprint
+from .chunking import Chunk, chunk_text, content_defined_chunks, estimate_tokens
+from .extractor import extract_chunk, extract_graph_documents, merge_graph_documents
+from .incremental import (
+    IncrementalStats,
+    Manifest,
+    incremental_extract,
+    load_manifest,
+    manifest_path_for,
+    save_manifest,
+)
+from .serialization import GraphBuilder, graph_document_from_dict, graph_document_to_dict
+
+__all__ = [
+    'BatchProgress',
+    'Chunk',
+    'DEFAULT_CACHE_DIR',
+    'DocumentResult',
+    'ExtractionCache',
+    'GraphBuilder',
+    'IncrementalStats',
+    'Manifest',
+    'cache_key',
+    'chunk_text',
+    'content_defined_chunks',
+    'discover_documents',
+    'estimate_tokens',
+    'extract_documents',
+    'extract_chunk',
+    'extract_graph_documents',
+    'extraction_fingerprint',
+    'graph_document_from_dict',
+    'graph_document_to_dict',
+    'incremental_extract',
+    'load_manifest',
+    'manifest_path_for',
+    'merge_graph_documents',
+    'save_manifest',
+    'summarize_timings',
+]
@@ -0,0 +1,266 @@
+"""
+Batch extraction over many documents in one process.
+
+Documents share one LLM transformer and one bounded pool for the LLM calls, so
+small documents (one chunk each) keep the pool busy the same way the chunks of
+a single large document do. Completed documents are appended to a progress
+file; a restarted batch skips documents that are recorded as done with the
+same content hash. Documents with failed chunks are recorded as partial and
+processed again (with the extraction cache, only the failed chunks reach the
+LLM).
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+from LLMGraphTransformer import LLMGraphTransformer
+from LLMGraphTransformer.schema import GraphDocument
+
+from .cache import ExtractionCache
+from .chunking import chunk_text
+from .extractor import extract_graph_documents, merge_graph_documents
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATTERN = "*.txt"
+
+
+@dataclass
+class DocumentResult:
+    """Outcome of extracting one document."""
+    path: str
+    digest: str  # sha256 of the document text
+    seconds: float = 0.0
+    chunks: int = 0
+    failed_chunks: int = 0
+    skipped: bool = False  # Already done according to the progress file
+    error: Optional[str] = None
+    graph_document: Optional[GraphDocument] = None
+
+
+def discover_documents(inputs: List[str], pattern: str = DEFAULT_PATTERN) -> List[str]:
+    """
+    Expand files, directories and glob patterns into a sorted list of files.
+
+    Args:
+        inputs: Files, directories (searched recursively for `pattern`) or
+            glob patterns ("**" is supported)
+        pattern: File name pattern used inside directories
+
+    Returns:
+        Unique file paths in sorted order
+    """
+    paths: Set[str] = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.update(str(path) for path in Path(item).rglob(pattern) if path.is_file())
+        elif os.path.isfile(item):
+            paths.add(item)
+        else:
+            matches = [path for path in glob.glob(item, recursive=True) if os.path.isfile(path)]
+            if not matches:
+                logger.warning(f"No documents match {item}")
+            paths.update(matches)
+    return sorted(paths)
+
+
+class BatchProgress:
+    """
+    Append-only record of finished documents (one JSON object per line).
+
+    Status of a record: "done", "partial" (some chunks failed, the graph of
+    the others was written) or "failed". Only done documents are skipped.
+
+    Every record is flushed and fsynced when it is written, so after a crash
+    at most the document that was being recorded is processed again; a
+    truncated last line is ignored on load.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) a progress file.
+
+        Args:
+            path: Progress file path
+        """
+        self.path = path
+        # Latest record of every document whose graph was written (done or partial)
+        self.done: Dict[str, Dict] = {}
+        if Path(path).exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if record.get("status") in ("done", "partial"):
+                        self.done[record["path"]] = record
+                    else:
+                        self.done.pop(record.get("path"), None)
+            completed = sum(1 for record in self.done.values() if record["status"] == "done")
+            logger.info(f"Progress file {path}: {completed} documents already done, "
+                        f"{len(self.done) - completed} partial")
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def is_done(self, path: str, digest: str) -> bool:
+        """True if the document was completed (without failed chunks) with the same content."""
+        record = self.done.get(path)
+        return record is not None and record["status"] == "done" and record.get("digest") == digest
+
+    def record(self, result: DocumentResult, output: Optional[str] = None) -> None:
+        """
+        Append the outcome of a document.
+
+        Args:
+            result: Finished (or failed) document
+            output: Where the document's graph was written
+        """
+        if result.error:
+            status = "failed"
+        elif result.failed_chunks:
+            status = "partial"
+        else:
+            status = "done"
+        record = {
+            "path": result.path,
+            "digest": result.digest,
+            "status": status,
+            "output": output,
+            "seconds": round(result.seconds, 3),
+            "chunks": result.chunks,
+            "failed_chunks": result.failed_chunks,
+            "error": result.error,
+        }
+        if result.graph_document is not None:
+            record["nodes"] = len(result.graph_document.nodes)
+            record["relationships"] = len(result.graph_document.relationships)
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        if result.error:
+            self.done.pop(result.path, None)
+        else:
+            self.done[result.path] = record
+
+    def close(self) -> None:
+        """Close the progress file."""
+        self._file.close()
+
+
+def _document_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def extract_documents(
+    paths: List[str],
+    llm_transformer: LLMGraphTransformer,
+    fingerprint: str,
+    workers: int = 4,
+    chunk_size: int = 1000,
+    overlap: int = 100,
+    cache: Optional[ExtractionCache] = None,
+    progress: Optional[BatchProgress] = None
+) -> Iterator[DocumentResult]:
+    """
+    Extract the graphs of many documents with a shared pool of LLM workers.
+
+    Up to `workers` documents are chunked and extracted at a time; all their
+    chunks go through one pool of `workers` threads, which bounds the
+    concurrent LLM calls for the whole batch.
+
+    Args:
+        paths: Documents to process
+        llm_transformer: Configured transformer shared by all documents
+        fingerprint: Extraction configuration hash (see extraction_fingerprint)
+        workers: Maximum number of concurrent LLM calls
+        chunk_size: Token budget per chunk
+        overlap: Tokens shared between consecutive chunks
+        cache: Optional extraction cache
+        progress: Optional progress file; documents it records as done with
+            the same content are skipped
+
+    Yields:
+        One DocumentResult per document, in completion order
+    """
+    def process(path: str, chunk_pool: ThreadPoolExecutor) -> DocumentResult:
+        started = time.perf_counter()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except Exception as e:
+            return DocumentResult(path=path, digest="", error=f"Could not read file: {e}")
+
+        result = DocumentResult(path=path, digest=_document_digest(text))
+        if progress is not None and progress.is_done(path, result.digest):
+            result.skipped = True
+            return result
+        if not text.strip():
+            result.error = "Document is empty"
+            return result
+
+        try:
+            chunks = chunk_text(text, chunk_size=chunk_size, overlap=overlap)
+            chunk_graphs = extract_graph_documents(
+                llm_transformer, chunks, cache=cache, fingerprint=fingerprint, executor=chunk_pool
+            )
+        except Exception as e:
+            logger.error(f"Error extracting {path}: {e}", exc_info=True)
+            result.error = str(e)
+            return result
+
+        result.chunks = len(chunks)
+        result.failed_chunks = sum(1 for chunk_graph in chunk_graphs if chunk_graph is None)
+        if result.failed_chunks == result.chunks:
+            result.error = "Extraction failed for every chunk"
+        else:
+            result.graph_document = merge_graph_documents(chunk_graphs)
+        result.seconds = time.perf_counter() - started
+        return result
+
+    # Document threads only wait on the chunk pool, the LLM calls themselves
+    # all run in the chunk pool
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kg-chunk") as chunk_pool, \
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kg-doc") as document_pool:
+        pending: Set[Future] = set()
+        remaining = iter(paths)
+        for path in remaining:
+            pending.add(document_pool.submit(process, path, chunk_pool))
+            if len(pending) >= workers:
+                break
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                next_path = next(remaining, None)
+                if next_path is not None:
+                    pending.add(document_pool.submit(process, next_path, chunk_pool))
+                yield future.result()
+
+
+def summarize_timings(results: List[DocumentResult], slowest: int = 5) -> Dict:
+    """
+    Aggregate per-document timings of a batch.
+
+    Args:
+        results: Processed (not skipped) documents
+        slowest: Number of slowest documents to list
+
+    Returns:
+        Dict with document count, total/mean seconds and the slowest documents
+    """
+    timed = sorted(results, key=lambda result: result.seconds, reverse=True)
+    total = sum(result.seconds for result in timed)
+    return {
+        "documents": len(timed),
+        "total_seconds": round(total, 3),
+        "mean_seconds": round(total / len(timed), 3) if timed else 0.0,
+        "slowest": [(result.path, round(result.seconds, 3)) for result in timed[:slowest]],
+    }
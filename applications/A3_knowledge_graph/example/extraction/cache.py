@@ -0,0 +1,199 @@
+"""
+Content-addressed on-disk cache of chunk extraction results.
+
+An extraction result only depends on the chunk text, the node/relationship
+schemas, the additional instructions, the model and the temperature. The cache
+key is a hash of all of them, so unchanged chunks are never sent to the LLM
+twice while any change to the prompt inputs misses the cache automatically.
+
+Entries are stored in a SQLite database (zlib compressed JSON) and evicted in
+least-recently-used order when the database grows beyond its size limit.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from importlib import metadata
+from pathlib import Path
+from typing import Any, List, Optional
+
+from LLMGraphTransformer.schema import GraphDocument, NodeSchema, RelationshipSchema
+
+from .serialization import graph_document_from_dict, graph_document_to_dict
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = ".kg_cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Bump when the stored format or the extraction pipeline changes
+CACHE_VERSION = 1
+
+
+def _transformer_version() -> str:
+    """Version of LLMGraphTransformer, its prompt is part of the cache key."""
+    try:
+        return metadata.version("llmgraphtransformer")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def extraction_fingerprint(
+    node_schemas: List[NodeSchema],
+    relationship_schemas: List[RelationshipSchema],
+    additional_instructions: str,
+    llm: Any
+) -> str:
+    """
+    Hash every extraction input except the chunk text.
+
+    Args:
+        node_schemas: Allowed node types and their properties
+        relationship_schemas: Allowed relationship types
+        additional_instructions: Custom instructions for the LLM
+        llm: Language model; its `model` and `temperature` attributes are used
+
+    Returns:
+        Hex digest identifying the extraction configuration
+    """
+    config = {
+        "version": CACHE_VERSION,
+        "transformer": _transformer_version(),
+        "nodes": [[s.type, list(s.properties), s.description] for s in node_schemas],
+        "relationships": [[s.source, s.type, s.target, list(s.properties)] for s in relationship_schemas],
+        "instructions": additional_instructions,
+        "model": getattr(llm, "model", type(llm).__name__),
+        "temperature": getattr(llm, "temperature", None),
+    }
+    encoded = json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def cache_key(text: str, fingerprint: str) -> str:
+    """
+    Build the cache key of a chunk.
+
+    Args:
+        text: Chunk text
+        fingerprint: Result of extraction_fingerprint
+
+    Returns:
+        Hex digest
+    """
+    return hashlib.sha256(f"{fingerprint}\0{text}".encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """SQLite backed, size-bounded LRU cache of GraphDocuments."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Open (or create) the cache.
+
+        Args:
+            cache_dir: Directory holding the cache database
+            max_bytes: Maximum total size of the stored entries
+        """
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        self.path = Path(cache_dir) / "extractions.sqlite"
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Extraction workers share the connection, access is serialized by the lock
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries(last_access)")
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[GraphDocument]:
+        """
+        Look up a cached extraction result.
+
+        Args:
+            key: Result of cache_key
+
+        Returns:
+            The cached GraphDocument, or None on a miss
+        """
+        with self._lock:
+            row = self._db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            self.hits += 1
+
+        try:
+            return graph_document_from_dict(json.loads(zlib.decompress(row[0])))
+        except Exception as e:
+            logger.warning(f"Dropping unreadable cache entry {key[:12]}: {e}")
+            self.delete(key)
+            return None
+
+    def put(self, key: str, graph_document: GraphDocument) -> None:
+        """
+        Store an extraction result and evict old entries if the cache is full.
+
+        Args:
+            key: Result of cache_key
+            graph_document: Extraction result to store
+        """
+        data = json.dumps(graph_document_to_dict(graph_document), ensure_ascii=False, default=str)
+        value = zlib.compress(data.encode("utf-8"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time())
+            )
+            self._evict()
+            self._db.commit()
+
+    def delete(self, key: str) -> None:
+        """Remove an entry."""
+        with self._lock:
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._db.commit()
+
+    def size(self) -> int:
+        """Total size of the stored entries in bytes."""
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits max_bytes."""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        while total > self.max_bytes:
+            rows = self._db.execute(
+                "SELECT key, size FROM entries ORDER BY last_access ASC LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+        logger.debug(f"Evicted {evicted} cache entries")
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._db.close()
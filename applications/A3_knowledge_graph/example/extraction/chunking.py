@@ -0,0 +1,248 @@
+"""
+Sentence and paragraph aware text chunking.
+
+Splits large input texts into chunks that fit a token budget so that each
+chunk can be sent to the LLM separately. Chunks keep their character offsets
+into the original text and can overlap, so entities mentioned across a chunk
+boundary are still seen together by the model.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import List, Tuple
+
+
+# Rough average for English text with llama/gemma style tokenizers
+CHARS_PER_TOKEN = 4
+
+# Blank line(s) separate paragraphs
+_PARAGRAPH_SEPARATOR = re.compile(r"\n[ \t]*\n\s*")
+
+# Whitespace after a sentence terminator (optionally followed by a quote/bracket)
+_SENTENCE_SEPARATOR = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"')\]]))\s+")
+
+# Content-defined chunking: rolling hash over the last few sentences
+_ROLLING_WINDOW = 4
+_ROLLING_BASE = 1_000_003
+_ROLLING_MODULUS = (1 << 61) - 1
+# Assumed sentence length used to derive the boundary probability; a fixed value
+# keeps boundaries independent of the rest of the document
+_AVERAGE_SENTENCE_TOKENS = 25
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A contiguous slice of the input text."""
+    index: int  # Position of the chunk in the document
+    text: str  # Chunk content (slice of the original text)
+    start: int  # Start character offset in the original text
+    end: int  # End character offset in the original text (exclusive)
+
+    @property
+    def fingerprint(self) -> str:
+        """Content hash of the chunk, independent of its position."""
+        return hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class _Unit:
+    """Smallest piece the chunker packs (a sentence or a sentence fragment)."""
+    start: int
+    end: int
+    paragraph_end: bool  # True if a paragraph boundary follows this unit
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Approximate token count (at least 1 for non-empty text)
+    """
+    if not text:
+        return 0
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _span_tokens(units: List["_Unit"], first: int, last: int) -> int:
+    """Estimated tokens of the text from units[first] to units[last], separators included."""
+    return max(1, (units[last].end - units[first].start) // CHARS_PER_TOKEN)
+
+
+def _split_spans(text: str, separator: re.Pattern, start: int, end: int) -> List[Tuple[int, int]]:
+    """Split text[start:end] on a separator and return the non-empty spans."""
+    spans = []
+    position = start
+    for match in separator.finditer(text, start, end):
+        if match.start() > position:
+            spans.append((position, match.start()))
+        position = match.end()
+    if position < end:
+        spans.append((position, end))
+    return spans
+
+
+def _split_oversized(text: str, start: int, end: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """Hard-split a span that is larger than the budget, preferring whitespace."""
+    max_chars = chunk_size * CHARS_PER_TOKEN
+    spans = []
+    position = start
+    while end - position > max_chars:
+        cut = text.rfind(" ", position + 1, position + max_chars)
+        if cut <= position:
+            cut = position + max_chars
+        spans.append((position, cut))
+        position = cut
+        while position < end and text[position].isspace():
+            position += 1
+    if position < end:
+        spans.append((position, end))
+    return spans
+
+
+def _iter_units(text: str, chunk_size: int) -> List[_Unit]:
+    """Break the text into sentence units annotated with paragraph boundaries."""
+    units = []
+    for paragraph_start, paragraph_end in _split_spans(text, _PARAGRAPH_SEPARATOR, 0, len(text)):
+        sentences = _split_spans(text, _SENTENCE_SEPARATOR, paragraph_start, paragraph_end)
+        for i, (sentence_start, sentence_end) in enumerate(sentences):
+            pieces = _split_oversized(text, sentence_start, sentence_end, chunk_size)
+            for j, (piece_start, piece_end) in enumerate(pieces):
+                units.append(_Unit(
+                    start=piece_start,
+                    end=piece_end,
+                    paragraph_end=(i == len(sentences) - 1 and j == len(pieces) - 1)
+                ))
+    return units
+
+
+def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 100) -> List[Chunk]:
+    """
+    Split text into overlapping chunks that respect sentence and paragraph boundaries.
+
+    Sentences are packed greedily until the token budget is reached. When a chunk
+    is full it is cut at the last paragraph boundary, provided that keeps at least
+    half of the budget; otherwise it is cut at the last sentence boundary. Each new
+    chunk starts with the trailing sentences of the previous one, up to `overlap`
+    tokens.
+
+    Args:
+        text: Input text to split
+        chunk_size: Token budget per chunk (must be positive)
+        overlap: Number of tokens repeated from the end of the previous chunk
+
+    Returns:
+        List of chunks in document order (empty if the text is blank)
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    if overlap < 0 or overlap >= chunk_size:
+        raise ValueError(f"overlap must be in [0, chunk_size), got {overlap}")
+
+    units = _iter_units(text, chunk_size)
+    chunks: List[Chunk] = []
+
+    first = 0
+    while first < len(units):
+        # Pack as many units as the budget allows
+        last = first
+        while last + 1 < len(units) and _span_tokens(units, first, last + 1) <= chunk_size:
+            last += 1
+
+        # Prefer to end the chunk on a paragraph boundary
+        if last + 1 < len(units):
+            for candidate in range(last, first, -1):
+                if units[candidate].paragraph_end and _span_tokens(units, first, candidate) >= chunk_size // 2:
+                    last = candidate
+                    break
+
+        start, end = units[first].start, units[last].end
+        chunks.append(Chunk(index=len(chunks), text=text[start:end], start=start, end=end))
+
+        if last + 1 >= len(units):
+            break
+
+        # Step back over trailing units to build the overlap for the next chunk
+        next_first = last + 1
+        while next_first - 1 > first and _span_tokens(units, next_first - 1, last) <= overlap:
+            next_first -= 1
+        first = next_first
+
+    return chunks
+
+
+def _unit_hash(text: str) -> int:
+    """Stable 64-bit hash of a unit, whitespace-insensitive."""
+    normalized = " ".join(text.split()).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(normalized, digest_size=8).digest(), "big")
+
+
+def content_defined_chunks(text: str, chunk_size: int = 1000, overlap: int = 100) -> List[Chunk]:
+    """
+    Split text into chunks whose boundaries depend only on nearby content.
+
+    A rolling hash over the last few sentences decides where chunks end, so an
+    edit only changes the chunks around it: boundaries before the edit are not
+    affected and the chunker re-synchronizes on the next content-defined
+    boundary after it. This keeps chunk fingerprints stable for incremental
+    re-extraction, unlike chunk_text where an insertion shifts every following
+    chunk. Chunks stay between a quarter of the budget and the full budget.
+
+    Args:
+        text: Input text to split
+        chunk_size: Token budget per chunk (must be positive)
+        overlap: Number of tokens repeated from the end of the previous chunk
+
+    Returns:
+        List of chunks in document order (empty if the text is blank)
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    if overlap < 0 or overlap >= chunk_size:
+        raise ValueError(f"overlap must be in [0, chunk_size), got {overlap}")
+
+    units = _iter_units(text, chunk_size)
+    min_tokens = max(1, chunk_size // 4)
+    # On average one boundary every ~half budget worth of sentences
+    divisor = max(1, (chunk_size // 2) // _AVERAGE_SENTENCE_TOKENS)
+    drop_factor = pow(_ROLLING_BASE, _ROLLING_WINDOW, _ROLLING_MODULUS)
+
+    # Decide the chunk ends: (index of first unit, index of last unit)
+    spans: List[Tuple[int, int]] = []
+    hashes = [_unit_hash(text[unit.start:unit.end]) for unit in units]
+    rolling = 0
+    first = 0
+    for i in range(len(units)):
+        rolling = (rolling * _ROLLING_BASE + hashes[i]) % _ROLLING_MODULUS
+        if i >= _ROLLING_WINDOW:
+            rolling = (rolling - hashes[i - _ROLLING_WINDOW] * drop_factor) % _ROLLING_MODULUS
+
+        if i > first and _span_tokens(units, first, i) > chunk_size:
+            spans.append((first, i - 1))
+            first = i
+        if _span_tokens(units, first, i) >= min_tokens and rolling % divisor == 0:
+            spans.append((first, i))
+            first = i + 1
+    if first < len(units):
+        spans.append((first, len(units) - 1))
+
+    chunks: List[Chunk] = []
+    for span_first, span_last in spans:
+        # Prepend trailing units of the previous span as overlap
+        overlap_first = span_first
+        while (overlap_first > 0 and chunks
+               and _span_tokens(units, overlap_first - 1, span_first - 1) <= overlap
+               and units[overlap_first - 1].start >= chunks[-1].start):
+            overlap_first -= 1
+        # Overlap must not push the chunk over budget
+        while overlap_first < span_first and _span_tokens(units, overlap_first, span_last) > chunk_size:
+            overlap_first += 1
+
+        start, end = units[overlap_first].start, units[span_last].end
+        chunks.append(Chunk(index=len(chunks), text=text[start:end], start=start, end=end))
+
+    return chunks
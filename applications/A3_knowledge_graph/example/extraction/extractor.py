@@ -0,0 +1,157 @@
+"""
+Parallel knowledge graph extraction over text chunks.
+
+Each chunk is converted to a GraphDocument by its own LLM call. The calls are
+fanned out over a bounded thread pool (Ollama serves OLLAMA_NUM_PARALLEL
+requests concurrently) and the per-chunk results are merged into one graph.
+"""
+
+import logging
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from LLMGraphTransformer import LLMGraphTransformer
+from LLMGraphTransformer.schema import GraphDocument, Node, Relationship
+from langchain_core.documents import Document
+
+from .cache import ExtractionCache, cache_key
+from .chunking import Chunk
+
+
+logger = logging.getLogger(__name__)
+
+
+def extract_chunk(
+    llm_transformer: LLMGraphTransformer,
+    chunk: Chunk,
+    cache: Optional[ExtractionCache] = None,
+    fingerprint: str = ""
+) -> Optional[GraphDocument]:
+    """
+    Extract the graph of a single chunk.
+
+    Args:
+        llm_transformer: Configured transformer used for the LLM call
+        chunk: Chunk to process
+        cache: Optional extraction cache consulted before calling the LLM
+        fingerprint: Extraction configuration hash (see extraction_fingerprint)
+
+    Returns:
+        GraphDocument of the chunk, or None if the extraction failed
+    """
+    key = cache_key(chunk.text, fingerprint) if cache is not None else None
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            logger.debug(f"Chunk {chunk.index}: cache hit")
+            return cached
+
+    document = Document(
+        page_content=chunk.text,
+        metadata={"chunk": chunk.index, "start": chunk.start, "end": chunk.end}
+    )
+    started = time.perf_counter()
+    try:
+        graph_document = llm_transformer.convert_to_graph_document(document)
+    except Exception as e:
+        logger.error(f"Error extracting chunk {chunk.index}: {e}", exc_info=True)
+        return None
+
+    logger.info(f"Chunk {chunk.index}: {len(graph_document.nodes)} nodes, "
+                f"{len(graph_document.relationships)} relationships "
+                f"({time.perf_counter() - started:.1f}s)")
+
+    if cache is not None:
+        try:
+            cache.put(key, graph_document)
+        except Exception as e:
+            logger.warning(f"Could not cache chunk {chunk.index}: {e}")
+    return graph_document
+
+
+def extract_graph_documents(
+    llm_transformer: LLMGraphTransformer,
+    chunks: List[Chunk],
+    workers: int = 4,
+    cache: Optional[ExtractionCache] = None,
+    fingerprint: str = "",
+    executor: Optional[Executor] = None
+) -> List[Optional[GraphDocument]]:
+    """
+    Extract the graphs of all chunks using a bounded worker pool.
+
+    Args:
+        llm_transformer: Configured transformer used for the LLM calls
+        chunks: Chunks to process
+        workers: Maximum number of concurrent LLM calls
+        cache: Optional extraction cache; cached chunks cost no LLM call
+        fingerprint: Extraction configuration hash (see extraction_fingerprint)
+        executor: Pool shared with other extractions; when given, `workers` is
+            ignored and the pool size bounds the concurrent LLM calls
+
+    Returns:
+        One entry per chunk in chunk order; None for chunks that failed
+    """
+    def extract(chunk: Chunk) -> Optional[GraphDocument]:
+        return extract_chunk(llm_transformer, chunk, cache=cache, fingerprint=fingerprint)
+
+    if executor is not None:
+        return list(executor.map(extract, chunks))
+
+    if workers <= 1 or len(chunks) <= 1:
+        return [extract(chunk) for chunk in chunks]
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        return list(executor.map(extract, chunks))
+
+
+def merge_graph_documents(graph_documents: List[Optional[GraphDocument]]) -> GraphDocument:
+    """
+    Merge per-chunk graph documents into a single graph.
+
+    Nodes with the same id and type are collapsed (properties are unioned, the
+    first value wins on conflicts) and identical relationships are kept once.
+
+    Args:
+        graph_documents: Graph documents to merge; None entries are skipped
+
+    Returns:
+        Merged GraphDocument
+    """
+    nodes: Dict[Tuple[str, str], Node] = {}
+    relationships: Dict[Tuple[Tuple[str, str], str, Tuple[str, str]], Relationship] = {}
+
+    def add_node(node: Node) -> Node:
+        key = (node.id, node.type)
+        merged = nodes.get(key)
+        if merged is None:
+            merged = Node(id=node.id, type=node.type, properties=dict(node.properties))
+            nodes[key] = merged
+        else:
+            for name, value in node.properties.items():
+                merged.properties.setdefault(name, value)
+        return merged
+
+    for graph_document in graph_documents:
+        if graph_document is None:
+            continue
+        for node in graph_document.nodes:
+            add_node(node)
+        for relationship in graph_document.relationships:
+            source = add_node(relationship.source)
+            target = add_node(relationship.target)
+            key = ((source.id, source.type), relationship.type, (target.id, target.type))
+            merged = relationships.get(key)
+            if merged is None:
+                relationships[key] = Relationship(
+                    source=source,
+                    target=target,
+                    type=relationship.type,
+                    properties=dict(relationship.properties)
+                )
+            else:
+                for name, value in relationship.properties.items():
+                    merged.properties.setdefault(name, value)
+
+    return GraphDocument(nodes=list(nodes.values()), relationships=list(relationships.values()))
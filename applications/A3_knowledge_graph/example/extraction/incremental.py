@@ -0,0 +1,178 @@
+"""
+Incremental re-extraction of edited documents.
+
+The document is split with content-defined chunking, so a local edit only
+changes the fingerprints of the chunks around it. A manifest stored next to
+the JSON export records, for every chunk fingerprint, the subgraph that chunk
+contributed. On the next run only chunks with unknown fingerprints are sent to
+the LLM; chunks that disappeared simply stop contributing, which retracts the
+nodes and relationships only they supported, and the graph is re-merged from
+the contributions.
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from LLMGraphTransformer import LLMGraphTransformer
+from LLMGraphTransformer.schema import GraphDocument
+
+from .cache import ExtractionCache
+from .chunking import content_defined_chunks
+from .extractor import extract_graph_documents, merge_graph_documents
+from .serialization import graph_document_from_dict, graph_document_to_dict
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class Manifest:
+    """Chunk -> subgraph contributions of a persisted graph."""
+    fingerprint: str  # Extraction configuration hash (see extraction_fingerprint)
+    chunk_size: int
+    overlap: int
+    # Chunk fingerprint -> {"start", "end", "graph"} in document order
+    chunks: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def is_compatible(self, fingerprint: str, chunk_size: int, overlap: int) -> bool:
+        """True if the contributions were produced with the same settings."""
+        return (self.fingerprint, self.chunk_size, self.overlap) == (fingerprint, chunk_size, overlap)
+
+
+@dataclass
+class IncrementalStats:
+    """What an incremental run did."""
+    reused: int = 0  # Chunks whose contribution was taken from the manifest
+    extracted: int = 0  # Chunks sent to the extraction
+    failed: int = 0  # Chunks whose extraction failed (retried on the next run)
+    retracted: int = 0  # Chunks of the previous version that are gone
+
+
+def manifest_path_for(json_path: str) -> str:
+    """Path of the manifest stored next to a JSON export."""
+    return f"{json_path}.manifest.json"
+
+
+def load_manifest(path: str) -> Optional[Manifest]:
+    """
+    Load a manifest.
+
+    Args:
+        path: Manifest file path
+
+    Returns:
+        Manifest, or None if the file is missing, unreadable or outdated
+    """
+    if not Path(path).exists():
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != MANIFEST_VERSION:
+            logger.warning(f"Ignoring manifest {path} with version {data.get('version')}")
+            return None
+        return Manifest(
+            fingerprint=data["fingerprint"],
+            chunk_size=data["chunk_size"],
+            overlap=data["overlap"],
+            chunks=data["chunks"]
+        )
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable manifest {path}: {e}")
+        return None
+
+
+def save_manifest(manifest: Manifest, path: str) -> None:
+    """
+    Write a manifest atomically (a crash never leaves a truncated file).
+
+    Args:
+        manifest: Manifest to write
+        path: Manifest file path
+    """
+    data = {
+        "version": MANIFEST_VERSION,
+        "fingerprint": manifest.fingerprint,
+        "chunk_size": manifest.chunk_size,
+        "overlap": manifest.overlap,
+        "chunks": manifest.chunks,
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
+
+
+def incremental_extract(
+    text: str,
+    llm_transformer: LLMGraphTransformer,
+    previous: Optional[Manifest],
+    fingerprint: str,
+    chunk_size: int = 1000,
+    overlap: int = 100,
+    workers: int = 4,
+    cache: Optional[ExtractionCache] = None
+) -> tuple[GraphDocument, Manifest, IncrementalStats]:
+    """
+    Re-extract only the chunks that changed since the previous run.
+
+    Args:
+        text: Current document text
+        llm_transformer: Configured transformer used for the LLM calls
+        previous: Manifest of the previous run (None for a full extraction)
+        fingerprint: Extraction configuration hash (see extraction_fingerprint)
+        chunk_size: Token budget per chunk
+        overlap: Tokens shared between consecutive chunks
+        workers: Maximum number of concurrent LLM calls
+        cache: Optional extraction cache for the changed chunks
+
+    Returns:
+        Tuple of (merged graph of the current text, new manifest, statistics)
+    """
+    if previous is not None and not previous.is_compatible(fingerprint, chunk_size, overlap):
+        logger.info("Extraction settings changed since the last run, re-extracting everything")
+        previous = None
+    known = previous.chunks if previous is not None else {}
+
+    chunks = content_defined_chunks(text, chunk_size=chunk_size, overlap=overlap)
+    stats = IncrementalStats()
+
+    # Chunks with an unknown fingerprint need an LLM call
+    changed = [chunk for chunk in chunks if chunk.fingerprint not in known]
+    changed_graphs = dict(zip(
+        (chunk.fingerprint for chunk in changed),
+        extract_graph_documents(llm_transformer, changed, workers=workers,
+                                cache=cache, fingerprint=fingerprint)
+    ))
+    stats.extracted = len(changed)
+
+    manifest = Manifest(fingerprint=fingerprint, chunk_size=chunk_size, overlap=overlap)
+    contributions: List[Optional[GraphDocument]] = []
+    for chunk in chunks:
+        if chunk.fingerprint in manifest.chunks:
+            # Repeated content (same chunk twice in the document) contributes once
+            continue
+        if chunk.fingerprint in known:
+            graph_data = known[chunk.fingerprint]["graph"]
+            contributions.append(graph_document_from_dict(graph_data))
+            stats.reused += 1
+        else:
+            graph_document = changed_graphs[chunk.fingerprint]
+            if graph_document is None:
+                stats.failed += 1
+                continue
+            graph_data = graph_document_to_dict(graph_document)
+            contributions.append(graph_document)
+        manifest.chunks[chunk.fingerprint] = {"start": chunk.start, "end": chunk.end, "graph": graph_data}
+
+    stats.retracted = sum(1 for chunk_fingerprint in known if chunk_fingerprint not in manifest.chunks)
+    logger.info(f"Incremental extraction: {stats.reused} chunks reused, {stats.extracted} extracted "
+                f"({stats.failed} failed), {stats.retracted} retracted")
+
+    return merge_graph_documents(contributions), manifest, stats
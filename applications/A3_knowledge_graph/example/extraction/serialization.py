@@ -0,0 +1,112 @@
+"""
+Plain dict (JSON compatible) representation of graph documents.
+
+GraphDocument objects are pydantic models with nested Node objects; these
+helpers convert them to and from dicts so they can be cached, stored and
+reloaded without running the extraction again.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from LLMGraphTransformer.schema import GraphDocument, Node, Relationship
+
+
+def node_to_dict(node: Node) -> Dict[str, Any]:
+    """Convert a node to a dict."""
+    return {"id": node.id, "type": node.type, "properties": node.properties}
+
+
+def graph_document_to_dict(graph_document: GraphDocument) -> Dict[str, Any]:
+    """
+    Convert a graph document to a JSON compatible dict.
+
+    Relationship endpoints are stored by id and type; endpoints that are not in
+    the node list are added to it so no information is lost.
+
+    Args:
+        graph_document: Graph document to convert
+
+    Returns:
+        Dict with "nodes" and "relationships" lists
+    """
+    nodes = {(node.id, node.type): node_to_dict(node) for node in graph_document.nodes}
+    relationships = []
+    for relationship in graph_document.relationships:
+        for endpoint in (relationship.source, relationship.target):
+            nodes.setdefault((endpoint.id, endpoint.type), node_to_dict(endpoint))
+        relationships.append({
+            "source": relationship.source.id,
+            "source_type": relationship.source.type,
+            "target": relationship.target.id,
+            "target_type": relationship.target.type,
+            "type": relationship.type,
+            "properties": relationship.properties
+        })
+    return {"nodes": list(nodes.values()), "relationships": relationships}
+
+
+class GraphBuilder:
+    """
+    Incrementally rebuild a GraphDocument from node and relationship records.
+
+    Relationship endpoints are resolved against the nodes added so far;
+    "source_type" and "target_type" are optional (files written by
+    export_to_json do not have them), in which case the first node with a
+    matching id is used. Unknown endpoints become new nodes.
+    """
+
+    def __init__(self):
+        self._nodes: Dict[Tuple[Any, str], Node] = {}
+        self._nodes_by_id: Dict[Any, Node] = {}
+        self._relationships: List[Relationship] = []
+
+    def _register(self, node: Node) -> Node:
+        self._nodes[(node.id, node.type)] = node
+        self._nodes_by_id.setdefault(node.id, node)
+        return node
+
+    def _endpoint(self, node_id: Any, node_type: Optional[str]) -> Node:
+        if node_type:
+            node = self._nodes.get((node_id, node_type))
+        else:
+            node = self._nodes_by_id.get(node_id)
+        return node or self._register(Node(id=node_id, type=node_type or "Node"))
+
+    def add_node(self, record: Dict[str, Any]) -> None:
+        """Add a {"id", "type", "properties"} record."""
+        self._register(Node(
+            id=record["id"],
+            type=record.get("type") or "Node",
+            properties=record.get("properties") or {}
+        ))
+
+    def add_relationship(self, record: Dict[str, Any]) -> None:
+        """Add a {"source", "target", "type", "properties"} record."""
+        self._relationships.append(Relationship(
+            source=self._endpoint(record["source"], record.get("source_type")),
+            target=self._endpoint(record["target"], record.get("target_type")),
+            type=record["type"],
+            properties=record.get("properties") or {}
+        ))
+
+    def build(self) -> GraphDocument:
+        """Return the GraphDocument built so far."""
+        return GraphDocument(nodes=list(self._nodes.values()), relationships=self._relationships)
+
+
+def graph_document_from_dict(data: Dict[str, Any]) -> GraphDocument:
+    """
+    Rebuild a graph document from its dict representation.
+
+    Args:
+        data: Dict as produced by graph_document_to_dict or export_to_json
+
+    Returns:
+        GraphDocument
+    """
+    builder = GraphBuilder()
+    for record in data.get("nodes", []):
+        builder.add_node(record)
+    for record in data.get("relationships", []):
+        builder.add_relationship(record)
+    return builder.build()
@@ -16,12 +16,42 @@ from typing import List, Optional, Dict, Any
 
 from LLMGraphTransformer import LLMGraphTransformer
 from LLMGraphTransformer.schema import NodeSchema, RelationshipSchema, GraphDocument
-from langchain_core.documents import Document
-from langchain_ollama import ChatOllama
+from ai_common.ollama_chat import SharedChatOllama
 from pyvis.network import Network
 import matplotlib.pyplot as plt
 import networkx as nx
 
+from extraction import (
+    DEFAULT_CACHE_DIR,
+    ExtractionCache,
+    chunk_text,
+    extract_graph_documents,
+    extraction_fingerprint,
+    incremental_extract,
+    load_manifest,
+    manifest_path_for,
+    merge_graph_documents,
+    save_manifest,
+)
+from resolution import resolve_entities
+from storage import (
+    FORMATS,
+    is_graph_store,
+    load_graph,
+    load_graph_store,
+    save_graph_store,
+    write_compact_json,
+    write_ndjson,
+)
+from visualization import (
+    DEFAULT_MAX_LABELS,
+    LARGE_GRAPH_THRESHOLD,
+    aggregate_graph,
+    ego_graph,
+    visualize_large,
+    visualize_large_matplotlib,
+)
+
 
 # Configure logging
 logging.basicConfig(
@@ -49,6 +79,8 @@ DEFAULT_NETWORK_CONFIG = {
     "node_size": 25
 }
 
+DEFAULT_ADDITIONAL_INSTRUCTIONS = "- All names must be extracted as uppercase"
+
 
 #create in memory knowledge graph
 def create_knowledge_graph(
@@ -56,10 +88,20 @@ def create_knowledge_graph(
     node_schemas: List[NodeSchema],
     relationship_schemas: List[RelationshipSchema],
     additional_instructions: str,
-    llm: Any
+    llm: Any,
+    chunk_size: int = 1000,
+    overlap: int = 100,
+    workers: int = 4,
+    cache: Optional[ExtractionCache] = None
 ) -> Optional[GraphDocument]:
     """
     Extract knowledge graph from text using LLM-based transformation.
+
+    The text is split into sentence/paragraph aligned chunks of at most
+    `chunk_size` tokens, the chunks are extracted concurrently and the
+    per-chunk graphs are merged. Texts that fit in one chunk take a single
+    LLM call. With a cache, chunks already extracted with the same schemas,
+    instructions, model and temperature are not sent to the LLM again.
     
     Args:
         text: Input text to extract entities and relationships from
@@ -67,6 +109,10 @@ def create_knowledge_graph(
         relationship_schemas: List of allowed relationship types
         additional_instructions: Custom instructions for the LLM
         llm: Language model instance for graph extraction
+        chunk_size: Token budget per chunk
+        overlap: Tokens shared between consecutive chunks
+        workers: Maximum number of concurrent LLM calls
+        cache: Optional on-disk extraction cache
         
     Returns:
         GraphDocument containing extracted nodes and relationships, or None if error
@@ -80,9 +126,26 @@ def create_knowledge_graph(
             additional_instructions=additional_instructions
         )
 
-        document = Document(page_content=text)
-        logger.info("Converting text to knowledge graph...")
-        graph_document = llm_transformer.convert_to_graph_document(document)
+        chunks = chunk_text(text, chunk_size=chunk_size, overlap=overlap)
+        logger.info(f"Converting text to knowledge graph ({len(chunks)} chunks, "
+                   f"{min(workers, len(chunks))} workers)...")
+        fingerprint = extraction_fingerprint(
+            node_schemas, relationship_schemas, additional_instructions, llm
+        )
+        chunk_graphs = extract_graph_documents(
+            llm_transformer, chunks, workers=workers, cache=cache, fingerprint=fingerprint
+        )
+        if cache is not None:
+            logger.info(f"Extraction cache: {cache.hits} hits, {cache.misses} misses")
+
+        failed = sum(1 for chunk_graph in chunk_graphs if chunk_graph is None)
+        if failed == len(chunk_graphs):
+            logger.error("Extraction failed for every chunk")
+            return None
+        if failed:
+            logger.warning(f"Extraction failed for {failed} of {len(chunk_graphs)} chunks")
+
+        graph_document = merge_graph_documents(chunk_graphs)
         
         logger.info(f"Extraction complete: {len(graph_document.nodes)} nodes, "
                    f"{len(graph_document.relationships)} relationships")
@@ -93,18 +156,112 @@ def create_knowledge_graph(
         return None
 
 
-def export_to_json(graph_document: GraphDocument, output_path: str) -> bool:
+def update_knowledge_graph(
+    text: str,
+    node_schemas: List[NodeSchema],
+    relationship_schemas: List[RelationshipSchema],
+    additional_instructions: str,
+    llm: Any,
+    manifest_path: str,
+    chunk_size: int = 1000,
+    overlap: int = 100,
+    workers: int = 4,
+    cache: Optional[ExtractionCache] = None
+) -> Optional[GraphDocument]:
+    """
+    Incrementally extract knowledge graph from an edited text.
+
+    The manifest at `manifest_path` records which subgraph every chunk of the
+    previous version contributed. Only new or edited chunks are extracted,
+    contributions of removed chunks are retracted and the manifest is updated.
+    Without a manifest this is a full extraction that creates one.
+    
+    Args:
+        text: Current input text
+        node_schemas: List of allowed node types and their properties
+        relationship_schemas: List of allowed relationship types
+        additional_instructions: Custom instructions for the LLM
+        llm: Language model instance for graph extraction
+        manifest_path: Path of the chunk manifest
+        chunk_size: Token budget per chunk
+        overlap: Tokens shared between consecutive chunks
+        workers: Maximum number of concurrent LLM calls
+        cache: Optional on-disk extraction cache
+        
+    Returns:
+        GraphDocument of the whole current text, or None if error
+    """
+    try:
+        llm_transformer = LLMGraphTransformer(
+            llm=llm,
+            allowed_nodes=node_schemas,
+            allowed_relationships=relationship_schemas,
+            additional_instructions=additional_instructions
+        )
+        fingerprint = extraction_fingerprint(
+            node_schemas, relationship_schemas, additional_instructions, llm
+        )
+
+        previous = load_manifest(manifest_path)
+        if previous is None:
+            logger.info(f"No manifest at {manifest_path}, extracting the whole text")
+
+        graph_document, manifest, stats = incremental_extract(
+            text,
+            llm_transformer,
+            previous,
+            fingerprint,
+            chunk_size=chunk_size,
+            overlap=overlap,
+            workers=workers,
+            cache=cache
+        )
+        if not manifest.chunks:
+            logger.error("Extraction failed for every chunk")
+            return None
+
+        save_manifest(manifest, manifest_path)
+        logger.info(f"Manifest saved to {manifest_path}")
+
+        logger.info(f"Extraction complete: {len(graph_document.nodes)} nodes, "
+                   f"{len(graph_document.relationships)} relationships")
+        return graph_document
+        
+    except Exception as e:
+        logger.error(f"Error updating knowledge graph: {e}", exc_info=True)
+        return None
+
+
+def export_to_json(
+    graph_document: GraphDocument,
+    output_path: str,
+    json_format: str = "json"
+) -> bool:
     """
     Export graph document to JSON format.
+
+    "json" writes an indented document, "compact" the same document without
+    indentation and "ndjson" one record per line. "compact" and "ndjson" are
+    streamed record by record and are meant for large graphs.
     
     Args:
         graph_document: The graph document to export
         output_path: Path to save the JSON file
+        json_format: One of "json", "compact" or "ndjson"
         
     Returns:
         True if successful, False otherwise
     """
     try:
+        if json_format == "ndjson":
+            write_ndjson(graph_document, output_path)
+            logger.info(f"Graph exported to NDJSON: {output_path}")
+            return True
+        if json_format == "compact":
+            write_compact_json(graph_document, output_path)
+            logger.info(f"Graph exported to compact JSON: {output_path}")
+            return True
+
         graph_data = {
             "nodes": [
                 {
@@ -453,6 +610,26 @@ def parse_arguments() -> argparse.Namespace:
         help="Export graph data to JSON file"
     )
     
+    parser.add_argument(
+        "--json-format",
+        type=str,
+        choices=FORMATS,
+        default="json",
+        help="JSON export format: json (indented), compact or ndjson (streamed, for large graphs) (default: json)"
+    )
+    
+    parser.add_argument(
+        "--load-graph",
+        type=str,
+        help="Load a previously exported graph (json, compact, ndjson or graph store) instead of running the extraction"
+    )
+    
+    parser.add_argument(
+        "--graph-store",
+        type=str,
+        help="Save the graph in the binary graph store format (memory-mapped, shared with A6)"
+    )
+    
     parser.add_argument(
         "--no-browser",
         action="store_true",
@@ -466,6 +643,95 @@ def parse_arguments() -> argparse.Namespace:
         help="LLM temperature (default: 0.0)"
     )
     
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1000,
+        help="Token budget per extraction chunk (default: 1000)"
+    )
+    
+    parser.add_argument(
+        "--overlap",
+        type=int,
+        default=100,
+        help="Tokens shared between consecutive chunks (default: 100)"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Maximum number of concurrent LLM calls, match OLLAMA_NUM_PARALLEL (default: 4)"
+    )
+    
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-extract chunks that changed since the last run (requires --json-export, "
+             "the chunk manifest is kept next to the JSON file)"
+    )
+    
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=DEFAULT_CACHE_DIR,
+        help=f"Directory of the extraction cache (default: {DEFAULT_CACHE_DIR})"
+    )
+    
+    parser.add_argument(
+        "--cache-size-mb",
+        type=int,
+        default=512,
+        help="Maximum size of the extraction cache, least recently used entries are evicted (default: 512)"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write the extraction cache"
+    )
+    
+    parser.add_argument(
+        "--no-entity-resolution",
+        action="store_true",
+        help="Don't merge entities that differ only in spelling (e.g. 'MARIE CURIE' and 'Curie')"
+    )
+    
+    parser.add_argument(
+        "--large-graph",
+        choices=["auto", "on", "off"],
+        default="auto",
+        help=f"Use the precomputed-layout renderer for large graphs; 'auto' switches to it "
+             f"above {LARGE_GRAPH_THRESHOLD} nodes (default: auto)"
+    )
+    
+    parser.add_argument(
+        "--max-labels",
+        type=int,
+        default=DEFAULT_MAX_LABELS,
+        help=f"Label only the N most connected nodes in the large-graph renderer (default: {DEFAULT_MAX_LABELS})"
+    )
+    
+    parser.add_argument(
+        "--aggregate",
+        choices=["none", "type", "community"],
+        default="none",
+        help="Collapse the graph into one node per entity type or per detected community before visualizing"
+    )
+    
+    parser.add_argument(
+        "--ego",
+        type=str,
+        help="Only visualize the neighborhood of the node with this id"
+    )
+    
+    parser.add_argument(
+        "--ego-radius",
+        type=int,
+        default=1,
+        help="Number of hops around --ego to include (default: 1)"
+    )
+    
     parser.add_argument(
         "--log-level",
         type=str,
@@ -477,14 +743,18 @@ def parse_arguments() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def main():
-    """Main execution function."""
-    # Parse arguments
-    args = parse_arguments()
-    
-    # Set logging level
-    logger.setLevel(getattr(logging, args.log_level))
+def extract_from_arguments(args: argparse.Namespace) -> GraphDocument:
+    """
+    Run the extraction pipeline configured by the command line arguments.
+
+    Exits the process on invalid input or if the extraction fails.
     
+    Args:
+        args: Parsed command line arguments
+        
+    Returns:
+        Extracted (and entity-resolved) graph document
+    """
     # Get input text
     if args.text_file:
         try:
@@ -505,16 +775,28 @@ def main():
         logger.error("Input text is empty")
         sys.exit(1)
     
+    if args.chunk_size <= 0 or not 0 <= args.overlap < args.chunk_size:
+        logger.error("--chunk-size must be positive and --overlap in [0, chunk-size)")
+        sys.exit(1)
+    
+    if args.workers < 1:
+        logger.error("--workers must be at least 1")
+        sys.exit(1)
+    
+    if args.incremental and not args.json_export:
+        logger.error("--incremental requires --json-export")
+        sys.exit(1)
+    
     # Get schemas
     node_schemas, relationship_schemas = get_default_schemas()
     
     # Additional instructions for extraction
-    additional_instructions = "- All names must be extracted as uppercase"
+    additional_instructions = DEFAULT_ADDITIONAL_INSTRUCTIONS
     
     # Initialize LLM
     try:
         logger.info(f"Initializing Ollama model: {args.model}")
-        llm = ChatOllama(
+        llm = SharedChatOllama(
             model=args.model,
             temperature=args.temperature,
         )
@@ -522,50 +804,157 @@ def main():
         logger.error(f"Error initializing LLM: {e}")
         sys.exit(1)
     
+    # Open the extraction cache
+    cache = None
+    if not args.no_cache:
+        try:
+            cache = ExtractionCache(args.cache_dir, max_bytes=args.cache_size_mb * 1024 * 1024)
+        except Exception as e:
+            logger.warning(f"Extraction cache disabled, could not open {args.cache_dir}: {e}")
+    
     # Create knowledge graph
-    graph_document = create_knowledge_graph(
-        text=text,
-        node_schemas=node_schemas,
-        relationship_schemas=relationship_schemas,
-        additional_instructions=additional_instructions,
-        llm=llm
-    )
+    if args.incremental:
+        graph_document = update_knowledge_graph(
+            text=text,
+            node_schemas=node_schemas,
+            relationship_schemas=relationship_schemas,
+            additional_instructions=additional_instructions,
+            llm=llm,
+            manifest_path=manifest_path_for(args.json_export),
+            chunk_size=args.chunk_size,
+            overlap=args.overlap,
+            workers=args.workers,
+            cache=cache
+        )
+    else:
+        graph_document = create_knowledge_graph(
+            text=text,
+            node_schemas=node_schemas,
+            relationship_schemas=relationship_schemas,
+            additional_instructions=additional_instructions,
+            llm=llm,
+            chunk_size=args.chunk_size,
+            overlap=args.overlap,
+            workers=args.workers,
+            cache=cache
+        )
     
     if not graph_document:
         logger.error("Failed to create knowledge graph")
         sys.exit(1)
     
-    # Display results
+    # Merge duplicate entities and relationships reported by different chunks
+    if not args.no_entity_resolution:
+        node_count = len(graph_document.nodes)
+        relationship_count = len(graph_document.relationships)
+        graph_document = resolve_entities(graph_document, node_schemas)
+        logger.info(f"Entity resolution: {node_count} -> {len(graph_document.nodes)} nodes, "
+                   f"{relationship_count} -> {len(graph_document.relationships)} relationships")
+    
+    return graph_document
+
+
+def main():
+    """Main execution function."""
+    # Parse arguments
+    args = parse_arguments()
+    
+    # Set logging level
+    logger.setLevel(getattr(logging, args.log_level))
+    
+    # Load a stored graph or extract a new one
+    if args.load_graph:
+        try:
+            if is_graph_store(args.load_graph):
+                graph_document = load_graph_store(args.load_graph)
+            else:
+                graph_document = load_graph(args.load_graph)
+            logger.info(f"Loaded graph from {args.load_graph}")
+        except Exception as e:
+            logger.error(f"Error loading graph {args.load_graph}: {e}")
+            sys.exit(1)
+    else:
+        graph_document = extract_from_arguments(args)
+    
+    # Display results (individual entries only for graphs that fit on a screen)
     logger.info(f"\n--- Extraction Results ---")
     logger.info(f"Nodes ({len(graph_document.nodes)}):")
-    for node in graph_document.nodes:
-        logger.info(f"  - {node.id} ({node.type}): {node.properties}")
+    if len(graph_document.nodes) <= LARGE_GRAPH_THRESHOLD:
+        for node in graph_document.nodes:
+            logger.info(f"  - {node.id} ({node.type}): {node.properties}")
     
     logger.info(f"\nRelationships ({len(graph_document.relationships)}):")
-    for rel in graph_document.relationships:
-        logger.info(f"  - {rel.source.id} --[{rel.type}]--> {rel.target.id}")
+    if len(graph_document.nodes) <= LARGE_GRAPH_THRESHOLD:
+        for rel in graph_document.relationships:
+            logger.info(f"  - {rel.source.id} --[{rel.type}]--> {rel.target.id}")
     
     # Export to JSON if requested
     if args.json_export:
-        if export_to_json(graph_document, args.json_export):
+        if export_to_json(graph_document, args.json_export, json_format=args.json_format):
             logger.info(f"Successfully exported to {args.json_export}")
     
+    # Save to the binary graph store if requested
+    if args.graph_store:
+        try:
+            save_graph_store(graph_document, args.graph_store)
+            logger.info(f"Graph saved to graph store: {args.graph_store}")
+        except Exception as e:
+            logger.error(f"Error saving graph store: {e}", exc_info=True)
+    
+    # Narrow down what is drawn
+    if args.ego:
+        graph_document = ego_graph(graph_document, args.ego, radius=args.ego_radius)
+        if graph_document is None:
+            logger.error(f"Node {args.ego} not found in the graph")
+            sys.exit(1)
+        logger.info(f"Ego graph of {args.ego}: {len(graph_document.nodes)} nodes")
+    
+    if args.aggregate != "none":
+        graph_document = aggregate_graph(graph_document, by=args.aggregate)
+        logger.info(f"Aggregated by {args.aggregate}: {len(graph_document.nodes)} nodes, "
+                   f"{len(graph_document.relationships)} relationships")
+    
+    large_graph = args.large_graph == "on" or (
+        args.large_graph == "auto" and len(graph_document.nodes) > LARGE_GRAPH_THRESHOLD
+    )
+    if large_graph:
+        logger.info("Using the large graph renderer")
+    
     # Visualize based on selected type
     success = True
     
     if args.viz_type in ["pyvis", "both"]:
-        success = visualize(
-            graph_document=graph_document,
-            output_file=args.output,
-            auto_open=not args.no_browser
-        ) and success
+        if large_graph:
+            success = visualize_large(
+                graph_document=graph_document,
+                output_file=args.output,
+                node_colors=DEFAULT_NODE_COLORS,
+                network_config=DEFAULT_NETWORK_CONFIG,
+                max_labels=args.max_labels,
+                auto_open=not args.no_browser
+            ) and success
+        else:
+            success = visualize(
+                graph_document=graph_document,
+                output_file=args.output,
+                auto_open=not args.no_browser
+            ) and success
     
     if args.viz_type in ["matplotlib", "both"]:
-        success = visualize_matplotlib(
-            graph_document=graph_document,
-            output_file=args.matplotlib_output,
-            show_plot=not args.no_browser
-        ) and success
+        if large_graph:
+            success = visualize_large_matplotlib(
+                graph_document=graph_document,
+                output_file=args.matplotlib_output,
+                node_colors=DEFAULT_NODE_COLORS,
+                max_labels=args.max_labels,
+                show_plot=not args.no_browser
+            ) and success
+        else:
+            success = visualize_matplotlib(
+                graph_document=graph_document,
+                output_file=args.matplotlib_output,
+                show_plot=not args.no_browser
+            ) and success
     
     if success:
         logger.info("Knowledge graph generation complete!")
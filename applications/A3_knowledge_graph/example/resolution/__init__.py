@@ -0,0 +1,5 @@
+"""Resolution module - canonicalizes entities and deduplicates relationships."""
+
+from .entity_resolution import merge_properties, normalize_entity_id, resolve_entities
+
+__all__ = ['merge_properties', 'normalize_entity_id', 'resolve_entities']
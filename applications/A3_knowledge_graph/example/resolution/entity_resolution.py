@@ -0,0 +1,228 @@
+"""
+Entity resolution for merged knowledge graphs.
+
+When a text is extracted chunk by chunk the same entity is reported under
+different surface forms ("MARIE CURIE", "Marie Curie", "Curie") and the same
+relationship is reported several times. This module collapses those duplicates.
+
+Everything is done with hash indexes (normalized id -> group, token -> names),
+never by comparing all pairs of nodes, so the cost stays close to linear in the
+size of the graph.
+"""
+
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from LLMGraphTransformer.schema import GraphDocument, Node, NodeSchema, Relationship
+
+
+# Names sharing a token with more than this many other names are not used for
+# partial matching: the token is too common to identify a single entity.
+MAX_PARTIAL_CANDIDATES = 64
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_entity_id(entity_id: Any) -> str:
+    """
+    Normalize an entity id for comparison.
+
+    Case, accents-composition, punctuation and repeated whitespace are ignored,
+    so "MARIE CURIE", "Marie  Curie" and "marie curie." normalize identically.
+
+    Args:
+        entity_id: Raw node id (str or int)
+
+    Returns:
+        Normalized id
+    """
+    text = unicodedata.normalize("NFKC", str(entity_id)).casefold()
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _same_value(a: Any, b: Any) -> bool:
+    """Compare property values loosely: 1867 and "1867 " are the same year."""
+    return a == b or str(a).strip().casefold() == str(b).strip().casefold()
+
+
+def merge_properties(target: Dict[str, Any], source: Dict[str, Any]) -> None:
+    """
+    Union the properties of source into target.
+
+    Missing keys are copied, equal values are kept once, and conflicting values
+    are collected into a list of distinct values in first-seen order. Values
+    that only differ in case, surrounding whitespace or str/int type are equal.
+
+    Args:
+        target: Properties to update in place
+        source: Properties to merge in
+    """
+    for name, value in source.items():
+        if name not in target:
+            target[name] = value
+            continue
+        current = target[name]
+        if _same_value(current, value):
+            continue
+        values = current if isinstance(current, list) else [current]
+        for item in (value if isinstance(value, list) else [value]):
+            if not any(_same_value(item, existing) for existing in values):
+                values = values + [item]
+        target[name] = values if len(values) > 1 else values[0]
+
+
+def _canonical_type(node_type: str, schema_types: Dict[str, str]) -> str:
+    """Map a node type onto the NodeSchema spelling (case-insensitive)."""
+    return schema_types.get(node_type.casefold(), node_type)
+
+
+def _resolve_partial_names(keys: Iterable[str]) -> Dict[str, str]:
+    """
+    Map short names onto the unique longer name that contains all their tokens.
+
+    "curie" maps onto "marie curie" if that is the only known name containing
+    "curie". Keys are processed longest first, so a chain like
+    "curie" -> "marie curie" -> "marie sklodowska curie" resolves to one root,
+    and ambiguous names ("curie" with both "marie curie" and "pierre curie")
+    are left alone.
+
+    Args:
+        keys: Normalized ids of a single node type
+
+    Returns:
+        Mapping of normalized id -> normalized id of its canonical entity
+    """
+    tokens_by_key = {key: frozenset(key.split()) for key in keys}
+    postings: Dict[str, List[str]] = defaultdict(list)
+    for key, tokens in tokens_by_key.items():
+        for token in tokens:
+            postings[token].append(key)
+
+    root: Dict[str, str] = {}
+    for key in sorted(tokens_by_key, key=lambda k: len(tokens_by_key[k]), reverse=True):
+        tokens = tokens_by_key[key]
+        if not tokens:
+            root[key] = key
+            continue
+        smallest = min((postings[token] for token in tokens), key=len)
+        if len(smallest) > MAX_PARTIAL_CANDIDATES:
+            root[key] = key
+            continue
+
+        roots = {
+            root[candidate]
+            for candidate in smallest
+            if candidate != key
+            and len(tokens_by_key[candidate]) > len(tokens)
+            and tokens < tokens_by_key[candidate]
+        }
+        root[key] = roots.pop() if len(roots) == 1 else key
+    return root
+
+
+def resolve_entities(
+    graph_document: GraphDocument,
+    node_schemas: Optional[List[NodeSchema]] = None,
+    match_partial_names: bool = True
+) -> GraphDocument:
+    """
+    Canonicalize nodes and deduplicate relationships of a graph document.
+
+    Nodes are grouped per node type (using the NodeSchema spelling of the type)
+    by their normalized id and, optionally, short names are attached to the
+    unique longer name containing them. Each group becomes one node whose id is
+    the most frequent surface form and whose properties are the union of the
+    group. Relationships are deduplicated by (source, type, target) with their
+    properties unioned; self-loops created only by merging are dropped.
+
+    Args:
+        graph_document: Graph to resolve (e.g. the merged result of all chunks)
+        node_schemas: Allowed node types, used to canonicalize type names
+        match_partial_names: Whether to merge "Curie" into "Marie Curie"
+
+    Returns:
+        New GraphDocument; usable by export_to_json and the visualizers as is
+    """
+    schema_types = {schema.type.casefold(): schema.type for schema in (node_schemas or [])}
+
+    # Index every mention (nodes and relationship endpoints) by (type, normalized id)
+    surface_forms: Dict[Tuple[str, str], Counter] = defaultdict(Counter)
+    properties: Dict[Tuple[str, str], Dict[str, Any]] = defaultdict(dict)
+    key_cache: Dict[Tuple[str, Any], Tuple[str, str]] = {}
+
+    def key_of(node: Node) -> Tuple[str, str]:
+        raw = (node.type, node.id)
+        key = key_cache.get(raw)
+        if key is None:
+            key = (_canonical_type(node.type, schema_types), normalize_entity_id(node.id))
+            key_cache[raw] = key
+        return key
+
+    def register(node: Node) -> Tuple[str, str]:
+        key = key_of(node)
+        surface_forms[key][node.id] += 1
+        merge_properties(properties[key], node.properties)
+        return key
+
+    for node in graph_document.nodes:
+        register(node)
+    for relationship in graph_document.relationships:
+        register(relationship.source)
+        register(relationship.target)
+
+    # Attach short names to their canonical long name, per node type
+    group_of: Dict[Tuple[str, str], Tuple[str, str]] = {key: key for key in surface_forms}
+    if match_partial_names:
+        keys_by_type: Dict[str, List[str]] = defaultdict(list)
+        for node_type, normalized in surface_forms:
+            keys_by_type[node_type].append(normalized)
+        for node_type, keys in keys_by_type.items():
+            for normalized, canonical in _resolve_partial_names(keys).items():
+                group_of[(node_type, normalized)] = (node_type, canonical)
+
+    # Build one node per group
+    group_forms: Dict[Tuple[str, str], Counter] = defaultdict(Counter)
+    group_properties: Dict[Tuple[str, str], Dict[str, Any]] = defaultdict(dict)
+    for key, group in group_of.items():
+        group_forms[group].update(surface_forms[key])
+    # Merge the canonical entity first so its values come first on conflicts
+    for key, group in sorted(group_of.items(), key=lambda item: item[0] != item[1]):
+        merge_properties(group_properties[group], properties[key])
+
+    nodes: Dict[Tuple[str, str], Node] = {}
+    for group, forms in group_forms.items():
+        # Most frequent surface form wins; ties go to the longest, then first seen
+        best = max(forms.items(), key=lambda item: (item[1], len(str(item[0]))))[0]
+        nodes[group] = Node(id=best, type=group[0], properties=group_properties[group])
+
+    # Deduplicate relationships on the resolved endpoints
+    relationships: Dict[Tuple[Tuple[str, str], str, Tuple[str, str]], Relationship] = {}
+    for relationship in graph_document.relationships:
+        source_key = key_of(relationship.source)
+        target_key = key_of(relationship.target)
+        source, target = group_of[source_key], group_of[target_key]
+        if source == target and source_key != target_key:
+            continue
+
+        key = (source, relationship.type, target)
+        merged = relationships.get(key)
+        if merged is None:
+            relationships[key] = Relationship(
+                source=nodes[source],
+                target=nodes[target],
+                type=relationship.type,
+                properties=dict(relationship.properties)
+            )
+        else:
+            merge_properties(merged.properties, relationship.properties)
+
+    return GraphDocument(
+        nodes=list(nodes.values()),
+        relationships=list(relationships.values()),
+        source=graph_document.source
+    )
+
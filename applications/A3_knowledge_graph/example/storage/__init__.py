@@ -0,0 +1,17 @@
+"""Storage module - streaming export, binary storage and loading of knowledge graphs."""
+
+from ai_common.graph_store import is_graph_store
+
+from .binary import load_graph_store, save_graph_store
+from .streaming import FORMATS, iter_graph_records, load_graph, write_compact_json, write_ndjson
+
+__all__ = [
+    'FORMATS',
+    'is_graph_store',
+    'iter_graph_records',
+    'load_graph',
+    'load_graph_store',
+    'save_graph_store',
+    'write_compact_json',
+    'write_ndjson',
+]
@@ -0,0 +1,67 @@
+"""
+GraphDocument <-> binary graph store conversion.
+
+The binary format (ai_common.graph_store) is shared with A6, so graphs stored
+here can be opened as A6 KnowledgeGraphs and vice versa. It loads without
+parsing: large graphs open instantly and can be queried through GraphStore
+directly, or converted back to a GraphDocument for visualization.
+"""
+
+from typing import Any, Dict, Tuple
+
+from ai_common.graph_store import GraphStore, write_graph_store
+from LLMGraphTransformer.schema import GraphDocument, Node, Relationship
+
+
+def save_graph_store(graph_document: GraphDocument, output_path: str) -> None:
+    """
+    Write a graph document in the binary graph store format.
+
+    Node ids are stored as strings.
+
+    Args:
+        graph_document: Graph to store
+        output_path: Destination file
+    """
+    index: Dict[Tuple[Any, str], int] = {}
+    nodes = []
+
+    def node_index(node: Node) -> int:
+        key = (node.id, node.type)
+        position = index.get(key)
+        if position is None:
+            position = len(nodes)
+            index[key] = position
+            nodes.append((node.id, node.type, node.properties))
+        return position
+
+    for node in graph_document.nodes:
+        node_index(node)
+    edges = [
+        (node_index(rel.source), node_index(rel.target), rel.type, rel.properties)
+        for rel in graph_document.relationships
+    ]
+    write_graph_store(output_path, nodes, edges)
+
+
+def load_graph_store(input_path: str) -> GraphDocument:
+    """
+    Load a binary graph store file into a GraphDocument.
+
+    Args:
+        input_path: File written by save_graph_store (or by A6)
+
+    Returns:
+        GraphDocument
+    """
+    with GraphStore(input_path) as store:
+        nodes = [
+            Node(id=node_id, type=node_type, properties=properties)
+            for node_id, node_type, properties in store.iter_nodes()
+        ]
+        relationships = [
+            Relationship(source=nodes[source], target=nodes[target], type=label, properties=properties)
+            for source, target, label, properties in store.iter_edges()
+        ]
+    return GraphDocument(nodes=nodes, relationships=relationships)
+
@@ -0,0 +1,148 @@
+"""
+Streaming graph export and loading.
+
+Nodes and relationships are written one record at a time, so exporting never
+builds a second copy of the graph in memory. Two formats are supported:
+
+- NDJSON: one JSON object per line, tagged with "kind" ("node"/"relationship")
+- compact JSON: the same {"nodes": [...], "relationships": [...]} document as
+  export_to_json, without indentation and with one record per line
+
+The loader reads both formats (and indented files written by export_to_json)
+back into a GraphDocument without re-running the extraction.
+"""
+
+import itertools
+import json
+from typing import Any, Dict, Iterator, Tuple
+
+from LLMGraphTransformer.schema import GraphDocument, Node, Relationship
+
+from extraction.serialization import GraphBuilder
+
+
+FORMATS = ("json", "compact", "ndjson")
+
+_COMPACT_HEADER = '{"nodes":['
+_COMPACT_SEPARATOR = '],"relationships":['
+_COMPACT_FOOTER = ']}'
+
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _node_record(node: Node) -> Dict[str, Any]:
+    return {"id": node.id, "type": node.type, "properties": node.properties}
+
+
+def _relationship_record(relationship: Relationship) -> Dict[str, Any]:
+    return {
+        "source": relationship.source.id,
+        "source_type": relationship.source.type,
+        "target": relationship.target.id,
+        "target_type": relationship.target.type,
+        "type": relationship.type,
+        "properties": relationship.properties,
+    }
+
+
+def write_ndjson(graph_document: GraphDocument, output_path: str) -> None:
+    """
+    Write a graph as NDJSON, one node or relationship per line.
+
+    Args:
+        graph_document: Graph to write
+        output_path: Destination file
+    """
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for node in graph_document.nodes:
+            f.write(_dumps({"kind": "node", **_node_record(node)}))
+            f.write("\n")
+        for relationship in graph_document.relationships:
+            f.write(_dumps({"kind": "relationship", **_relationship_record(relationship)}))
+            f.write("\n")
+
+
+def write_compact_json(graph_document: GraphDocument, output_path: str) -> None:
+    """
+    Write a graph as compact JSON, one record per line.
+
+    Args:
+        graph_document: Graph to write
+        output_path: Destination file
+    """
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(_COMPACT_HEADER)
+        for i, node in enumerate(graph_document.nodes):
+            f.write("\n" if i == 0 else ",\n")
+            f.write(_dumps(_node_record(node)))
+        f.write("\n" + _COMPACT_SEPARATOR)
+        for i, relationship in enumerate(graph_document.relationships):
+            f.write("\n" if i == 0 else ",\n")
+            f.write(_dumps(_relationship_record(relationship)))
+        f.write("\n" + _COMPACT_FOOTER + "\n")
+
+
+def iter_graph_records(input_path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Stream the records of an exported graph.
+
+    NDJSON and compact JSON files are read line by line; other JSON files
+    (e.g. indented export_to_json output) are parsed as a whole.
+
+    Args:
+        input_path: Exported graph file
+
+    Yields:
+        ("node", record) for every node, then ("relationship", record) for
+        every relationship
+    """
+    with open(input_path, 'r', encoding='utf-8') as f:
+        first_line = f.readline()
+        stripped = first_line.strip()
+
+        if stripped == _COMPACT_HEADER:
+            kind = "node"
+            for line in f:
+                line = line.strip()
+                if line == _COMPACT_SEPARATOR:
+                    kind = "relationship"
+                elif line and line != _COMPACT_FOOTER:
+                    yield kind, json.loads(line.rstrip(","))
+            return
+
+        if stripped.startswith("{") and '"kind"' not in stripped:
+            data = json.loads(first_line + f.read())
+            for record in data.get("nodes", []):
+                yield "node", record
+            for record in data.get("relationships", []):
+                yield "relationship", record
+            return
+
+        for line in itertools.chain([first_line], f):
+            if line.strip():
+                record = json.loads(line)
+                yield record.pop("kind"), record
+
+
+def load_graph(input_path: str) -> GraphDocument:
+    """
+    Load an exported graph (json, compact or ndjson) into a GraphDocument.
+
+    Relationship endpoints are matched by id and type when the file has the
+    endpoint types, otherwise by id only.
+
+    Args:
+        input_path: Exported graph file
+
+    Returns:
+        GraphDocument
+    """
+    builder = GraphBuilder()
+    for kind, record in iter_graph_records(input_path):
+        if kind == "node":
+            builder.add_node(record)
+        elif kind == "relationship":
+            builder.add_relationship(record)
+    return builder.build()
@@ -0,0 +1,21 @@
+"""Visualization module - layout and rendering of large knowledge graphs."""
+
+from .large_graph import (
+    DEFAULT_MAX_LABELS,
+    LARGE_GRAPH_THRESHOLD,
+    aggregate_graph,
+    ego_graph,
+    force_layout,
+    visualize_large,
+    visualize_large_matplotlib,
+)
+
+__all__ = [
+    'DEFAULT_MAX_LABELS',
+    'LARGE_GRAPH_THRESHOLD',
+    'aggregate_graph',
+    'ego_graph',
+    'force_layout',
+    'visualize_large',
+    'visualize_large_matplotlib',
+]
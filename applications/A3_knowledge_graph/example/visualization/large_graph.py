@@ -0,0 +1,462 @@
+"""
+Visualization of large knowledge graphs.
+
+The default visualizers let the browser (pyvis physics) or networkx
+(spring_layout) compute the layout and draw every label, which does not scale
+past a few thousand nodes. Here the layout is computed once, offline, with a
+vectorized force-directed algorithm, browser physics is disabled, only the
+labels of the most connected nodes are drawn, and the graph can be reduced to
+an ego subgraph or aggregated by node type / community before drawing.
+
+Layout: Fruchterman-Reingold forces where the all-pairs repulsion is computed
+on a grid (particle-mesh): node density is binned on a G x G mesh and
+convolved with the repulsion kernel using FFTs, so each iteration costs
+O(n + m + G^2 log G) instead of O(n^2).
+"""
+
+import logging
+import os
+import webbrowser
+from collections import Counter, defaultdict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import matplotlib.pyplot as plt
+import networkx as nx
+import numpy as np
+from LLMGraphTransformer.schema import GraphDocument, Node, Relationship
+from matplotlib.collections import LineCollection
+from pyvis.network import Network
+
+from resolution import normalize_entity_id
+
+
+logger = logging.getLogger(__name__)
+
+# Graphs with more nodes than this are drawn with the large graph pipeline
+LARGE_GRAPH_THRESHOLD = 1000
+DEFAULT_MAX_LABELS = 200
+
+_LARGE_GRAPH_OPTIONS = """
+{
+    "physics": {"enabled": false},
+    "edges": {"smooth": false, "arrows": {"to": {"enabled": true, "scaleFactor": 0.4}}},
+    "interaction": {"hideEdgesOnDrag": true, "hideEdgesOnZoom": true, "tooltipDelay": 100},
+    "layout": {"improvedLayout": false}
+}
+"""
+
+
+def graph_arrays(graph_document: GraphDocument) -> Tuple[List[Node], np.ndarray, np.ndarray]:
+    """
+    Index the nodes of a graph and express its edges as index arrays.
+
+    Args:
+        graph_document: Graph to index
+
+    Returns:
+        Tuple of (nodes, source indexes, target indexes); relationship
+        endpoints missing from the node list are appended to `nodes`
+    """
+    index: Dict[Tuple[Any, str], int] = {}
+    nodes: List[Node] = []
+
+    def node_index(node: Node) -> int:
+        key = (node.id, node.type)
+        position = index.get(key)
+        if position is None:
+            position = len(nodes)
+            index[key] = position
+            nodes.append(node)
+        return position
+
+    for node in graph_document.nodes:
+        node_index(node)
+    sources = np.fromiter((node_index(rel.source) for rel in graph_document.relationships),
+                          dtype=np.int64, count=len(graph_document.relationships))
+    targets = np.fromiter((node_index(rel.target) for rel in graph_document.relationships),
+                          dtype=np.int64, count=len(graph_document.relationships))
+    return nodes, sources, targets
+
+
+def _repulsion_kernels(grid_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    FFTs of the repulsion kernel d / |d|^2 on a zero-padded grid, in cell units.
+
+    The physical kernel k^2 * d / |d|^2 only differs by the factor k^2 / cell,
+    so these are computed once per layout.
+    """
+    size = 2 * grid_size
+    offsets = np.fft.fftfreq(size, 1.0 / size)
+    dx, dy = np.meshgrid(offsets, offsets, indexing="ij")
+    r2 = dx * dx + dy * dy
+    r2[0, 0] = np.inf
+    return np.fft.rfft2(dx / r2), np.fft.rfft2(dy / r2)
+
+
+def _repulsion_field(
+    positions: np.ndarray,
+    k: float,
+    grid_size: int,
+    kernels: Tuple[np.ndarray, np.ndarray]
+) -> np.ndarray:
+    """Approximate the repulsive force on every node with an FFT convolution."""
+    low = positions.min(axis=0)
+    span = max(float((positions.max(axis=0) - low).max()), 1e-9) * 1.0001
+    cell = span / grid_size
+    cells = np.minimum(((positions - low) / cell).astype(np.int64), grid_size - 1)
+
+    size = 2 * grid_size
+    density = np.zeros((size, size))
+    np.add.at(density, (cells[:, 0], cells[:, 1]), 1.0)
+
+    # Repulsion k^2 / r along the unit vector, i.e. k^2 * d / |d|^2
+    density_hat = np.fft.rfft2(density) * (k * k / cell)
+    field_x = np.fft.irfft2(density_hat * kernels[0], s=(size, size))
+    field_y = np.fft.irfft2(density_hat * kernels[1], s=(size, size))
+    return np.stack([field_x[cells[:, 0], cells[:, 1]], field_y[cells[:, 0], cells[:, 1]]], axis=1)
+
+
+def force_layout(
+    n_nodes: int,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    iterations: int = 50,
+    seed: int = 42
+) -> np.ndarray:
+    """
+    Compute a force-directed layout with vectorized NumPy operations.
+
+    Args:
+        n_nodes: Number of nodes
+        sources: Edge source node indexes
+        targets: Edge target node indexes
+        iterations: Number of simulation steps
+        seed: Random seed of the initial positions
+
+    Returns:
+        Array of shape (n_nodes, 2) with positions in the unit square
+    """
+    if n_nodes == 0:
+        return np.zeros((0, 2))
+    if n_nodes == 1:
+        return np.full((1, 2), 0.5)
+
+    rng = np.random.default_rng(seed)
+    positions = rng.random((n_nodes, 2))
+    k = 1.0 / np.sqrt(n_nodes)  # Ideal edge length in the unit square
+    grid_size = int(np.clip(np.sqrt(n_nodes), 16, 256))
+    kernels = _repulsion_kernels(grid_size)
+    mask = sources != targets
+    sources, targets = sources[mask], targets[mask]
+
+    temperature = 0.1
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        displacement = _repulsion_field(positions, k, grid_size, kernels)
+
+        # Attraction along edges: |d|^2 / k along the unit vector
+        delta = positions[targets] - positions[sources]
+        distance = np.sqrt((delta * delta).sum(axis=1, keepdims=True))
+        pull = delta * distance / k
+        for axis in (0, 1):
+            displacement[:, axis] += np.bincount(sources, weights=pull[:, axis], minlength=n_nodes)
+            displacement[:, axis] -= np.bincount(targets, weights=pull[:, axis], minlength=n_nodes)
+
+        # Move at most `temperature` per step
+        length = np.sqrt((displacement * displacement).sum(axis=1, keepdims=True))
+        positions += displacement / np.maximum(length, 1e-12) * np.minimum(length, temperature)
+        temperature -= cooling
+
+    low = positions.min(axis=0)
+    span = np.maximum(positions.max(axis=0) - low, 1e-9)
+    return (positions - low) / span.max()
+
+
+def label_mask(degrees: np.ndarray, max_labels: int) -> np.ndarray:
+    """
+    Select the nodes whose label is drawn: the `max_labels` highest degrees.
+
+    Args:
+        degrees: Degree of every node
+        max_labels: Maximum number of labels
+
+    Returns:
+        Boolean mask over the nodes
+    """
+    mask = np.zeros(len(degrees), dtype=bool)
+    if max_labels > 0 and len(degrees):
+        top = np.argpartition(-degrees, min(max_labels, len(degrees)) - 1)[:max_labels]
+        mask[top] = True
+    return mask
+
+
+def ego_graph(graph_document: GraphDocument, center_id: Any, radius: int = 1) -> Optional[GraphDocument]:
+    """
+    Extract the subgraph within `radius` hops of a node (edge direction ignored).
+
+    Args:
+        graph_document: Full graph
+        center_id: Id of the center node; matched exactly first, then
+            case/punctuation-insensitively
+        radius: Maximum number of hops from the center
+
+    Returns:
+        The ego subgraph, or None if no node matches center_id
+    """
+    nodes, sources, targets = graph_arrays(graph_document)
+    centers = [i for i, node in enumerate(nodes) if node.id == center_id]
+    if not centers:
+        normalized = normalize_entity_id(center_id)
+        centers = [i for i, node in enumerate(nodes) if normalize_entity_id(node.id) == normalized]
+    if not centers:
+        return None
+
+    adjacency: Dict[int, List[int]] = defaultdict(list)
+    for source, target in zip(sources.tolist(), targets.tolist()):
+        adjacency[source].append(target)
+        adjacency[target].append(source)
+
+    distance = {center: 0 for center in centers}
+    queue = deque(centers)
+    while queue:
+        current = queue.popleft()
+        if distance[current] == radius:
+            continue
+        for neighbor in adjacency[current]:
+            if neighbor not in distance:
+                distance[neighbor] = distance[current] + 1
+                queue.append(neighbor)
+
+    relationships = [
+        rel for rel, source, target in zip(graph_document.relationships, sources.tolist(), targets.tolist())
+        if source in distance and target in distance
+    ]
+    return GraphDocument(nodes=[nodes[i] for i in sorted(distance)], relationships=relationships)
+
+
+def aggregate_graph(graph_document: GraphDocument, by: str = "type") -> GraphDocument:
+    """
+    Collapse the graph into one node per node type or per community.
+
+    Aggregated nodes carry the number of members and the most connected
+    member ids; aggregated relationships carry the number of edges they
+    represent and are labeled with the most frequent relationship type.
+
+    Args:
+        graph_document: Graph to aggregate
+        by: "type" (node type) or "community" (Louvain communities)
+
+    Returns:
+        Aggregated GraphDocument
+    """
+    nodes, sources, targets = graph_arrays(graph_document)
+    if by == "type":
+        groups = [node.type for node in nodes]
+    elif by == "community":
+        nx_g = nx.Graph()
+        nx_g.add_nodes_from(range(len(nodes)))
+        nx_g.add_edges_from(zip(sources.tolist(), targets.tolist()))
+        groups = [""] * len(nodes)
+        for number, members in enumerate(nx.community.louvain_communities(nx_g, seed=42)):
+            for member in members:
+                groups[member] = f"Community {number}"
+    else:
+        raise ValueError(f"Unknown aggregation: {by}")
+
+    degrees = np.bincount(np.concatenate([sources, targets]), minlength=len(nodes))
+    members: Dict[str, List[int]] = defaultdict(list)
+    for i, group in enumerate(groups):
+        members[group].append(i)
+
+    group_nodes = {}
+    for group, indexes in members.items():
+        types = Counter(nodes[i].type for i in indexes)
+        top = sorted(indexes, key=lambda i: -degrees[i])[:5]
+        group_nodes[group] = Node(
+            id=group,
+            type=types.most_common(1)[0][0],
+            properties={"members": len(indexes), "top_members": ", ".join(str(nodes[i].id) for i in top)}
+        )
+
+    edge_types: Dict[Tuple[str, str], Counter] = defaultdict(Counter)
+    for rel, source, target in zip(graph_document.relationships, sources.tolist(), targets.tolist()):
+        edge_types[(groups[source], groups[target])][rel.type] += 1
+
+    relationships = [
+        Relationship(
+            source=group_nodes[source],
+            target=group_nodes[target],
+            type=types.most_common(1)[0][0],
+            properties={"count": sum(types.values()), "types": dict(types)}
+        )
+        for (source, target), types in edge_types.items()
+    ]
+    return GraphDocument(nodes=list(group_nodes.values()), relationships=relationships)
+
+
+def _node_sizes(nodes: List[Node], degrees: np.ndarray) -> np.ndarray:
+    """Node size grows with degree, or with member count for aggregated graphs."""
+    if nodes and all("members" in node.properties for node in nodes):
+        weights = np.array([float(node.properties["members"]) for node in nodes])
+    else:
+        weights = degrees.astype(float)
+    if not len(weights):
+        return weights
+    return 5 + 25 * np.sqrt(weights / max(weights.max(), 1.0))
+
+
+def visualize_large(
+    graph_document: GraphDocument,
+    output_file: str,
+    node_colors: Dict[str, str],
+    network_config: Dict[str, Any],
+    max_labels: int = DEFAULT_MAX_LABELS,
+    iterations: int = 50,
+    auto_open: bool = True
+) -> bool:
+    """
+    Render a large graph as a static-layout interactive HTML page.
+
+    Args:
+        graph_document: Graph to visualize
+        output_file: Path to save the HTML file
+        node_colors: Color mapping for node types (with a "default" entry)
+        network_config: Network configuration (see DEFAULT_NETWORK_CONFIG)
+        max_labels: Number of most connected nodes whose label is drawn
+        iterations: Layout iterations
+        auto_open: Whether to automatically open the graph in browser
+
+    Returns:
+        True if visualization was successful, False otherwise
+    """
+    try:
+        nodes, sources, targets = graph_arrays(graph_document)
+        logger.info(f"Computing layout for {len(nodes)} nodes, {len(sources)} edges...")
+        positions = force_layout(len(nodes), sources, targets, iterations=iterations)
+        degrees = np.bincount(np.concatenate([sources, targets]), minlength=len(nodes))
+        labeled = label_mask(degrees, max_labels)
+        sizes = _node_sizes(nodes, degrees)
+        scale = 500 + 40 * np.sqrt(len(nodes))
+
+        net = Network(
+            height=network_config["height"],
+            width=network_config["width"],
+            bgcolor=network_config["bgcolor"],
+            font_color=network_config["font_color"],
+            directed=network_config["directed"]
+        )
+        net.set_options(_LARGE_GRAPH_OPTIONS)
+
+        # Network.add_node/add_edge check for duplicates with a linear scan
+        # (quadratic for the whole graph); nodes here are unique by
+        # construction, so the vis.js records are appended directly
+        for i, node in enumerate(nodes):
+            title = f"{node.id}<br>Type: {node.type}<br>" + "<br>".join(
+                [f"{k}: {v}" for k, v in node.properties.items()]
+            )
+            options = {
+                "id": i,
+                "label": str(node.id) if labeled[i] else " ",
+                "shape": "dot",
+                "color": node_colors.get(node.type, node_colors["default"]),
+                "title": title,
+                "size": float(sizes[i]),
+                "x": float(positions[i, 0] * scale),
+                "y": float(positions[i, 1] * scale),
+                "physics": False,
+                "font": {"color": network_config["font_color"]},
+            }
+            net.nodes.append(options)
+            net.node_ids.append(i)
+            net.node_map[i] = options
+
+        for rel, source, target in zip(graph_document.relationships, sources.tolist(), targets.tolist()):
+            title = rel.type
+            if rel.properties:
+                title += "<br>" + "<br>".join([f"{k}: {v}" for k, v in rel.properties.items()])
+            net.edges.append({"from": source, "to": target, "title": title, "arrows": "to"})
+
+        net.save_graph(output_file)
+        logger.info(f"Knowledge graph saved to {output_file}")
+
+        if auto_open:
+            try:
+                webbrowser.open(f"file://{os.path.abspath(output_file)}")
+                logger.info("Graph opened in browser")
+            except Exception as e:
+                logger.warning(f"Could not open browser automatically: {e}")
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Error during large graph visualization: {e}", exc_info=True)
+        return False
+
+
+def visualize_large_matplotlib(
+    graph_document: GraphDocument,
+    output_file: str,
+    node_colors: Dict[str, str],
+    figsize: tuple = (16, 12),
+    max_labels: int = DEFAULT_MAX_LABELS,
+    iterations: int = 50,
+    show_plot: bool = True
+) -> bool:
+    """
+    Render a large graph as a static image.
+
+    Edges are drawn as a single LineCollection and nodes as a single scatter
+    plot; edge labels are omitted and only the top `max_labels` node labels
+    are drawn.
+
+    Args:
+        graph_document: Graph to visualize
+        output_file: Path to save the PNG file
+        node_colors: Color mapping for node types (with a "default" entry)
+        figsize: Figure size as (width, height) tuple
+        max_labels: Number of most connected nodes whose label is drawn
+        iterations: Layout iterations
+        show_plot: Whether to display the plot interactively
+
+    Returns:
+        True if visualization was successful, False otherwise
+    """
+    try:
+        nodes, sources, targets = graph_arrays(graph_document)
+        logger.info(f"Computing layout for {len(nodes)} nodes, {len(sources)} edges...")
+        positions = force_layout(len(nodes), sources, targets, iterations=iterations)
+        degrees = np.bincount(np.concatenate([sources, targets]), minlength=len(nodes))
+        labeled = label_mask(degrees, max_labels)
+        sizes = _node_sizes(nodes, degrees)
+
+        fig, ax = plt.subplots(figsize=figsize)
+        segments = np.stack([positions[sources], positions[targets]], axis=1)
+        ax.add_collection(LineCollection(segments, colors="gray", linewidths=0.3, alpha=0.3))
+        ax.scatter(
+            positions[:, 0],
+            positions[:, 1],
+            s=sizes * 2,
+            c=[node_colors.get(node.type, node_colors["default"]) for node in nodes],
+            edgecolors="none",
+            alpha=0.9
+        )
+        for i in np.flatnonzero(labeled):
+            ax.annotate(str(nodes[i].id), positions[i], fontsize=6, ha="center", va="bottom")
+
+        ax.set_title(f"Knowledge Graph Visualization ({len(nodes)} nodes, {len(sources)} edges)",
+                     fontsize=16, fontweight="bold")
+        ax.axis("off")
+        fig.tight_layout()
+        fig.savefig(output_file, dpi=200, bbox_inches="tight", facecolor="white")
+        logger.info(f"Knowledge graph saved to {output_file}")
+
+        if show_plot:
+            plt.show()
+        else:
+            plt.close(fig)
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Error during large graph matplotlib visualization: {e}", exc_info=True)
+        return False
@@ -2,7 +2,7 @@ import person.person as person
 import json
 from typing import Any
 
-from langchain_ollama import ChatOllama
+from ai_common.ollama_chat import SharedChatOllama
 from langchain.agents import create_agent
 
 json_schema: dict[str, Any] = person.Person.model_json_schema()
@@ -12,7 +12,7 @@ print(json.dumps(json_schema, indent=2))
 model = "llama3.1:8b"   #model need to support tool calling
 temperature = 0
 
-llm = ChatOllama(
+llm = SharedChatOllama(
     model=model,
     temperature=temperature,
 )
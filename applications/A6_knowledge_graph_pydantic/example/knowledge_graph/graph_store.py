@@ -0,0 +1,63 @@
+"""
+KnowledgeGraph <-> binary graph store conversion.
+
+The binary format (ai_common.graph_store) is shared with A3, so graphs stored
+by A3 can be opened here as KnowledgeGraphs and vice versa.
+"""
+
+from ai_common.graph_store import GraphStore, write_graph_store
+
+from knowledge_graph.knowledge_graph import Edge, KnowledgeGraph, Node
+
+
+def save_knowledge_graph(kg: KnowledgeGraph, output_path: str) -> None:
+    """
+    Write a knowledge graph in the binary graph store format.
+
+    Args:
+        kg: Knowledge graph to store
+        output_path: Destination file
+    """
+    index = {}
+    nodes = []
+
+    def node_index(node_id: str, node_type: str = "Node", properties: dict | None = None) -> int:
+        position = index.get(node_id)
+        if position is None:
+            position = len(nodes)
+            index[node_id] = position
+            nodes.append((node_id, node_type, properties or {}))
+        return position
+
+    for node in kg.nodes:
+        node_index(node.id, node.type, node.properties)
+    # Edges may reference ids that are not in the node list
+    edges = [
+        (node_index(edge.source), node_index(edge.target), edge.relationship, {})
+        for edge in kg.edges
+    ]
+    write_graph_store(output_path, nodes, edges)
+
+
+def load_knowledge_graph(input_path: str) -> KnowledgeGraph:
+    """
+    Load a binary graph store file (written by A6 or A3) as a knowledge graph.
+
+    Edge properties are not part of the KnowledgeGraph model and are dropped.
+
+    Args:
+        input_path: Graph store file
+
+    Returns:
+        KnowledgeGraph
+    """
+    with GraphStore(input_path) as store:
+        nodes = [
+            Node(id=node_id, type=node_type, properties=properties or None)
+            for node_id, node_type, properties in store.iter_nodes()
+        ]
+        edges = [
+            Edge(source=nodes[source].id, target=nodes[target].id, relationship=label)
+            for source, target, label, _ in store.iter_edges()
+        ]
+    return KnowledgeGraph(nodes=nodes, edges=edges)
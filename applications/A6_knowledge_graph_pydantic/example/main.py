@@ -1,8 +1,9 @@
 import knowledge_graph.knowledge_graph as knowledge_graph
+import knowledge_graph.graph_store as graph_store
 import json
 from typing import Any
 
-from langchain_ollama import ChatOllama
+from ai_common.ollama_chat import SharedChatOllama
 from langchain.agents import create_agent
 
 from bs4 import BeautifulSoup
@@ -16,7 +17,7 @@ print(json.dumps(json_schema, indent=2))
 model = "llama3.1:8b"   #model need to support tool calling
 temperature = 0
 
-llm = ChatOllama(
+llm = SharedChatOllama(
     model=model,
     temperature=temperature,
 )
@@ -78,5 +79,8 @@ def generate_knowledge_graph(url: str) -> knowledge_graph.KnowledgeGraph:
 kg = generate_knowledge_graph("https://en.wikipedia.org/wiki/Ant%C3%B3nio_Jos%C3%A9_Seguro")
 print(f"result: {kg}")
 
+#binary graph store, can be opened by A3 too (uv run main.py --load-graph knowledge_graph.kgs)
+graph_store.save_knowledge_graph(kg, "knowledge_graph.kgs")
+
 #vizualization.render_graph(kg)
 vizualization.visualize_knowledge_graph_pyvis(kg)
\ No newline at end of file
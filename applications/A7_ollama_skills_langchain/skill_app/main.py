@@ -1,8 +1,8 @@
-from langchain_ollama import ChatOllama
+from ai_common.ollama_chat import SharedChatOllama
 from langchain.agents import create_agent
 import middleware
 
-llm = ChatOllama(
+llm = SharedChatOllama(
     model="llama3.1:8b",
     temperature=0,
     # other params...
@@ -9,17 +9,28 @@ class SkillMiddleware(AgentMiddleware):
     """Middleware that injects skill descriptions into the system prompt."""
 
     # Register the load_skill tool as a class variable
-    tools = [tools.load_skill, tools.list_skill]  
+    tools = [tools.load_skill, tools.load_skill_resource, tools.list_skill]  
 
     def __init__(self):
         """Initialize and generate the skills prompt from SKILLS."""
-        # Build skills prompt from the SKILLS list
-        skills_list = []
-        for skill in SKILLS:
-            skills_list.append(
-                f"- **{skill['name']}**: {skill['description']}"
-            )
-        self.skills_prompt = "\n".join(skills_list)
+        self._skills_version = None
+        self._skills_prompt = ""
+
+    @property
+    def skills_prompt(self) -> str:
+        """Skill list for the system prompt, rebuilt when the skill files change."""
+        skills = list(SKILLS)
+        version = SKILLS.version
+        if self._skills_version != version:
+            # Build skills prompt from the SKILLS list
+            skills_list = []
+            for skill in skills:
+                skills_list.append(
+                    f"- **{skill['name']}**: {skill['description']}"
+                )
+            self._skills_prompt = "\n".join(skills_list)
+            self._skills_version = version
+        return self._skills_prompt
 
     def wrap_model_call(
         self,
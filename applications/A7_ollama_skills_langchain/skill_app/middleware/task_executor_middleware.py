@@ -26,6 +26,7 @@ class TaskExecutorMiddleware(AgentMiddleware):
         tools.calculator,
         tools.unit_converter,
         tools.kubectl_exec,
+        tools.read_output,
         tools.file_reader,
         tools.web_search,
     ]
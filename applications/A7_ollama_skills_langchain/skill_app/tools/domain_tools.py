@@ -1,7 +1,10 @@
 """Domain-specific tools that skills can use."""
 
 from langchain.tools import tool
-import subprocess
+
+from ai_common.output_capture import CapturedOutput, capture_text, read_spooled, run_captured
+
+from .kubectl_native import run_kubectl
 
 
 @tool
@@ -102,6 +105,14 @@ def kubectl_exec(command: str, namespace: str = "default") -> str:
         - Read-only commands are encouraged (get, describe, logs)
         - Write operations (delete, apply) should be confirmed with user first
     """
+    # get/describe/logs/top are answered in-process, everything else runs kubectl.
+    # Long outputs are shortened to head and tail, the rest is kept for read_output
+    output = run_kubectl(command, namespace)
+    if isinstance(output, CapturedOutput):
+        return output.to_text()
+    if output is not None:
+        return capture_text(output).to_text()
+
     try:
         # Build the full command
         cmd = ["kubectl"]
@@ -113,25 +124,37 @@ def kubectl_exec(command: str, namespace: str = "default") -> str:
         # Add the user's command
         cmd.extend(command.split())
 
-        # Execute the command
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        # Execute the command, the output is captured while it runs
+        result = run_captured(cmd, timeout=30)
 
-        if result.returncode != 0:
-            return f"Error: {result.stderr}"
+        if result.timed_out:
+            return "Error: Command timed out after 30 seconds"
+        if result.exit_code != 0:
+            return f"Error: {result.stderr.to_text()}"
 
-        return result.stdout
+        return result.stdout.to_text()
 
-    except subprocess.TimeoutExpired:
-        return "Error: Command timed out after 30 seconds"
     except Exception as e:
         return f"Error executing kubectl command: {str(e)}"
 
 
+@tool
+def read_output(output_id: str, offset: int = 0) -> str:
+    """Reads more of a long command output that was shortened.
+
+    Long outputs are returned as head and tail with a marker like
+    "... [N bytes omitted ..., read them with read_output(output_id="ab12cd34", offset=6000)] ...".
+
+    Args:
+        output_id: The id from the marker
+        offset: Byte offset to start reading at (from the marker or the previous page)
+
+    Returns:
+        The part of the output and the offset of the next page
+    """
+    return read_spooled(output_id, offset)
+
+
 @tool
 def file_reader(file_path: str) -> str:
     """Reads the contents of a file.
@@ -0,0 +1,660 @@
+"""In-process fast path for read-only kubectl commands.
+
+`kubectl_exec` used to start a kubectl process for every call, which parses
+the kubeconfig and opens a new TLS connection each time. The common read
+verbs are answered here with one persistent Kubernetes API client instead:
+
+    get <type> [name...]       tables like kubectl (-o wide/name/json/yaml)
+    describe <type> [name...]  the object as YAML (without managedFields) and its events
+    logs <pod>                 -c, --tail, --since, --previous, --timestamps, --limit-bytes
+    top pods|nodes [name]      from the metrics API
+
+with -n/--namespace, -A/--all-namespaces, -l/--selector and --field-selector.
+Responses are parsed as plain JSON, no model objects are built.
+
+`run_kubectl(command, namespace)` returns None for everything it doesn't
+understand (other verbs, resource types or flags, API errors other than
+403/404), and kubectl_exec falls back to the kubectl process.
+"""
+
+import json
+import shlex
+import threading
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import yaml
+from kubernetes import client, config
+from kubernetes.client.rest import ApiException
+from kubernetes.utils import parse_quantity
+
+from ai_common.output_capture import CapturedOutput, OutputCapture
+
+
+# --- client -------------------------------------------------------------
+
+_lock = threading.Lock()
+_api_client: Optional[client.ApiClient] = None
+_default_namespace = "default"
+
+
+def get_api_client() -> client.ApiClient:
+    """Shared ApiClient, the kubeconfig (or in-cluster config) is loaded on first use."""
+    global _api_client, _default_namespace
+    if _api_client is None:
+        with _lock:
+            if _api_client is None:
+                configuration = client.Configuration()
+                try:
+                    config.load_kube_config(client_configuration=configuration)
+                    _, context = config.list_kube_config_contexts()
+                    _default_namespace = (context or {}).get("context", {}).get("namespace") or "default"
+                except Exception:
+                    config.load_incluster_config(client_configuration=configuration)
+                _api_client = client.ApiClient(configuration)
+    return _api_client
+
+
+def reset() -> None:
+    """Drop the shared client, the next call loads the config again (e.g. after switching the context)."""
+    global _api_client
+    with _lock:
+        _api_client = None
+
+
+def _api(name: str) -> Any:
+    return getattr(client, name)(get_api_client())
+
+
+# --- formatting ---------------------------------------------------------
+
+def age(timestamp: Optional[str]) -> str:
+    """Age of an API timestamp the way kubectl shows it (45s, 12m, 5h, 3d)."""
+    if not timestamp:
+        return "<unknown>"
+    created = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    seconds = int((datetime.now(timezone.utc) - created).total_seconds())
+    if seconds < 120:
+        return f"{max(seconds, 0)}s"
+    if seconds < 3 * 3600:
+        return f"{seconds // 60}m"
+    if seconds < 48 * 3600:
+        return f"{seconds // 3600}h"
+    return f"{seconds // 86400}d"
+
+
+def table(header: List[str], rows: List[List[Any]]) -> str:
+    """Tab separated table, one header line and one line per object."""
+    lines = ["\t".join(header)]
+    lines.extend("\t".join("<none>" if value in (None, "") else str(value) for value in row) for row in rows)
+    return "\n".join(lines)
+
+
+def compact(obj: Dict[str, Any]) -> Dict[str, Any]:
+    """Object without the fields nobody reads (managedFields, last-applied-configuration)."""
+    metadata = obj.get("metadata") or {}
+    metadata.pop("managedFields", None)
+    annotations = metadata.get("annotations") or {}
+    annotations.pop("kubectl.kubernetes.io/last-applied-configuration", None)
+    if "annotations" in metadata and not annotations:
+        del metadata["annotations"]
+    return obj
+
+
+def _meta(obj: Dict[str, Any]) -> Dict[str, Any]:
+    return obj.get("metadata") or {}
+
+
+def _pod_status(pod: Dict[str, Any]) -> str:
+    if _meta(pod).get("deletionTimestamp"):
+        return "Terminating"
+    status = pod.get("status") or {}
+    for container in (status.get("initContainerStatuses") or []):
+        state = container.get("state") or {}
+        reason = (state.get("waiting") or {}).get("reason")
+        if reason:
+            return f"Init:{reason}"
+    for container in (status.get("containerStatuses") or []):
+        state = container.get("state") or {}
+        reason = (state.get("waiting") or {}).get("reason") or (state.get("terminated") or {}).get("reason")
+        if reason:
+            return reason
+    return status.get("reason") or status.get("phase") or "Unknown"
+
+
+def pod_row(pod: Dict[str, Any], wide: bool) -> List[Any]:
+    status = pod.get("status") or {}
+    containers = status.get("containerStatuses") or []
+    ready = sum(1 for container in containers if container.get("ready"))
+    total = len((pod.get("spec") or {}).get("containers") or containers)
+    restarts = sum(container.get("restartCount", 0) for container in containers)
+    row = [_meta(pod).get("name"), f"{ready}/{total}", _pod_status(pod), restarts, age(_meta(pod).get("creationTimestamp"))]
+    if wide:
+        row += [status.get("podIP"), (pod.get("spec") or {}).get("nodeName")]
+    return row
+
+
+def _ports(service: Dict[str, Any]) -> str:
+    ports = []
+    for port in (service.get("spec") or {}).get("ports") or []:
+        text = str(port.get("port"))
+        if port.get("nodePort"):
+            text += f":{port['nodePort']}"
+        ports.append(f"{text}/{port.get('protocol', 'TCP')}")
+    return ",".join(ports)
+
+
+def service_row(service: Dict[str, Any], wide: bool) -> List[Any]:
+    spec = service.get("spec") or {}
+    ingress = ((service.get("status") or {}).get("loadBalancer") or {}).get("ingress") or []
+    external = ",".join(item.get("ip") or item.get("hostname") or "" for item in ingress) or ",".join(spec.get("externalIPs") or [])
+    row = [_meta(service).get("name"), spec.get("type"), spec.get("clusterIP"), external, _ports(service),
+           age(_meta(service).get("creationTimestamp"))]
+    if wide:
+        row.append(",".join(f"{key}={value}" for key, value in (spec.get("selector") or {}).items()))
+    return row
+
+
+def deployment_row(deployment: Dict[str, Any], wide: bool) -> List[Any]:
+    status = deployment.get("status") or {}
+    replicas = (deployment.get("spec") or {}).get("replicas", 0)
+    return [_meta(deployment).get("name"), f"{status.get('readyReplicas', 0)}/{replicas}",
+            status.get("updatedReplicas", 0), status.get("availableReplicas", 0),
+            age(_meta(deployment).get("creationTimestamp"))]
+
+
+def replica_set_row(replica_set: Dict[str, Any], wide: bool) -> List[Any]:
+    status = replica_set.get("status") or {}
+    return [_meta(replica_set).get("name"), (replica_set.get("spec") or {}).get("replicas", 0),
+            status.get("replicas", 0), status.get("readyReplicas", 0), age(_meta(replica_set).get("creationTimestamp"))]
+
+
+def stateful_set_row(stateful_set: Dict[str, Any], wide: bool) -> List[Any]:
+    status = stateful_set.get("status") or {}
+    replicas = (stateful_set.get("spec") or {}).get("replicas", 0)
+    return [_meta(stateful_set).get("name"), f"{status.get('readyReplicas', 0)}/{replicas}",
+            age(_meta(stateful_set).get("creationTimestamp"))]
+
+
+def daemon_set_row(daemon_set: Dict[str, Any], wide: bool) -> List[Any]:
+    status = daemon_set.get("status") or {}
+    return [_meta(daemon_set).get("name"), status.get("desiredNumberScheduled", 0), status.get("currentNumberScheduled", 0),
+            status.get("numberReady", 0), status.get("updatedNumberScheduled", 0), status.get("numberAvailable", 0),
+            age(_meta(daemon_set).get("creationTimestamp"))]
+
+
+def job_row(job: Dict[str, Any], wide: bool) -> List[Any]:
+    completions = (job.get("spec") or {}).get("completions", 1)
+    succeeded = (job.get("status") or {}).get("succeeded", 0)
+    return [_meta(job).get("name"), f"{succeeded}/{completions}", age(_meta(job).get("creationTimestamp"))]
+
+
+def cron_job_row(cron_job: Dict[str, Any], wide: bool) -> List[Any]:
+    spec = cron_job.get("spec") or {}
+    status = cron_job.get("status") or {}
+    last = status.get("lastScheduleTime")
+    return [_meta(cron_job).get("name"), spec.get("schedule"), str(spec.get("suspend", False)).lower(),
+            len(status.get("active") or []), age(last) if last else None, age(_meta(cron_job).get("creationTimestamp"))]
+
+
+def node_row(node: Dict[str, Any], wide: bool) -> List[Any]:
+    status = node.get("status") or {}
+    ready = next((condition for condition in status.get("conditions") or [] if condition.get("type") == "Ready"), {})
+    state = "Ready" if ready.get("status") == "True" else "NotReady"
+    if (node.get("spec") or {}).get("unschedulable"):
+        state += ",SchedulingDisabled"
+    prefix = "node-role.kubernetes.io/"
+    roles = ",".join(label[len(prefix):] for label in (_meta(node).get("labels") or {}) if label.startswith(prefix))
+    row = [_meta(node).get("name"), state, roles, age(_meta(node).get("creationTimestamp")),
+           (status.get("nodeInfo") or {}).get("kubeletVersion")]
+    if wide:
+        addresses = {address.get("type"): address.get("address") for address in status.get("addresses") or []}
+        row += [addresses.get("InternalIP"), (status.get("nodeInfo") or {}).get("osImage")]
+    return row
+
+
+def namespace_row(namespace: Dict[str, Any], wide: bool) -> List[Any]:
+    return [_meta(namespace).get("name"), (namespace.get("status") or {}).get("phase"),
+            age(_meta(namespace).get("creationTimestamp"))]
+
+
+def config_map_row(config_map: Dict[str, Any], wide: bool) -> List[Any]:
+    data = len(config_map.get("data") or {}) + len(config_map.get("binaryData") or {})
+    return [_meta(config_map).get("name"), data, age(_meta(config_map).get("creationTimestamp"))]
+
+
+def secret_row(secret: Dict[str, Any], wide: bool) -> List[Any]:
+    return [_meta(secret).get("name"), secret.get("type"), len(secret.get("data") or {}),
+            age(_meta(secret).get("creationTimestamp"))]
+
+
+def event_row(event: Dict[str, Any], wide: bool) -> List[Any]:
+    involved = event.get("involvedObject") or {}
+    last = event.get("lastTimestamp") or event.get("eventTime") or _meta(event).get("creationTimestamp")
+    return [age(last), event.get("type"), event.get("reason"),
+            f"{(involved.get('kind') or '').lower()}/{involved.get('name')}", " ".join((event.get("message") or "").split())]
+
+
+def ingress_row(ingress: Dict[str, Any], wide: bool) -> List[Any]:
+    spec = ingress.get("spec") or {}
+    hosts = ",".join(rule.get("host") or "*" for rule in spec.get("rules") or [])
+    return [_meta(ingress).get("name"), spec.get("ingressClassName"), hosts, age(_meta(ingress).get("creationTimestamp"))]
+
+
+def pvc_row(claim: Dict[str, Any], wide: bool) -> List[Any]:
+    capacity = ((claim.get("status") or {}).get("capacity") or {}).get("storage")
+    return [_meta(claim).get("name"), (claim.get("status") or {}).get("phase"), (claim.get("spec") or {}).get("volumeName"),
+            capacity, age(_meta(claim).get("creationTimestamp"))]
+
+
+class Kind(NamedTuple):
+    """How to list, read and print one resource type."""
+    api: str  # Generated API class, e.g. "CoreV1Api"
+    method: str  # Method suffix, e.g. "pod" for list_namespaced_pod / read_namespaced_pod
+    namespaced: bool
+    header: List[str]
+    row: Callable[[Dict[str, Any], bool], List[Any]]
+    wide_header: List[str] = []
+
+
+KINDS: Dict[str, Kind] = {
+    "pods": Kind("CoreV1Api", "pod", True, ["NAME", "READY", "STATUS", "RESTARTS", "AGE"], pod_row, ["IP", "NODE"]),
+    "services": Kind("CoreV1Api", "service", True, ["NAME", "TYPE", "CLUSTER-IP", "EXTERNAL-IP", "PORT(S)", "AGE"],
+                     service_row, ["SELECTOR"]),
+    "deployments": Kind("AppsV1Api", "deployment", True, ["NAME", "READY", "UP-TO-DATE", "AVAILABLE", "AGE"], deployment_row),
+    "replicasets": Kind("AppsV1Api", "replica_set", True, ["NAME", "DESIRED", "CURRENT", "READY", "AGE"], replica_set_row),
+    "statefulsets": Kind("AppsV1Api", "stateful_set", True, ["NAME", "READY", "AGE"], stateful_set_row),
+    "daemonsets": Kind("AppsV1Api", "daemon_set", True,
+                       ["NAME", "DESIRED", "CURRENT", "READY", "UP-TO-DATE", "AVAILABLE", "AGE"], daemon_set_row),
+    "jobs": Kind("BatchV1Api", "job", True, ["NAME", "COMPLETIONS", "AGE"], job_row),
+    "cronjobs": Kind("BatchV1Api", "cron_job", True, ["NAME", "SCHEDULE", "SUSPEND", "ACTIVE", "LAST SCHEDULE", "AGE"],
+                     cron_job_row),
+    "nodes": Kind("CoreV1Api", "node", False, ["NAME", "STATUS", "ROLES", "AGE", "VERSION"], node_row,
+                  ["INTERNAL-IP", "OS-IMAGE"]),
+    "namespaces": Kind("CoreV1Api", "namespace", False, ["NAME", "STATUS", "AGE"], namespace_row),
+    "configmaps": Kind("CoreV1Api", "config_map", True, ["NAME", "DATA", "AGE"], config_map_row),
+    "secrets": Kind("CoreV1Api", "secret", True, ["NAME", "TYPE", "DATA", "AGE"], secret_row),
+    "events": Kind("CoreV1Api", "event", True, ["LAST SEEN", "TYPE", "REASON", "OBJECT", "MESSAGE"], event_row),
+    "ingresses": Kind("NetworkingV1Api", "ingress", True, ["NAME", "CLASS", "HOSTS", "AGE"], ingress_row),
+    "persistentvolumeclaims": Kind("CoreV1Api", "persistent_volume_claim", True,
+                                   ["NAME", "STATUS", "VOLUME", "CAPACITY", "AGE"], pvc_row),
+}
+
+ALIASES = {
+    "po": "pods", "pod": "pods",
+    "svc": "services", "service": "services",
+    "deploy": "deployments", "deployment": "deployments",
+    "rs": "replicasets", "replicaset": "replicasets",
+    "sts": "statefulsets", "statefulset": "statefulsets",
+    "ds": "daemonsets", "daemonset": "daemonsets",
+    "job": "jobs",
+    "cj": "cronjobs", "cronjob": "cronjobs",
+    "no": "nodes", "node": "nodes",
+    "ns": "namespaces", "namespace": "namespaces",
+    "cm": "configmaps", "configmap": "configmaps",
+    "secret": "secrets",
+    "ev": "events", "event": "events",
+    "ing": "ingresses", "ingress": "ingresses",
+    "pvc": "persistentvolumeclaims", "persistentvolumeclaim": "persistentvolumeclaims",
+}
+
+
+# API group and version of each generated API class ("" is the core group)
+API_GROUPS = {
+    "CoreV1Api": ("", "v1"),
+    "AppsV1Api": ("apps", "v1"),
+    "BatchV1Api": ("batch", "v1"),
+    "NetworkingV1Api": ("networking.k8s.io", "v1"),
+}
+
+
+def resolve_kind(name: str) -> Optional[str]:
+    """
+    Canonical resource type for a kubectl type name (plural, singular or short
+    name, optionally with `.group` or `.version.group`).
+
+    A group other than the one of the kind in KINDS (`pods.metrics.k8s.io`,
+    `jobs.example.com`, ...) is another resource: None, so kubectl handles it.
+    """
+    resource, _, qualifier = name.lower().partition(".")
+    kind = resource if resource in KINDS else ALIASES.get(resource)
+    if kind is None or not qualifier:
+        return kind
+    group, version = API_GROUPS[KINDS[kind].api]
+    return kind if group and qualifier in (group, f"{version}.{group}") else None
+
+
+# --- command parsing ----------------------------------------------------
+
+class Command(NamedTuple):
+    verb: str
+    args: List[str]
+    namespace: Optional[str]  # None: the namespace of the context
+    all_namespaces: bool
+    options: Dict[str, Any]
+
+
+# Flags the fast path understands: name -> (canonical name, takes a value)
+FLAGS = {
+    "-n": ("namespace", True), "--namespace": ("namespace", True),
+    "-A": ("all_namespaces", False), "--all-namespaces": ("all_namespaces", False),
+    "-l": ("selector", True), "--selector": ("selector", True),
+    "--field-selector": ("field_selector", True),
+    "-o": ("output", True), "--output": ("output", True),
+    "-c": ("container", True), "--container": ("container", True),
+    "--tail": ("tail", True),
+    "--since": ("since", True),
+    "-p": ("previous", False), "--previous": ("previous", False),
+    "--timestamps": ("timestamps", False),
+    "--limit-bytes": ("limit_bytes", True),
+}
+VERBS = ("get", "describe", "logs", "top")
+OUTPUTS = ("", "wide", "name", "json", "yaml")
+
+
+def parse_command(command: str, namespace: str = "default") -> Optional[Command]:
+    """
+    Parse a kubectl command line (without "kubectl") the fast path can answer.
+
+    Returns:
+        The parsed command, None if it has to go to kubectl
+    """
+    try:
+        tokens = shlex.split(command)
+    except ValueError:
+        return None
+    if tokens and tokens[0] == "kubectl":
+        tokens = tokens[1:]
+    if not tokens or tokens[0] not in VERBS:
+        return None
+
+    args: List[str] = []
+    options: Dict[str, Any] = {}
+    i = 1
+    while i < len(tokens):
+        token = tokens[i]
+        i += 1
+        if not token.startswith("-"):
+            args.append(token)
+            continue
+        flag, has_value, value = token.partition("=")
+        if flag not in FLAGS:
+            return None
+        option, takes_value = FLAGS[flag]
+        if takes_value and not has_value:
+            if i >= len(tokens):
+                return None
+            value = tokens[i]
+            i += 1
+        elif not takes_value:
+            if has_value:
+                return None
+            value = True
+        options[option] = value
+
+    if options.get("output", "") not in OUTPUTS:
+        return None
+    explicit = options.pop("namespace", None)
+    if explicit is None and namespace != "default":
+        explicit = namespace
+    return Command(tokens[0], args, explicit, bool(options.pop("all_namespaces", False)), options)
+
+
+def split_targets(args: List[str]) -> Optional[Tuple[str, List[str]]]:
+    """(kind, names) of "pods a b", "pod/a pod/b" or "pods"; None for several types or unknown ones."""
+    if not args:
+        return None
+    if "/" in args[0]:
+        kinds = set()
+        names = []
+        for arg in args:
+            kind, _, name = arg.partition("/")
+            kinds.add(resolve_kind(kind))
+            names.append(name)
+        if len(kinds) != 1 or None in kinds or not all(names):
+            return None
+        return kinds.pop(), names
+    if "," in args[0]:
+        return None
+    kind = resolve_kind(args[0])
+    if kind is None:
+        return None
+    return kind, args[1:]
+
+
+def parse_duration(value: str) -> Optional[int]:
+    """Seconds of a kubectl duration like 30s, 5m, 1h or 1h30m."""
+    total = 0
+    number = ""
+    for char in value:
+        if char.isdigit():
+            number += char
+        elif char in "smh" and number:
+            total += int(number) * {"s": 1, "m": 60, "h": 3600}[char]
+            number = ""
+        else:
+            return None
+    if number:
+        return None
+    return total
+
+
+# --- API calls ----------------------------------------------------------
+
+def _json(response: Any) -> Any:
+    return json.loads(response.data)
+
+
+def _list(kind: Kind, namespace: str, all_namespaces: bool, options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    api = _api(kind.api)
+    kwargs = {"_preload_content": False}
+    if options.get("selector"):
+        kwargs["label_selector"] = options["selector"]
+    if options.get("field_selector"):
+        kwargs["field_selector"] = options["field_selector"]
+    if not kind.namespaced:
+        response = getattr(api, f"list_{kind.method}")(**kwargs)
+    elif all_namespaces:
+        response = getattr(api, f"list_{kind.method}_for_all_namespaces")(**kwargs)
+    else:
+        response = getattr(api, f"list_namespaced_{kind.method}")(namespace, **kwargs)
+    return _json(response).get("items") or []
+
+
+def _read(kind: Kind, name: str, namespace: str) -> Dict[str, Any]:
+    api = _api(kind.api)
+    if kind.namespaced:
+        return _json(getattr(api, f"read_namespaced_{kind.method}")(name, namespace, _preload_content=False))
+    return _json(getattr(api, f"read_{kind.method}")(name, _preload_content=False))
+
+
+def _objects(command: Command, kind: Kind, names: List[str], namespace: str) -> List[Dict[str, Any]]:
+    if names:
+        return [_read(kind, name, namespace) for name in names]
+    return _list(kind, namespace, command.all_namespaces and kind.namespaced, command.options)
+
+
+# --- verbs --------------------------------------------------------------
+
+def get(command: Command, namespace: str) -> Optional[str]:
+    targets = split_targets(command.args)
+    if targets is None:
+        return None
+    kind_name, names = targets
+    kind = KINDS[kind_name]
+    objects = [compact(obj) for obj in _objects(command, kind, names, namespace)]
+    output = command.options.get("output", "")
+
+    if output in ("json", "yaml"):
+        document = objects[0] if len(names) == 1 else {"apiVersion": "v1", "kind": "List", "items": objects}
+        if output == "json":
+            return json.dumps(document, indent=2)
+        return yaml.safe_dump(document, sort_keys=False)
+    if output == "name":
+        singular = kind.method.replace("_", "")
+        return "\n".join(f"{singular}/{_meta(obj).get('name')}" for obj in objects)
+
+    if not objects:
+        where = "" if not kind.namespaced or command.all_namespaces else f" in {namespace} namespace"
+        return f"No resources found{where}."
+    wide = output == "wide"
+    header = kind.header + (kind.wide_header if wide else [])
+    rows = [kind.row(obj, wide) for obj in objects]
+    if command.all_namespaces and kind.namespaced:
+        header = ["NAMESPACE"] + header
+        rows = [[_meta(obj).get("namespace")] + row for obj, row in zip(objects, rows)]
+    return table(header, rows)
+
+
+def describe(command: Command, namespace: str) -> Optional[str]:
+    targets = split_targets(command.args)
+    if targets is None or command.options.get("output"):
+        return None
+    kind_name, names = targets
+    kind = KINDS[kind_name]
+    sections = []
+    for obj in _objects(command, kind, names, namespace):
+        obj = compact(obj)
+        metadata = _meta(obj)
+        text = yaml.safe_dump(obj, sort_keys=False).rstrip()
+        selector = f"involvedObject.name={metadata.get('name')}"
+        if metadata.get("uid"):
+            selector += f",involvedObject.uid={metadata['uid']}"
+        events = _list(KINDS["events"], metadata.get("namespace") or "default", not kind.namespaced,
+                       {"field_selector": selector})
+        events.sort(key=lambda event: event.get("lastTimestamp") or event.get("eventTime") or "")
+        if events:
+            text += "\nEvents:\n" + table(KINDS["events"].header, [event_row(event, False) for event in events])
+        else:
+            text += "\nEvents: <none>"
+        sections.append(text)
+    if not sections:
+        return "No resources found."
+    return "\n---\n".join(sections)
+
+
+def logs(command: Command, namespace: str) -> Optional[CapturedOutput]:
+    options = command.options
+    if len(command.args) != 1 or options.get("selector") or options.get("output") or command.all_namespaces:
+        return None
+    pod = command.args[0]
+    if "/" in pod:
+        kind, _, pod = pod.partition("/")
+        if resolve_kind(kind) != "pods":
+            return None
+    kwargs: Dict[str, Any] = {"_preload_content": False}
+    if options.get("container"):
+        kwargs["container"] = options["container"]
+    if options.get("tail") not in (None, "-1"):
+        kwargs["tail_lines"] = int(options["tail"])
+    if options.get("since"):
+        since = parse_duration(options["since"])
+        if since is None:
+            return None
+        kwargs["since_seconds"] = since
+    if options.get("limit_bytes"):
+        kwargs["limit_bytes"] = int(options["limit_bytes"])
+    if options.get("previous"):
+        kwargs["previous"] = True
+    if options.get("timestamps"):
+        kwargs["timestamps"] = True
+    response = _api("CoreV1Api").read_namespaced_pod_log(pod, namespace, **kwargs)
+    # Streamed: a huge log is never held in memory as a whole
+    capture = OutputCapture()
+    try:
+        for chunk in response.stream(65536):
+            capture.write(chunk)
+    finally:
+        response.release_conn()
+    return capture.close()
+
+
+def _cpu(quantity: Decimal) -> str:
+    return f"{int(quantity * 1000)}m"
+
+
+def _memory(quantity: Decimal) -> str:
+    return f"{int(quantity / (1024 * 1024))}Mi"
+
+
+def top(command: Command, namespace: str) -> Optional[str]:
+    if not command.args or command.options.get("output") or command.options.get("field_selector"):
+        return None
+    kind = resolve_kind(command.args[0])
+    names = command.args[1:]
+    if kind not in ("pods", "nodes") or len(names) > 1:
+        return None
+    api = _api("CustomObjectsApi")
+    kwargs = {"label_selector": command.options["selector"]} if command.options.get("selector") else {}
+    if kind == "nodes":
+        items = api.list_cluster_custom_object("metrics.k8s.io", "v1beta1", "nodes", **kwargs).get("items") or []
+    elif command.all_namespaces:
+        items = api.list_cluster_custom_object("metrics.k8s.io", "v1beta1", "pods", **kwargs).get("items") or []
+    else:
+        items = api.list_namespaced_custom_object("metrics.k8s.io", "v1beta1", namespace, "pods", **kwargs).get("items") or []
+    if names:
+        items = [item for item in items if _meta(item).get("name") == names[0]]
+        if not items:
+            return f"Error: metrics not available for {kind[:-1]} {names[0]}"
+
+    rows = []
+    for item in items:
+        if kind == "nodes":
+            usages = [item.get("usage") or {}]
+        else:
+            usages = [container.get("usage") or {} for container in item.get("containers") or []]
+        cpu = sum((parse_quantity(usage.get("cpu", "0")) for usage in usages), Decimal(0))
+        memory = sum((parse_quantity(usage.get("memory", "0")) for usage in usages), Decimal(0))
+        row = [_meta(item).get("name"), _cpu(cpu), _memory(memory)]
+        if kind == "pods" and command.all_namespaces:
+            row = [_meta(item).get("namespace")] + row
+        rows.append(row)
+    if not rows:
+        return "No resources found."
+    header = ["NAME", "CPU(cores)", "MEMORY(bytes)"]
+    if kind == "pods" and command.all_namespaces:
+        header = ["NAMESPACE"] + header
+    return table(header, rows)
+
+
+HANDLERS: Dict[str, Callable[[Command, str], Union[str, CapturedOutput, None]]] = {
+    "get": get,
+    "describe": describe,
+    "logs": logs,
+    "top": top,
+}
+
+
+def run_kubectl(command: str, namespace: str = "default") -> Union[str, CapturedOutput, None]:
+    """
+    Answer a read-only kubectl command through the API client.
+
+    Args:
+        command: The kubectl subcommand and arguments, as given to kubectl_exec
+        namespace: Namespace used when the command has no -n/--namespace
+
+    Returns:
+        The output (or an "Error: ..." like kubectl prints for 403/404; logs
+        as the CapturedOutput of the stream), None if the command has to run
+        with kubectl
+    """
+    parsed = parse_command(command, namespace)
+    if parsed is None:
+        return None
+    try:
+        get_api_client()
+        return HANDLERS[parsed.verb](parsed, parsed.namespace or _default_namespace)
+    except ApiException as e:
+        if e.status in (403, 404):
+            try:
+                message = json.loads(e.body).get("message")
+            except (TypeError, ValueError):
+                message = None
+            return f"Error: {message or e.reason}"
+        if e.status == 401:
+            # Let kubectl refresh the credentials, reload them for the next call
+            reset()
+        return None
+    except Exception:
+        return None
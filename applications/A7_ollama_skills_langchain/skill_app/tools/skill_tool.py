@@ -1,14 +1,8 @@
 from langchain.tools import tool
-from typing import TypedDict
 
-class Skill(TypedDict):  
-    """A skill that can be progressively disclosed to the agent."""
-    name: str  # Unique identifier for the skill
-    description: str  # 1-2 sentence description to show in system prompt
-    content: str  # Full skill content with detailed instructions
+from ai_common.skill_registry import SkillEntry as Skill
 
-# SKILLS will be populated by the __init__.py module
-SKILLS = []
+# SKILLS (a SkillRegistry) is created by the __init__.py module
 
 @tool
 def load_skill(skill_name: str) -> str:
@@ -24,16 +18,42 @@ def load_skill(skill_name: str) -> str:
     # Import here to avoid circular imports
     from . import SKILLS
     
-    # Find and return the requested skill
-    for skill in SKILLS:
-        if skill["name"] == skill_name:
-            return f"Loaded skill: {skill_name}\n\n{skill['content']}"
+    skill = SKILLS.get(skill_name)
+    if skill is not None:
+        ret = f"Loaded skill: {skill_name}\n\n{skill['content']}"
+        resources = skill.resources()
+        if resources:
+            ret += "\n\nSkill resources (use load_skill_resource to read them):\n"
+            ret += "\n".join(f"- {resource}" for resource in resources)
+        return ret
 
     # Skill not found
-    available = ", ".join(s["name"] for s in SKILLS)
+    available = ", ".join(SKILLS.names())
     return f"Skill '{skill_name}' not found. Available skills: {available}"
 
 
+@tool
+def load_skill_resource(skill_name: str, resource: str) -> str:
+    """Load a file (script, reference, template) that belongs to a skill.
+
+    Use this when a loaded skill lists resources and you need one of them.
+
+    Args:
+        skill_name: The name of the skill
+        resource: The resource path as listed by load_skill (e.g., "scripts/check.sh")
+    """
+    # Import here to avoid circular imports
+    from . import SKILLS
+
+    skill = SKILLS.get(skill_name)
+    if skill is None:
+        return f"Skill '{skill_name}' not found. Available skills: {', '.join(SKILLS.names())}"
+    try:
+        return skill.read_resource(resource)
+    except (OSError, ValueError) as e:
+        return f"Could not load resource '{resource}' of skill '{skill_name}': {e}"
+
+
 def list_skill() -> str:
     """List the available skills.
 
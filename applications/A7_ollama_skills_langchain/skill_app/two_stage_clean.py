@@ -4,7 +4,10 @@ Improved Two-Stage Skill Agent.
 This is the cleanest implementation of the two-stage architecture.
 """
 
-from langchain_ollama import ChatOllama
+from typing import Optional
+
+from ai_common.llm_cache import LLMResponseCache, tool_result_ttl
+from ai_common.ollama_chat import SharedChatOllama
 from langchain.agents import create_agent
 from middleware.middleware import SkillMiddleware
 from middleware.task_executor_middleware import TaskExecutorMiddleware
@@ -25,13 +28,31 @@ class TwoStageSkillAgent:
       - Output: Final answer
     """
 
-    def __init__(self, model_name: str = "llama3.1:8b", temperature: float = 0):
-        """Initialize both stages."""
+    def __init__(
+        self,
+        model_name: str = "llama3.1:8b",
+        temperature: float = 0,
+        response_cache: Optional[LLMResponseCache] = None
+    ):
+        """
+        Initialize both stages.
+
+        Args:
+            model_name: Ollama model used by both stages
+            temperature: Sampling temperature
+            response_cache: Cache shared by both stages' LLM calls; by default
+                answers built from tool results expire after 30 seconds, other
+                responses after 10 minutes
+        """
+
+        if response_cache is None:
+            response_cache = LLMResponseCache(ttl_policy=tool_result_ttl(ttl=600, live_ttl=30))
+        self.response_cache = response_cache
 
         # Stage 1: Skill Router
         # Only has skill management tools
         self.skill_router = create_agent(
-            ChatOllama(model=model_name, temperature=temperature),
+            SharedChatOllama(model=model_name, temperature=temperature, cache=self.response_cache),
             system_prompt=(
                 "You are a skill router. Your job is to:\n"
                 "1. Read the user's query\n"
@@ -46,7 +67,7 @@ class TwoStageSkillAgent:
         # Stage 2: Task Executor
         # Only has domain tools
         self.task_executor = create_agent(
-            ChatOllama(model=model_name, temperature=temperature),
+            SharedChatOllama(model=model_name, temperature=temperature, cache=self.response_cache),
             system_prompt=(
                 "You are a task executor. You will receive:\n"
                 "1. The user's original query\n"
@@ -135,6 +156,7 @@ Use the available tools as instructed by the skill."""
 
         if verbose:
             print("\n✓ Task execution complete")
+            print(f"✓ LLM cache: {self.response_cache.stats()}")
 
         return {
             "answer": final_answer or "Error: Could not generate response",
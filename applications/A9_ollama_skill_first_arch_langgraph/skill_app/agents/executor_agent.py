@@ -1,19 +1,30 @@
+import concurrent.futures
+import threading
+import time
+
 from langchain.messages import SystemMessage
-from langchain_ollama import ChatOllama
+from ai_common.llm_cache import LLMResponseCache, tool_result_ttl
+from ai_common.ollama_chat import SharedChatOllama
 
-from states.state import MessagesState
-from langchain.messages import ToolMessage
+from states.state import MessagesState, SkillAppState
+from langchain.messages import HumanMessage, ToolMessage
 
-from typing import Literal, LiteralString
+from typing import Iterator, Literal, LiteralString, Optional, Tuple
 from langgraph.graph import StateGraph, START, END
 import  tools.kubernetes_tools
 import tools.customer_notification_tools
+from tools.output_format import budget_text, to_text
 
 import agents.skill_agent
 
-model = ChatOllama(
+# Which tools to call for a request stays valid for a while, answers built
+# from tool output (live cluster state) only briefly
+response_cache = LLMResponseCache(ttl_policy=tool_result_ttl(ttl=600, live_ttl=30))
+
+model = SharedChatOllama(
     model="llama3.1:8b",
     temperature=0,
+    cache=response_cache,
     format="",  # Don't force JSON format, let tool calling work naturally
     # other params...
 )
@@ -21,6 +32,13 @@ model = ChatOllama(
 tools = tools.kubernetes_tools.tools + tools.customer_notification_tools.tools
 tools_by_name = {tool.name: tool for tool in tools}
 
+# Tool calls of one LLM turn run concurrently (they are independent API reads),
+# in a pool of their own: a call that hangs past its timeout keeps its worker,
+# but never delays the calls of later turns
+TOOL_WORKERS = 8
+TOOL_TIMEOUT = 30.0  # Seconds per tool call, from the moment a worker runs it
+TOOL_TIMEOUTS = {"get_pod_logs": 60.0}  # Per-tool overrides
+
 # Bind tools with strict mode if available
 model_with_tools = model.bind_tools(tools)
 
@@ -59,24 +77,58 @@ def llm_call(state: dict):
 
 
 
+def run_tool(tool_call) -> str:
+    """Invoke one tool call and return its result as text"""
+
+    tool = tools_by_name[tool_call["name"]]
+    observation = tool.invoke(tool_call["args"])
+
+    # Compact text within the token budget, the result goes into the next prompt
+    return budget_text(to_text(observation))
+
+
 def tool_node(state: dict):
-    """Performs the tool call"""
+    """Performs the tool calls, concurrently, in the order the LLM made them"""
 
     print("executor tool_node() called")
 
-    result = []
-    for tool_call in state["messages"][-1].tool_calls:
-        tool = tools_by_name[tool_call["name"]]
-        observation = tool.invoke(tool_call["args"])
+    tool_calls = state["messages"][-1].tool_calls
+    started = [threading.Event() for _ in tool_calls]
+    start_times = [0.0] * len(tool_calls)
 
-        # Convert observation to string if it's not already
-        if isinstance(observation, str):
-            content = observation
-        else:
-            import json
-            content = json.dumps(observation, indent=2)
+    def run(i: int) -> str:
+        start_times[i] = time.monotonic()
+        started[i].set()
+        return run_tool(tool_calls[i])
+
+    # A worker per call, so none waits in the queue
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=max(TOOL_WORKERS, len(tool_calls)),
+                                                 thread_name_prefix="tool")
+    futures = [pool.submit(run, i) if tool_call["name"] in tools_by_name else None
+               for i, tool_call in enumerate(tool_calls)]
+    # Don't wait for calls that time out, their workers exit when they return
+    pool.shutdown(wait=False)
 
-        result.append(ToolMessage(content=content, tool_call_id=tool_call["id"]))
+    result = []
+    for i, (tool_call, future) in enumerate(zip(tool_calls, futures)):
+        status = "error"
+        if future is None:
+            content = f"Error: unknown tool {tool_call['name']}. Available tools: {', '.join(tools_by_name)}"
+        else:
+            timeout = TOOL_TIMEOUTS.get(tool_call["name"], TOOL_TIMEOUT)
+            try:
+                started[i].wait()
+                content = future.result(timeout=max(0.0, start_times[i] + timeout - time.monotonic()))
+                status = "success"
+            except concurrent.futures.TimeoutError:
+                # The worker thread can't be interrupted, its result is dropped
+                content = f"Error: {tool_call['name']} did not finish within {timeout:g}s"
+            except Exception as e:
+                content = f"Error: {tool_call['name']} failed: {e}"
+        if status == "error":
+            print(content)
+
+        result.append(ToolMessage(content=content, tool_call_id=tool_call["id"], status=status))
     return {"messages": result}
 
 
@@ -93,9 +145,42 @@ def should_continue(state: MessagesState) -> LiteralString:
     # Otherwise, we stop (reply to the user)
     return END
 
-def build_and_compile_agent():
+def skills_system_message(skills: str) -> SystemMessage:
+    """System prompt carrying the selected skill's instructions"""
+
+    return SystemMessage(
+        content=f"""
+        You are an AI assistant that EXECUTES tasks using tools.
+
+        INSTRUCTIONS:
+        {skills}
+
+        CRITICAL RULES:
+        1. Read the instructions above
+        2. Make the required tool calls IMMEDIATELY
+        3. Do NOT write "I will call" or "Here are the tool calls"
+        4. Do NOT explain what you're going to do
+        5. Just execute the tool calls directly with proper parameters
+
+        When instructions say "Call X with Y", you must invoke that tool immediately.
+        """
+    )
+
+
+def skill_router(state: dict):
+    """Selects the skill and starts the executor conversation with its instructions"""
+
+    routed = agents.skill_agent.skill_router_node(state)
+    messages = [skills_system_message(routed["skills"]), HumanMessage(content=state["user_query"])]
+
+    print("executor agent called", messages)
+
+    return {**routed, "messages": messages}
+
+
+def build_and_compile_executor():
+    """Executor loop only (llm_call <-> tool_node), expects the skill messages in the input"""
 
-    from states.state import MessagesState
     # Build workflow
     agent_builder = StateGraph(MessagesState)
 
@@ -112,52 +197,63 @@ def build_and_compile_agent():
     )
     agent_builder.add_edge("tool_node", "llm_call")
 
-    # Compile the agent
-    agent = agent_builder.compile()
+    return agent_builder.compile()
 
 
-    return agent
+def build_and_compile_agent(checkpointer=None):
+    """Whole pipeline as one graph: skill_router -> llm_call <-> tool_node
 
-    # Show the agent
-    #from IPython.display import Image, display
-    #display(Image(agent.get_graph(xray=True).draw_mermaid_png()))
+    Build it once at startup and reuse it for every query.
 
-    # Invoke
-    #from langchain.messages import HumanMessage
-    #messages = [HumanMessage(content="Add 3 and 4.")]
-    #messages = agent.invoke({"messages": messages})
-    #for m in messages["messages"]:
-    #    m.pretty_print()
+    Args:
+        checkpointer: Optional LangGraph checkpointer (e.g. InMemorySaver), invoke with
+            config={"configurable": {"thread_id": ...}} when set
+    """
 
+    # Build workflow
+    agent_builder = StateGraph(SkillAppState)
 
-def invoke_agent(agent, user_query):
+    # Add nodes
+    agent_builder.add_node("skill_router", skill_router)
+    agent_builder.add_node("llm_call", llm_call)
+    agent_builder.add_node("tool_node", tool_node)
 
-    from langchain.messages import HumanMessage
+    # Add edges to connect nodes
+    agent_builder.add_edge(START, "skill_router")
+    agent_builder.add_edge("skill_router", "llm_call")
+    agent_builder.add_conditional_edges(
+        "llm_call",
+        should_continue,
+        ["tool_node", END]
+    )
+    agent_builder.add_edge("tool_node", "llm_call")
 
-    skills = agents.skill_agent.get_corresponding_skills_and_descriptions(user_query)
+    # Compile the agent
+    agent = agent_builder.compile(checkpointer=checkpointer)
 
-    skills_message = SystemMessage(
-        content=f"""
-        You are an AI assistant that EXECUTES tasks using tools.
 
-        INSTRUCTIONS:
-        {skills}
+    return agent
 
-        CRITICAL RULES:
-        1. Read the instructions above
-        2. Make the required tool calls IMMEDIATELY
-        3. Do NOT write "I will call" or "Here are the tool calls"
-        4. Do NOT explain what you're going to do
-        5. Just execute the tool calls directly with proper parameters
+    # Show the agent
+    #from IPython.display import Image, display
+    #display(Image(agent.get_graph(xray=True).draw_mermaid_png()))
 
-        When instructions say "Call X with Y", you must invoke that tool immediately.
-        """
-    )
 
-    messages = [skills_message, HumanMessage(content=user_query)]
+def stream_agent(agent, user_query, config: Optional[dict] = None) -> Iterator[Tuple[str, dict]]:
+    """Run the pipeline and yield (node name, state update) as each node finishes"""
 
-    print("executor agent called", messages)
+    for update in agent.stream({"user_query": user_query, "messages": []}, config=config, stream_mode="updates"):
+        for node, values in update.items():
+            yield node, values
+
+
+def invoke_agent(agent, user_query, config: Optional[dict] = None):
+
+    for node, values in stream_agent(agent, user_query, config=config):
+        if node == "skill_router":
+            print(f"skill_router selected: {values['skill'] or 'no skill'}")
+        for m in (values or {}).get("messages", []):
+            m.pretty_print()
 
-    messages = agent.invoke({"messages": messages})
-    for m in messages["messages"]:
-        m.pretty_print()
\ No newline at end of file
+    print("executor LLM cache:", response_cache.stats())
+    print("skill LLM cache:", agents.skill_agent.response_cache.stats())
@@ -1,9 +1,10 @@
 from langchain.tools import tool
-from langchain_ollama import ChatOllama
+from ai_common.llm_cache import LLMResponseCache, ollama_embedder
+from ai_common.ollama_chat import SharedChatOllama
 from langchain.messages import SystemMessage
 
-from typing import List
-import langgraph.graph
+from typing import List, Optional
+import time
 
 
 from pydantic import BaseModel, Field
@@ -22,12 +23,73 @@ class SkillSelection(BaseModel):
         min_length=1
     )
 
-model = ChatOllama(
+# Skill selection only depends on the query and the skill list
+response_cache = LLMResponseCache(ttl=3600)
+
+model = SharedChatOllama(
     model="llama3.1:8b",
     temperature=0,
+    cache=response_cache,
     # other params...
 )
 
+# Embedding routing: the LLM is only asked when the two best skills are this close
+EMBEDDING_MODEL = "nomic-embed-text"
+ROUTING_MIN_MARGIN = 0.05
+ROUTING_MIN_SCORE = 0.3
+# After a failed build (Ollama starting, embedding model not pulled yet) the
+# index is built again after this many seconds, doubling up to the maximum
+INDEX_RETRY_INTERVAL = 30.0
+MAX_INDEX_RETRY_INTERVAL = 600.0
+
+_skill_index = None
+_skill_index_version = None
+_skill_index_retry_at = 0.0
+_skill_index_retry_interval = INDEX_RETRY_INTERVAL
+
+
+def get_skill_index():
+    """Embedding index over SKILLS, built on first use and rebuilt when skill files change (None if embeddings are unavailable)"""
+    global _skill_index, _skill_index_version, _skill_index_retry_at, _skill_index_retry_interval
+    from skill_registry import SKILLS
+    from skill_registry.skill_index import SkillIndex
+
+    skills = list(SKILLS)
+    version = SKILLS.version
+    if (_skill_index is None or _skill_index_version != version) and time.monotonic() >= _skill_index_retry_at:
+        try:
+            # Unchanged skills keep their vectors
+            _skill_index = SkillIndex(skills, ollama_embedder(EMBEDDING_MODEL), previous=_skill_index)
+            _skill_index_version = version
+            _skill_index_retry_interval = INDEX_RETRY_INTERVAL
+        except Exception as e:
+            print(f"Skill index unavailable, using the LLM for skill selection "
+                  f"(retrying in {_skill_index_retry_interval:.0f}s): {e}")
+            _skill_index_retry_at = time.monotonic() + _skill_index_retry_interval
+            _skill_index_retry_interval = min(_skill_index_retry_interval * 2, MAX_INDEX_RETRY_INTERVAL)
+    return _skill_index
+
+
+def route_skill(user_query: str) -> Optional[str]:
+    """Pick the skill by embedding similarity, None if the match is ambiguous"""
+    index = get_skill_index()
+    if index is None:
+        return None
+    try:
+        ranked = index.rank(user_query, k=3)
+    except Exception as e:
+        print(f"Skill routing failed, using the LLM: {e}")
+        return None
+    print(f"skill_agent route_skill() scores: {ranked}")
+    if not ranked:
+        return None
+    best_name, best_score = ranked[0]
+    runner_up = ranked[1][1] if len(ranked) > 1 else -1.0
+    if best_score < ROUTING_MIN_SCORE or best_score - runner_up < ROUTING_MIN_MARGIN:
+        return None
+    return best_name
+
+
 def load_skill(skill_name: str) -> str:
     """Load the full content of a skill into the agent's context.
 
@@ -40,14 +102,13 @@ def load_skill(skill_name: str) -> str:
     """
     # Import here to avoid circular imports
     from skill_registry import SKILLS
-    
-    # Find and return the requested skill
-    for skill in SKILLS:
-        if skill["name"] == skill_name:
-            return f"Loaded skill: {skill_name}\n\n{skill['content']}"
+
+    skill = SKILLS.get(skill_name)
+    if skill is not None:
+        return f"Loaded skill: {skill_name}\n\n{skill['content']}"
 
     # Skill not found
-    available = ", ".join(s["name"] for s in SKILLS)
+    available = ", ".join(SKILLS.names())
     return f"Skill '{skill_name}' not found. Available skills: {available}"
 
 
@@ -129,46 +190,54 @@ def llm_call(state: dict):
 
 
 
-def get_corresponding_skills_and_descriptions(user_query) -> str:
-    """This function load the skills
+def select_skills_with_llm(user_query) -> Optional[SkillSelection]:
+    """Ask the LLM to select the skill (used when embedding routing is ambiguous)"""
 
-    Returns:
-        str: loaded skills (detailed)
-    """
+    from langchain.messages import HumanMessage
+    messages = [HumanMessage(content=f"List the most relevant skills what are connected to this user query: {user_query}")]
+    res = llm_call({"messages": messages})
 
-    from states.state import MessagesState
+    # The last message should be the SkillSelection object
+    last_message = res["messages"][-1]
 
-    agent_builder = langgraph.graph.StateGraph(MessagesState)
-    # Add nodes
-    agent_builder.add_node("llm_call", llm_call)
-    #agent_builder.add_node("tool_node", tool_node)
+    if isinstance(last_message, SkillSelection):
+        return last_message
+    return None
 
-    # Add edges to connect nodes
-    agent_builder.add_edge(langgraph.graph.START, "llm_call")
 
-    agent_builder.add_edge("llm_call", langgraph.graph.END)
+def select_skill(user_query) -> Optional[str]:
+    """Name of the most relevant skill: embedding routing first, the LLM if that is ambiguous"""
 
-    # Compile the agent
-    agent = agent_builder.compile()
+    skill_name = route_skill(user_query)
+    if skill_name is not None:
+        print(f"skill_agent selected {skill_name} by embedding similarity")
+        return skill_name
 
-    # Invoke
-    from langchain.messages import HumanMessage
-    messages = [HumanMessage(content=f"List the most relevant skills what are connected to this user query: {user_query}")]
-    res = agent.invoke({"messages": messages})
+    selection = select_skills_with_llm(user_query)
+    if selection is None or not selection.skills:
+        return None
+    return selection.skills[0].name
 
-    print(res)
 
-    # Extract the SkillSelection object from the messages
-    # The last message should be the SkillSelection object
-    last_message = res["messages"][-1]
+def get_corresponding_skills_and_descriptions(user_query) -> str:
+    """This function load the skills
 
-    if isinstance(last_message, SkillSelection):
-        ret = "Skills:"
-        for skill in last_message.skills:
-            #print(skill)
-            skill_details = load_skill(skill.name)
-            ret += f"{skill_details} \n\n"
-        return ret
-    else:
+    Returns:
+        str: loaded skills (detailed)
+    """
+
+    skill_name = select_skill(user_query)
+    if skill_name is None:
         return "No skills selected"
+    return f"Skills:{load_skill(skill_name)} \n\n"
+
+
+def skill_router_node(state: dict):
+    """Graph node: selects the skill for state["user_query"] and stores it in the state"""
+
+    print("skill_agent skill_router_node() called")
 
+    skill_name = select_skill(state["user_query"])
+    if skill_name is None:
+        return {"skill": "", "skills": "No skills selected"}
+    return {"skill": skill_name, "skills": f"Skills:{load_skill(skill_name)} \n\n"}
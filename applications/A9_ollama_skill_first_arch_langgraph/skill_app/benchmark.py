@@ -0,0 +1,132 @@
+"""
+Latency comparison: one compiled pipeline graph vs. the previous two-graph flow.
+
+two-graph: per query a skill selection StateGraph is built, compiled and
+           invoked, then the executor graph runs with the selected skill
+single:    the skill_router -> llm_call <-> tool_node graph is compiled once
+           and invoked per query
+
+Both flows use the same skill routing (agents.skill_agent.select_skill), so
+the difference is the orchestration cost. The LLM response caches are cleared
+before every run.
+
+    uv run benchmark.py --repeat 5
+    uv run benchmark.py --compile-only   # graph construction only, no Ollama needed
+"""
+
+import argparse
+import statistics
+import time
+
+from langchain.messages import HumanMessage
+import langgraph.graph
+
+import agents.executor_agent
+import agents.skill_agent
+from states.state import MessagesState
+
+
+DEFAULT_QUERIES = [
+    "Please list the pods on the default namespace",
+    "Please check the customer notification service.",
+    "Which kubectl command shows the events of a namespace?",
+]
+
+
+def build_skill_graph():
+    """Skill selection graph as the two-graph flow built it for every query"""
+
+    def llm_call(state: dict):
+        skill_name = agents.skill_agent.select_skill(state["messages"][-1].content)
+        return {"messages": [HumanMessage(content=skill_name or "")], "llm_calls": 1}
+
+    agent_builder = langgraph.graph.StateGraph(MessagesState)
+    agent_builder.add_node("llm_call", llm_call)
+    agent_builder.add_edge(langgraph.graph.START, "llm_call")
+    agent_builder.add_edge("llm_call", langgraph.graph.END)
+    return agent_builder.compile()
+
+
+def run_two_graph(executor, user_query):
+    skill_graph = build_skill_graph()
+    res = skill_graph.invoke({"messages": [HumanMessage(content=user_query)]})
+    skill_name = res["messages"][-1].content
+    skills = f"Skills:{agents.skill_agent.load_skill(skill_name)} \n\n" if skill_name else "No skills selected"
+    messages = [agents.executor_agent.skills_system_message(skills), HumanMessage(content=user_query)]
+    return executor.invoke({"messages": messages})
+
+
+def run_single(agent, user_query):
+    return agent.invoke({"user_query": user_query, "messages": []})
+
+
+def clear_caches():
+    agents.skill_agent.response_cache.clear()
+    agents.executor_agent.response_cache.clear()
+
+
+def summarize(name, seconds):
+    seconds = sorted(seconds)
+    p95 = seconds[min(len(seconds) - 1, int(round(0.95 * (len(seconds) - 1))))]
+    print(f"{name:<12} n={len(seconds):<4} mean={statistics.mean(seconds) * 1000:9.2f} ms  "
+          f"median={statistics.median(seconds) * 1000:9.2f} ms  p95={p95 * 1000:9.2f} ms")
+
+
+def benchmark_compile(repeat):
+    """Graph construction cost per query of each flow"""
+
+    two_graph = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build_skill_graph()
+        two_graph.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    agents.executor_agent.build_and_compile_agent()
+    startup = time.perf_counter() - start
+
+    print("Graph construction per query")
+    summarize("two-graph", two_graph)
+    print(f"{'single':<12} 0 per query, {startup * 1000:.2f} ms once at startup")
+
+
+def benchmark_end_to_end(queries, repeat):
+    """End-to-end latency of each flow (needs Ollama and the cluster the tools talk to)"""
+
+    executor = agents.executor_agent.build_and_compile_executor()
+    agent = agents.executor_agent.build_and_compile_agent()
+
+    # Warm up: model load and skill index build shouldn't be measured
+    clear_caches()
+    run_single(agent, queries[0])
+
+    results = {"two-graph": [], "single": []}
+    for _ in range(repeat):
+        for user_query in queries:
+            for name, run in (("two-graph", lambda: run_two_graph(executor, user_query)),
+                              ("single", lambda: run_single(agent, user_query))):
+                clear_caches()
+                start = time.perf_counter()
+                run()
+                results[name].append(time.perf_counter() - start)
+
+    print("End-to-end latency per query")
+    for name, seconds in results.items():
+        summarize(name, seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the single compiled graph with the two-graph flow")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per query (default: 3, at least 100 with --compile-only)")
+    parser.add_argument("--query", action="append", help="Query to run (repeatable, default: built-in queries)")
+    parser.add_argument("--compile-only", action="store_true", help="Only measure graph construction")
+    args = parser.parse_args()
+
+    if args.compile_only:
+        benchmark_compile(max(args.repeat, 100))
+    else:
+        benchmark_end_to_end(args.query or DEFAULT_QUERIES, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
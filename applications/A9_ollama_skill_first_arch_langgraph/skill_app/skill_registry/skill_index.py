@@ -0,0 +1,61 @@
+import re
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .skills import Skill
+
+
+# texts -> one embedding vector per text
+Embedder = Callable[[List[str]], Sequence[Sequence[float]]]
+
+
+def skill_document(skill: Skill) -> str:
+    """Text that represents a skill in the index: name, description and content headings."""
+    headings = re.findall(r'^#+\s*(.+)$', skill["content"], re.MULTILINE)
+    name = re.sub(r'[_\-]+', ' ', skill["name"])
+    return "\n".join([name, skill["description"], *headings])
+
+
+class SkillIndex:
+    """Embedding index over the skills, ranks them for a query by cosine similarity."""
+
+    def __init__(self, skills: List[Skill], embedder: Embedder, previous: Optional["SkillIndex"] = None):
+        """Embed every skill once.
+
+        Args:
+            skills: Skills to index
+            embedder: Maps texts to embedding vectors
+            previous: Index of an earlier version of the skills, whose vectors
+                are reused for skills whose text did not change
+        """
+        self.names = [skill["name"] for skill in skills]
+        self.embedder = embedder
+        self.documents = [skill_document(skill) for skill in skills]
+
+        known = dict(zip(previous.documents, previous.matrix)) if previous is not None else {}
+        missing = [document for document in dict.fromkeys(self.documents) if document not in known]
+        if missing:
+            known.update(zip(missing, self._normalize(np.asarray(embedder(missing), dtype=np.float32))))
+        self.matrix = np.stack([known[document] for document in self.documents]) if skills else np.zeros((0, 0), dtype=np.float32)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def rank(self, query: str, k: int = 3) -> List[Tuple[str, float]]:
+        """Return the k most similar skills as (name, cosine similarity), best first.
+
+        Args:
+            query: User query
+            k: Number of skills to return
+        """
+        if not self.names:
+            return []
+        query_vector = self._normalize(np.asarray(self.embedder([query])[0], dtype=np.float32))
+        scores = self.matrix @ query_vector
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.names[i], float(scores[i])) for i in top]
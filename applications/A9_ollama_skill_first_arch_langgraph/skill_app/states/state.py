@@ -6,3 +6,9 @@ import operator
 class MessagesState(TypedDict):
     messages: Annotated[list[AnyMessage], operator.add]
     llm_calls: int
+
+
+class SkillAppState(MessagesState):
+    user_query: str
+    skill: str  # Skill selected by the router node
+    skills: str  # Instructions of the selected skill
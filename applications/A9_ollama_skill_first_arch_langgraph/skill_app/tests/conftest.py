@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app runs as a script from skill_app/ (`uv run main.py`), its packages are imported from there
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,159 @@
+"""Informer against a stubbed list call and watch stream."""
+
+import queue
+import time
+
+import pytest
+from kubernetes.client.rest import ApiException
+
+from tools import k8s_cache
+from tools.k8s_cache import Informer
+
+
+def pod(namespace, name, version, **labels):
+    return {"metadata": {"namespace": namespace, "name": name, "labels": labels, "resourceVersion": str(version)}}
+
+
+def names(objects):
+    return [obj["metadata"]["name"] for obj in objects]
+
+
+def wait_until(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+class FakeApiServer:
+    """List returns the current objects, watches replay the queued events (an exception ends the stream with it)."""
+
+    def __init__(self, objects):
+        self.objects = {(o["metadata"]["namespace"], o["metadata"]["name"]): o for o in objects}
+        self.version = 10
+        self.events = queue.Queue()
+        self.watches = []  # resourceVersion of every watch request
+
+    def list(self):
+        return list(self.objects.values()), str(self.version)
+
+    def watch(self, resource_version, timeout_seconds):
+        self.watches.append(resource_version)
+        while True:
+            event = self.events.get(timeout=5)
+            if event is None:
+                return
+            if isinstance(event, Exception):
+                raise event
+            yield event
+
+    def send(self, event_type, obj):
+        key = (obj["metadata"]["namespace"], obj["metadata"]["name"])
+        if event_type == "DELETED":
+            self.objects.pop(key, None)
+        else:
+            self.objects[key] = obj
+        self.version = int(obj["metadata"]["resourceVersion"])
+        self.events.put({"type": event_type, "object": obj})
+
+
+@pytest.fixture
+def server():
+    return FakeApiServer([
+        pod("default", "web-1", 1, app="web", tier="front"),
+        pod("default", "db-1", 2, app="db"),
+        pod("kube-system", "dns-1", 3, app="dns"),
+    ])
+
+
+@pytest.fixture
+def informer(server):
+    informer = Informer("pods", server.list, server.watch).start()
+    assert informer.wait_synced(2.0)
+    yield informer
+    informer.stop()
+    server.events.put(None)
+
+
+def test_watch_events(server, informer):
+    server.send("ADDED", pod("default", "web-2", 11, app="web"))
+    server.send("MODIFIED", pod("default", "db-1", 12, app="db", tier="back"))
+    server.send("DELETED", pod("kube-system", "dns-1", 13, app="dns"))
+    wait_until(lambda: informer.events == 3)
+
+    assert names(informer.list()) == ["db-1", "web-1", "web-2"]
+    assert names(informer.list(namespace="kube-system")) == []
+    assert informer.resource_version == "13"
+    assert informer.lists == 1
+
+
+def test_relist_after_410(server, informer):
+    # Changes the watch misses, then the resourceVersion expires
+    server.objects.pop(("default", "web-1"))
+    server.objects[("default", "cache-1")] = pod("default", "cache-1", 20, app="cache")
+    server.version = 20
+    server.events.put(ApiException(status=410, reason="Gone"))
+
+    wait_until(lambda: informer.lists == 2)
+    wait_until(lambda: len(server.watches) == 2)
+    assert names(informer.list(namespace="default")) == ["cache-1", "db-1"]
+    assert server.watches == ["10", "20"]
+
+
+def test_label_index(server, informer):
+    server.send("ADDED", pod("other", "web-3", 11, app="web", tier="back"))
+    wait_until(lambda: informer.events == 1)
+
+    assert names(informer.list(label_selector="app=web")) == ["web-1", "web-3"]
+    assert names(informer.list(namespace="default", label_selector="app=web")) == ["web-1"]
+    assert names(informer.list(label_selector="app=web,tier!=back")) == ["web-1"]
+    assert names(informer.list(label_selector="tier")) == ["web-1", "web-3"]
+    assert names(informer.list(namespace="default", label_selector="!tier")) == ["db-1"]
+
+    # Relabeled objects move in the index
+    server.send("MODIFIED", pod("other", "web-3", 12, app="api"))
+    wait_until(lambda: informer.events == 2)
+    assert names(informer.list(label_selector="app=web")) == ["web-1"]
+    assert names(informer.list(label_selector="app=api")) == ["web-3"]
+
+    with pytest.raises(ValueError):
+        informer.list(label_selector="app in (web,db)")
+
+
+def test_staleness(server, informer):
+    assert informer.fresh(max_staleness=60)
+    time.sleep(0.2)
+    assert not informer.fresh(max_staleness=0.1)
+    # Any event (or bookmark) confirms the store again
+    server.events.put({"type": "BOOKMARK", "object": pod("", "", 30)})
+    wait_until(lambda: informer.events == 1)
+    assert informer.fresh(max_staleness=0.1)
+    assert informer.resource_version == "30"
+
+
+def test_cached_list(monkeypatch, server):
+    monkeypatch.setattr(k8s_cache, "ENABLED", True)
+    factory = lambda: Informer("test-pods", server.list, server.watch)
+    try:
+        assert names(k8s_cache.cached_list("test-pods", factory, namespace="default")) == ["db-1", "web-1"]
+        assert k8s_cache.cached_list("test-pods", factory, label_selector="app in (web)") is None
+        assert k8s_cache.cached_list("test-pods", factory, max_staleness=0) is None
+    finally:
+        k8s_cache.stop_all()
+        server.events.put(None)
+
+
+def test_failed_list_falls_back_without_waiting(monkeypatch):
+    monkeypatch.setattr(k8s_cache, "ENABLED", True)
+
+    def forbidden():
+        raise ApiException(status=403, reason="Forbidden")
+
+    factory = lambda: Informer("forbidden-pods", forbidden, lambda rv, timeout: iter(()))
+    try:
+        for _ in range(3):
+            started = time.monotonic()
+            assert k8s_cache.cached_list("forbidden-pods", factory) is None
+            assert time.monotonic() - started < 1.0
+    finally:
+        k8s_cache.stop_all()
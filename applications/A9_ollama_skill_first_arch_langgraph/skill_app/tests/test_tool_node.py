@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+from langchain.messages import AIMessage
+
+import agents.executor_agent as executor_agent
+
+
+@pytest.fixture
+def fake_tools(monkeypatch):
+    """Tools that sleep for args["seconds"] or block until args["until"] is set"""
+
+    def run_tool(tool_call):
+        args = tool_call["args"]
+        if "until" in args:
+            args["until"].wait()
+        time.sleep(args.get("seconds", 0))
+        return f"{tool_call['name']} done"
+
+    monkeypatch.setattr(executor_agent, "run_tool", run_tool)
+    monkeypatch.setattr(executor_agent, "tools_by_name", {"slow": None, "hang": None})
+    monkeypatch.setattr(executor_agent, "TOOL_TIMEOUTS", {})
+
+
+def turn(*calls):
+    tool_calls = [{"name": name, "args": args, "id": str(i)} for i, (name, args) in enumerate(calls)]
+    return executor_agent.tool_node({"messages": [AIMessage(content="", tool_calls=tool_calls)]})["messages"]
+
+
+def test_calls_beyond_the_worker_count_get_their_full_timeout(fake_tools, monkeypatch):
+    monkeypatch.setattr(executor_agent, "TOOL_TIMEOUT", 0.5)
+    count = executor_agent.TOOL_WORKERS * 2
+
+    messages = turn(*[("slow", {"seconds": 0.3})] * count)
+
+    assert [m.status for m in messages] == ["success"] * count
+    assert [m.tool_call_id for m in messages] == [str(i) for i in range(count)]
+
+
+def test_hung_calls_dont_starve_later_turns(fake_tools, monkeypatch):
+    monkeypatch.setattr(executor_agent, "TOOL_TIMEOUT", 0.2)
+    release = threading.Event()
+    try:
+        hung = turn(*[("hang", {"until": release})] * executor_agent.TOOL_WORKERS)
+        later = turn(("slow", {}))
+    finally:
+        release.set()
+
+    assert all(m.status == "error" and "did not finish within 0.2s" in m.content for m in hung)
+    assert later[0].status == "success" and later[0].content == "slow done"
+
+
+def test_unknown_tool(fake_tools):
+    messages = turn(("missing", {}), ("slow", {}))
+
+    assert messages[0].status == "error" and "unknown tool missing" in messages[0].content
+    assert messages[1].status == "success"
@@ -1,122 +1,124 @@
 """Customer Notification tools for interacting with K8s customer notification resources."""
 
-from typing import List, Dict, Any
+import os
+from typing import Dict, Any, Optional
 from langchain_core.tools import tool
-from kubernetes import client, config
 from kubernetes.client.rest import ApiException
 
+from tools.k8s_cache import api_informer, cached_list
+from tools.k8s_client import custom_objects
+from tools.kubernetes_tools import POD_COLUMNS, iter_pods, pod_row, pod_summary
+from tools.output_format import DEFAULT_PAGE_SIZE, render_table
+
+# CustomerNotification CRD
+GROUP = "operator.kyma-project.io"
+VERSION = "v1alpha1"  # Common version for Kyma operators, adjust if needed
+PLURAL = "customernotifications"
+
+# Label selector of the operator pods, e.g. "app.kubernetes.io/name=customer-notification"
+POD_LABEL_SELECTOR = os.environ.get("CUSTOMER_NOTIFICATION_POD_SELECTOR") or None
+
+NOTIFICATION_COLUMNS = ["name", "namespace", "status", "type", "schedule", "creation_timestamp", "labels"]
 
-def load_k8s_config():
-    """Load Kubernetes configuration from default kubeconfig."""
-    try:
-        config.load_kube_config()
-    except Exception:
-        # Fallback to in-cluster config if running inside a pod
-        config.load_incluster_config()
+
+def customer_notifications_informer():
+    """CustomerNotification resources of all namespaces."""
+    return api_informer(
+        "customernotifications",
+        custom_objects().list_cluster_custom_object,
+        group=GROUP,
+        version=VERSION,
+        plural=PLURAL
+    )
 
 
 @tool
-def list_customer_notification_pods(namespace: str = "kcp-system") -> List[Dict[str, Any]]:
+def list_customer_notification_pods(
+    namespace: str = "kcp-system",
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None
+) -> str:
     """
-    List all customer notification operator pods in the kcp-system namespace.
+    List the customer notification operator pods in the kcp-system namespace.
     Specifically looks for pods matching 'customer-notification' pattern.
 
     Args:
         namespace: The Kubernetes namespace to query (default: "kcp-system")
+        limit: Maximum number of pods to return (default: 50)
+        cursor: Cursor from the "more results" line of the previous call, omit for the first page
 
     Returns:
-        List of dictionaries containing customer notification pod information
+        Table with one pod per line (name, status, ready containers, restarts, IPs,
+        start time, containers, labels) and the cursor of the next page if there are more pods
     """
-    load_k8s_config()
-    v1 = client.CoreV1Api()
-
     try:
-        pods = v1.list_namespaced_pod(namespace=namespace)
-
-        # Filter pods specifically for customer-notification operator
-        cn_pods = []
-        for pod in pods.items:
-            # Only include pods with "customer-notification" in the name
-            if "customer-notification" in pod.metadata.name.lower():
-                pod_info = {
-                    "name": pod.metadata.name,
-                    "namespace": pod.metadata.namespace,
-                    "status": pod.status.phase,
-                    "pod_ip": pod.status.pod_ip,
-                    "host_ip": pod.status.host_ip,
-                    "start_time": str(pod.status.start_time) if pod.status.start_time else None,
-                    "containers": [
-                        {
-                            "name": container.name,
-                            "image": container.image,
-                            "ready": container_status.ready if container_status else False,
-                            "restart_count": container_status.restart_count if container_status else 0,
-                        }
-                        for container in pod.spec.containers
-                        for container_status in (pod.status.container_statuses or [])
-                        if container_status.name == container.name
-                    ],
-                    "labels": pod.metadata.labels or {},
-                }
-                cn_pods.append(pod_info)
-
-        return cn_pods
+        # Narrowed server-side when the operator pods' labels are configured;
+        # the name check also covers pods without those labels
+        rows = (
+            pod_row(pod_summary(pod))
+            for pod in iter_pods(namespace, label_selector=POD_LABEL_SELECTOR)
+            if "customer-notification" in (pod.get("metadata") or {}).get("name", "").lower()
+        )
+        return render_table(rows, POD_COLUMNS, cursor=cursor, limit=limit, title="customer notification pods")
 
     except ApiException as e:
         raise Exception(f"Error listing customer notification pods in namespace '{namespace}': {e}")
 
 
 @tool
-def list_customer_notifications(namespace: str = "kcp-system") -> List[Dict[str, Any]]:
+def list_customer_notifications(
+    namespace: str = "kcp-system",
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None
+) -> str:
     """
-    List all customer notification custom resources in the kcp-system namespace.
+    List the customer notification custom resources in the kcp-system namespace.
     This shows CustomerNotification, MajorUpgrade, and PlannedMaintenance resources.
+    Use get_customer_notification_details for the annotations, spec and status of one resource.
 
     Args:
         namespace: The Kubernetes namespace to query (default: "kcp-system")
+        limit: Maximum number of resources to return (default: 50)
+        cursor: Cursor from the "more results" line of the previous call, omit for the first page
 
     Returns:
-        List of dictionaries containing customer notification custom resource information
+        Table with one resource per line (name, namespace, status, type, schedule,
+        creation timestamp, labels) and the cursor of the next page if there are more
     """
-    load_k8s_config()
-    custom_api = client.CustomObjectsApi()
+    custom_api = custom_objects()
 
     try:
-        # Query the custom resource based on the CRD definition
-        group = "operator.kyma-project.io"
-        version = "v1alpha1"  # Common version for Kyma operators, adjust if needed
-        plural = "customernotifications"
-
-        crs = custom_api.list_namespaced_custom_object(
-            group=group,
-            version=version,
-            namespace=namespace,
-            plural=plural
-        )
+        items = cached_list("customernotifications", customer_notifications_informer, namespace=namespace)
+        if items is None:
+            # Query the custom resource based on the CRD definition
+            items = custom_api.list_namespaced_custom_object(
+                group=GROUP,
+                version=VERSION,
+                namespace=namespace,
+                plural=PLURAL
+            ).get("items", [])
+
+        def rows():
+            for item in items:
+                metadata = item.get("metadata", {})
+                status = item.get("status", {})
+                spec = item.get("spec", {})
+
+                # Extract nested fields based on the CRD structure
+                notification_params = spec.get("notificationparameters", {})
+                parameters = spec.get("parameters", {})
+
+                yield {
+                    "name": metadata.get("name"),
+                    "namespace": metadata.get("namespace"),
+                    "status": status.get("mainstate", "Unknown"),
+                    "type": notification_params.get("type", "Unknown"),
+                    "schedule": parameters.get("schedule", ""),
+                    "creation_timestamp": metadata.get("creationTimestamp", ""),
+                    "labels": metadata.get("labels", {}),
+                }
 
-        notifications = []
-        for item in crs.get("items", []):
-            metadata = item.get("metadata", {})
-            status = item.get("status", {})
-            spec = item.get("spec", {})
-
-            # Extract nested fields based on the CRD structure
-            notification_params = spec.get("notificationparameters", {})
-            parameters = spec.get("parameters", {})
-
-            notification_info = {
-                "name": metadata.get("name"),
-                "namespace": metadata.get("namespace"),
-                "status": status.get("mainstate", "Unknown"),
-                "type": notification_params.get("type", "Unknown"),
-                "schedule": parameters.get("schedule", ""),
-                "creation_timestamp": metadata.get("creationTimestamp", ""),
-                "labels": metadata.get("labels", {}),
-                "annotations": metadata.get("annotations", {}),
-            }
-            notifications.append(notification_info)
-
-        return notifications
+        return render_table(rows(), NOTIFICATION_COLUMNS, cursor=cursor, limit=limit, title="customer notifications")
 
     except ApiException as e:
         raise Exception(f"Error listing customer notifications in namespace '{namespace}': {e}")
@@ -137,20 +139,15 @@ def get_customer_notification_details(
     Returns:
         Dictionary containing detailed customer notification information
     """
-    load_k8s_config()
-    custom_api = client.CustomObjectsApi()
+    custom_api = custom_objects()
 
     try:
         # Query the specific custom resource based on the CRD definition
-        group = "operator.kyma-project.io"
-        version = "v1alpha1"  # Common version for Kyma operators, adjust if needed
-        plural = "customernotifications"
-
         cr = custom_api.get_namespaced_custom_object(
-            group=group,
-            version=version,
+            group=GROUP,
+            version=VERSION,
             namespace=namespace,
-            plural=plural,
+            plural=PLURAL,
             name=name
         )
 
@@ -0,0 +1,336 @@
+"""Optional watch-based cache of Kubernetes objects for the tools (informers).
+
+An informer LISTs a resource once, then WATCHes it from the list's
+resourceVersion and applies the ADDED/MODIFIED/DELETED events to an in-memory
+store indexed by namespace and by label. The tools read from the store instead
+of sending a LIST to the API server on every call.
+
+Enable with K8S_INFORMER_CACHE=1. A read only uses the cache when the informer
+has synced and has heard from the API server (event, bookmark or watch
+timeout) within K8S_CACHE_MAX_STALENESS seconds; otherwise `cached_list`
+returns None and the tool reads directly from the API server. Reads only wait
+for the informer while its first list is in flight: once a list has failed
+(e.g. RBAC forbids the cluster-wide list), they fall back right away.
+
+`Informer` takes the list and watch calls as plain functions, so it can run
+against a fake API server or a stubbed watch stream.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+
+from tools.k8s_client import core_v1
+
+
+ENABLED = os.environ.get("K8S_INFORMER_CACHE", "").lower() in ("1", "true", "yes")
+MAX_STALENESS = float(os.environ.get("K8S_CACHE_MAX_STALENESS", "120"))
+SYNC_TIMEOUT = 10.0  # Seconds a read waits for the first list
+WATCH_TIMEOUT = 60  # Server-side watch timeout, the stream is reopened after it
+MAX_BACKOFF = 30.0
+
+# () -> (objects, resourceVersion)
+ListFn = Callable[[], Tuple[List[Any], str]]
+# (resourceVersion, timeout_seconds) -> watch events {"type", "object"}
+WatchFn = Callable[[str, int], Iterable[Dict[str, Any]]]
+
+_Key = Tuple[str, str]  # (namespace, name)
+
+
+def object_meta(obj: Any) -> Tuple[str, str, Dict[str, str], Optional[str]]:
+    """(namespace, name, labels, resourceVersion) of a model object or a plain dict (custom resources)."""
+    if isinstance(obj, dict):
+        metadata = obj.get("metadata") or {}
+        return (metadata.get("namespace") or "", metadata.get("name") or "",
+                metadata.get("labels") or {}, metadata.get("resourceVersion"))
+    metadata = obj.metadata
+    return metadata.namespace or "", metadata.name or "", metadata.labels or {}, metadata.resource_version
+
+
+def parse_label_selector(selector: str) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    Parse an equality-based label selector ("app=x,tier!=db,release,!canary").
+
+    Returns:
+        (key, operator, value) triples, operator one of "=", "!=", "exists", "!exists"
+
+    Raises:
+        ValueError: For set-based selectors (in, notin), which are left to the API server
+    """
+    requirements = []
+    for term in filter(None, (term.strip() for term in selector.split(","))):
+        if " in " in term or " notin " in term or "(" in term:
+            raise ValueError(f"Unsupported label selector: {term}")
+        if "!=" in term:
+            key, value = term.split("!=", 1)
+            requirements.append((key.strip(), "!=", value.strip()))
+        elif "=" in term:
+            key, value = term.replace("==", "=").split("=", 1)
+            requirements.append((key.strip(), "=", value.strip()))
+        elif term.startswith("!"):
+            requirements.append((term[1:].strip(), "!exists", None))
+        else:
+            requirements.append((term, "exists", None))
+    return requirements
+
+
+class Informer:
+    """List+watch cache of one resource type."""
+
+    def __init__(self, name: str, list_fn: ListFn, watch_fn: WatchFn, watch_timeout: int = WATCH_TIMEOUT):
+        """
+        Args:
+            name: Name used in messages
+            list_fn: Full list of the resource
+            watch_fn: Watch stream starting after a resourceVersion
+            watch_timeout: Server-side timeout of one watch request
+        """
+        self.name = name
+        self.list_fn = list_fn
+        self.watch_fn = watch_fn
+        self.watch_timeout = watch_timeout
+
+        self._lock = threading.Lock()
+        self._objects: Dict[_Key, Any] = {}
+        self._by_namespace: Dict[str, Set[_Key]] = {}
+        self._by_label: Dict[Tuple[str, str], Set[_Key]] = {}
+        self.resource_version: Optional[str] = None
+        self.last_heard = 0.0  # monotonic time of the last list/event/watch timeout
+
+        self._synced = threading.Event()
+        self._settled = threading.Event()  # The first list succeeded or failed
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Counters
+        self.lists = 0
+        self.events = 0
+
+    # --- store ---------------------------------------------------------
+
+    def _index(self, key: _Key, obj: Any) -> None:
+        namespace, _, labels, _ = object_meta(obj)
+        self._objects[key] = obj
+        self._by_namespace.setdefault(namespace, set()).add(key)
+        for label in labels.items():
+            self._by_label.setdefault(label, set()).add(key)
+
+    def _unindex(self, key: _Key) -> None:
+        obj = self._objects.pop(key, None)
+        if obj is None:
+            return
+        namespace, _, labels, _ = object_meta(obj)
+        self._by_namespace.get(namespace, set()).discard(key)
+        for label in labels.items():
+            keys = self._by_label.get(label)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_label[label]
+
+    def replace(self, objects: List[Any], resource_version: str) -> None:
+        """Set the store to a full list."""
+        with self._lock:
+            self._objects, self._by_namespace, self._by_label = {}, {}, {}
+            for obj in objects:
+                namespace, name, _, _ = object_meta(obj)
+                self._index((namespace, name), obj)
+            self.resource_version = resource_version
+            self.last_heard = time.monotonic()
+        self._synced.set()
+        self._settled.set()
+
+    def apply(self, event: Dict[str, Any]) -> None:
+        """Apply one watch event."""
+        obj = event["object"]
+        namespace, name, _, resource_version = object_meta(obj)
+        with self._lock:
+            if event["type"] in ("ADDED", "MODIFIED"):
+                self._unindex((namespace, name))
+                self._index((namespace, name), obj)
+            elif event["type"] == "DELETED":
+                self._unindex((namespace, name))
+            # BOOKMARK only moves the resourceVersion
+            if resource_version:
+                self.resource_version = resource_version
+            self.last_heard = time.monotonic()
+            self.events += 1
+
+    # --- reads ---------------------------------------------------------
+
+    def fresh(self, max_staleness: float = MAX_STALENESS) -> bool:
+        """Whether the store is synced and was confirmed within max_staleness seconds."""
+        return self._synced.is_set() and time.monotonic() - self.last_heard <= max_staleness
+
+    def wait_synced(self, timeout: float) -> bool:
+        """Whether the store is synced, waiting up to timeout while the first list is in flight."""
+        self._settled.wait(timeout)
+        return self._synced.is_set()
+
+    def list(self, namespace: Optional[str] = None, label_selector: Optional[str] = None) -> List[Any]:
+        """
+        Objects of a namespace (None: all namespaces) matching a label selector.
+
+        Raises:
+            ValueError: For label selectors the cache can't evaluate
+        """
+        requirements = parse_label_selector(label_selector) if label_selector else []
+        with self._lock:
+            keys = set(self._objects) if namespace is None else set(self._by_namespace.get(namespace, ()))
+            # Narrow with the label index first, then check the remaining requirements
+            for key, operator, value in requirements:
+                if operator == "=":
+                    keys &= self._by_label.get((key, value), set())
+            objects = [self._objects[key] for key in sorted(keys)]
+
+        def matches(obj: Any) -> bool:
+            labels = object_meta(obj)[2]
+            for key, operator, value in requirements:
+                if operator == "!=" and labels.get(key) == value:
+                    return False
+                if operator == "exists" and key not in labels:
+                    return False
+                if operator == "!exists" and key in labels:
+                    return False
+            return True
+
+        return [obj for obj in objects if matches(obj)]
+
+    # --- list + watch loop ---------------------------------------------
+
+    def start(self) -> "Informer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"informer-{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _relist(self) -> None:
+        objects, resource_version = self.list_fn()
+        self.lists += 1
+        self.replace(objects, resource_version)
+
+    def _run(self) -> None:
+        backoff = 1.0
+        need_list = True
+        while not self._stop.is_set():
+            try:
+                if need_list:
+                    self._relist()
+                    need_list = False
+                started = time.monotonic()
+                for event in self.watch_fn(self.resource_version, self.watch_timeout):
+                    if self._stop.is_set():
+                        return
+                    self.apply(event)
+                # Watch timed out normally: the connection and the data are fine
+                with self._lock:
+                    self.last_heard = time.monotonic()
+                backoff = 1.0
+                if time.monotonic() - started < 1.0:
+                    # Don't spin on a server that closes watches right away
+                    self._stop.wait(1.0)
+            except ApiException as e:
+                if e.status == 410:
+                    # resourceVersion too old: start over with a fresh list
+                    need_list = True
+                    continue
+                print(f"Informer {self.name}: {e}, retrying in {backoff:.0f}s")
+                need_list = True
+                self._settled.set()
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+            except Exception as e:
+                print(f"Informer {self.name}: {e}, retrying in {backoff:.0f}s")
+                need_list = True
+                self._settled.set()
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+
+
+def api_informer(name: str, list_method: Callable, **kwargs) -> Informer:
+    """
+    Informer over a kubernetes client list method (e.g. CoreV1Api.list_pod_for_all_namespaces).
+
+    Args:
+        name: Name used in messages
+        list_method: List call of the resource, supports watch=True
+        **kwargs: Arguments of the list call (group, version, plural for custom objects)
+    """
+    def list_fn() -> Tuple[List[Any], str]:
+        result = list_method(**kwargs)
+        if isinstance(result, dict):
+            return result.get("items", []), result.get("metadata", {}).get("resourceVersion", "")
+        return result.items, result.metadata.resource_version
+
+    def watch_fn(resource_version: str, timeout_seconds: int) -> Iterator[Dict[str, Any]]:
+        return watch.Watch().stream(
+            list_method,
+            resource_version=resource_version,
+            timeout_seconds=timeout_seconds,
+            allow_watch_bookmarks=True,
+            **kwargs
+        )
+
+    return Informer(name, list_fn, watch_fn)
+
+
+def pods_informer() -> Informer:
+    """Pods of all namespaces."""
+    return api_informer("pods", core_v1().list_pod_for_all_namespaces)
+
+
+def namespaces_informer() -> Informer:
+    return api_informer("namespaces", core_v1().list_namespace)
+
+
+_lock = threading.Lock()
+_informers: Dict[str, Informer] = {}
+
+
+def get_informer(name: str, factory: Callable[[], Informer]) -> Informer:
+    """Shared informer by name, created and started on first use."""
+    with _lock:
+        informer = _informers.get(name)
+        if informer is None:
+            informer = _informers[name] = factory().start()
+    return informer
+
+
+def cached_list(
+    name: str,
+    factory: Callable[[], Informer],
+    namespace: Optional[str] = None,
+    label_selector: Optional[str] = None,
+    max_staleness: float = MAX_STALENESS
+) -> Optional[List[Any]]:
+    """
+    Objects from the informer cache, or None if the caller should read from the API server.
+
+    Returns None when the cache is disabled, not synced (waiting up to
+    SYNC_TIMEOUT only while the first list is in flight), older than
+    max_staleness or can't evaluate the label selector.
+    """
+    if not ENABLED:
+        return None
+    informer = get_informer(name, factory)
+    if not informer.wait_synced(SYNC_TIMEOUT) or not informer.fresh(max_staleness):
+        return None
+    try:
+        return informer.list(namespace=namespace, label_selector=label_selector)
+    except ValueError:
+        return None
+
+
+def stop_all() -> None:
+    """Stop and forget every informer (e.g. after switching the kubeconfig context)."""
+    with _lock:
+        for informer in _informers.values():
+            informer.stop()
+        _informers.clear()
@@ -0,0 +1,119 @@
+"""Process-wide Kubernetes API client shared by the tools.
+
+The kubeconfig (or in-cluster config) is loaded once, and all tools share one
+ApiClient whose urllib3 pool keeps the TLS connections to the API server open.
+Bearer tokens with an expiry (exec/OIDC plugins, projected service account
+tokens) are refreshed by the client's refresh hook. If the API server still
+answers 401, the config is loaded again and the request retried once.
+"""
+
+import functools
+import os
+import threading
+from typing import Optional
+
+from kubernetes import client, config
+from kubernetes.client import rest
+from kubernetes.client.rest import ApiException
+
+
+# Connections kept open to the API server, >= concurrent tool calls
+POOL_SIZE = int(os.environ.get("K8S_POOL_SIZE", "16"))
+
+
+def load_configuration() -> client.Configuration:
+    """Load the kubeconfig, or the in-cluster config when running inside a pod."""
+    configuration = client.Configuration()
+    try:
+        config.load_kube_config(client_configuration=configuration)
+    except Exception:
+        # Fallback to in-cluster config if running inside a pod
+        config.load_incluster_config(client_configuration=configuration)
+    configuration.connection_pool_maxsize = POOL_SIZE
+    return configuration
+
+
+class RefreshingApiClient(client.ApiClient):
+    """ApiClient whose credentials can be reloaded in place (the API objects keep working)."""
+
+    def __init__(self, configuration: client.Configuration):
+        super().__init__(configuration)
+        self._reload_lock = threading.Lock()
+
+    def reload(self) -> None:
+        """Load the config again and reconnect (new client certificates need a new pool)."""
+        with self._reload_lock:
+            old_rest_client = self.rest_client
+            self.configuration = load_configuration()
+            self.rest_client = rest.RESTClientObject(self.configuration)
+            old_rest_client.pool_manager.clear()
+
+
+class _RetryOnUnauthorized:
+    """Wraps a generated API object: a call answered with 401 reloads the credentials and is retried once."""
+
+    def __init__(self, api, api_client: RefreshingApiClient):
+        self._api = api
+        self._api_client = api_client
+
+    def __getattr__(self, name):
+        attribute = getattr(self._api, name)
+        if not callable(attribute):
+            return attribute
+
+        # wraps: kubernetes.watch reads the return type from the docstring/annotations
+        @functools.wraps(attribute)
+        def call(*args, **kwargs):
+            try:
+                return attribute(*args, **kwargs)
+            except ApiException as e:
+                if e.status != 401:
+                    raise
+                self._api_client.reload()
+                # Request headers are built per call, so the retry uses the new credentials
+                return attribute(*args, **kwargs)
+
+        return call
+
+
+_lock = threading.Lock()
+_api_client: Optional[RefreshingApiClient] = None
+_core_v1: Optional[_RetryOnUnauthorized] = None
+_custom_objects: Optional[_RetryOnUnauthorized] = None
+
+
+def get_api_client() -> RefreshingApiClient:
+    """Shared ApiClient, created on first use (thread-safe)."""
+    global _api_client
+    if _api_client is None:
+        with _lock:
+            if _api_client is None:
+                _api_client = RefreshingApiClient(load_configuration())
+    return _api_client
+
+
+def core_v1() -> client.CoreV1Api:
+    """CoreV1Api on the shared ApiClient."""
+    global _core_v1
+    if _core_v1 is None:
+        api_client = get_api_client()
+        _core_v1 = _RetryOnUnauthorized(client.CoreV1Api(api_client), api_client)
+    return _core_v1
+
+
+def custom_objects() -> client.CustomObjectsApi:
+    """CustomObjectsApi on the shared ApiClient."""
+    global _custom_objects
+    if _custom_objects is None:
+        api_client = get_api_client()
+        _custom_objects = _RetryOnUnauthorized(client.CustomObjectsApi(api_client), api_client)
+    return _custom_objects
+
+
+def reset() -> None:
+    """Drop the shared client, e.g. after switching the kubeconfig context."""
+    global _api_client, _core_v1, _custom_objects
+    with _lock:
+        if _api_client is not None:
+            _api_client.rest_client.pool_manager.clear()
+        _api_client = _core_v1 = _custom_objects = None
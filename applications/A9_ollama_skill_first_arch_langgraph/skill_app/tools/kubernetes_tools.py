@@ -1,62 +1,127 @@
 """Kubernetes tools for interacting with K8s clusters."""
 
-from typing import List, Dict, Any, Optional
+import json
+import re
+from datetime import datetime
+from typing import Iterator, Dict, Any, Optional
 from langchain_core.tools import tool
-from kubernetes import client, config
 from kubernetes.client.rest import ApiException
 
+from tools.k8s_cache import cached_list, namespaces_informer, pods_informer
+from tools.k8s_client import core_v1
+from tools.output_format import DEFAULT_PAGE_SIZE, render_table
+from tools.pod_logs import read_pod_log
 
-def load_k8s_config():
-    """Load Kubernetes configuration from default kubeconfig."""
-    try:
-        config.load_kube_config()
-    except Exception:
-        # Fallback to in-cluster config if running inside a pod
-        config.load_incluster_config()
+
+# Pods per LIST request, huge namespaces are read in pages
+PAGE_SIZE = 500
+
+POD_COLUMNS = ["name", "status", "ready", "restarts", "pod_ip", "host_ip", "start_time", "containers", "labels"]
+NAMESPACE_COLUMNS = ["name", "status", "creation_timestamp", "labels"]
+
+
+def iter_pods(
+    namespace: str,
+    label_selector: Optional[str] = None,
+    field_selector: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Pods of a namespace as plain JSON dicts, page by page.
+
+    The API response is parsed as JSON instead of being deserialized into
+    V1Pod models, callers pick the fields they need (see pod_summary).
+    """
+    if field_selector is None:
+        cached = cached_list("pods", pods_informer, namespace=namespace, label_selector=label_selector)
+        if cached is not None:
+            serialize = core_v1().api_client.sanitize_for_serialization
+            yield from (serialize(pod) for pod in cached)
+            return
+
+    token = None
+    while True:
+        response = core_v1().list_namespaced_pod(
+            namespace=namespace,
+            label_selector=label_selector,
+            field_selector=field_selector,
+            limit=PAGE_SIZE,
+            _continue=token,
+            _preload_content=False
+        )
+        page = json.loads(response.data)
+        yield from page.get("items") or []
+        token = (page.get("metadata") or {}).get("continue")
+        if not token:
+            return
+
+
+def _timestamp(value: Optional[str]) -> Optional[str]:
+    """Format an API timestamp like str(datetime), as the model objects did."""
+    if not value:
+        return None
+    return str(datetime.fromisoformat(value.replace("Z", "+00:00")))
+
+
+def pod_summary(pod: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields returned by the pod list tools, from a pod JSON dict."""
+    metadata = pod.get("metadata") or {}
+    spec = pod.get("spec") or {}
+    status = pod.get("status") or {}
+    container_statuses = {
+        container_status["name"]: container_status
+        for container_status in status.get("containerStatuses") or []
+    }
+
+    containers = []
+    for container in spec.get("containers") or []:
+        container_status = container_statuses.get(container["name"])
+        containers.append({
+            "name": container["name"],
+            "image": container.get("image"),
+            "ready": container_status.get("ready", False) if container_status else False,
+            "restart_count": container_status.get("restartCount", 0) if container_status else 0,
+        })
+
+    return {
+        "name": metadata.get("name"),
+        "namespace": metadata.get("namespace"),
+        "status": status.get("phase"),
+        "pod_ip": status.get("podIP"),
+        "host_ip": status.get("hostIP"),
+        "start_time": _timestamp(status.get("startTime")),
+        "containers": containers,
+        "labels": metadata.get("labels") or {},
+    }
+
+
+def pod_row(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Table row (POD_COLUMNS) of a pod_summary."""
+    containers = summary["containers"]
+    return {
+        **summary,
+        "ready": f"{sum(1 for container in containers if container['ready'])}/{len(containers)}",
+        "restarts": sum(container["restart_count"] for container in containers),
+        "containers": [f"{container['name']}={container['image']}" for container in containers],
+    }
 
 
 @tool
-def list_pods(namespace: str = "default") -> List[Dict[str, Any]]:
+def list_pods(namespace: str = "default", limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> str:
     """
-    List all pods in a specific namespace.
+    List the pods in a specific namespace, one page at a time.
 
     Args:
         namespace: The Kubernetes namespace to query (default: "default")
+        limit: Maximum number of pods to return (default: 50)
+        cursor: Cursor from the "more results" line of the previous call, omit for the first page
 
     Returns:
-        List of dictionaries containing pod information
+        Table with one pod per line (name, status, ready containers, restarts, IPs,
+        start time, containers, labels) and the cursor of the next page if there are more pods
     """
-    load_k8s_config()
-    v1 = client.CoreV1Api()
-
     try:
-        pods = v1.list_namespaced_pod(namespace=namespace)
-
-        pod_list = []
-        for pod in pods.items:
-            pod_info = {
-                "name": pod.metadata.name,
-                "namespace": pod.metadata.namespace,
-                "status": pod.status.phase,
-                "pod_ip": pod.status.pod_ip,
-                "host_ip": pod.status.host_ip,
-                "start_time": str(pod.status.start_time) if pod.status.start_time else None,
-                "containers": [
-                    {
-                        "name": container.name,
-                        "image": container.image,
-                        "ready": container_status.ready if container_status else False,
-                        "restart_count": container_status.restart_count if container_status else 0,
-                    }
-                    for container in pod.spec.containers
-                    for container_status in (pod.status.container_statuses or [])
-                    if container_status.name == container.name
-                ],
-                "labels": pod.metadata.labels or {},
-            }
-            pod_list.append(pod_info)
-
-        return pod_list
+        rows = (pod_row(pod_summary(pod)) for pod in iter_pods(namespace))
+        return render_table(rows, POD_COLUMNS, cursor=cursor, limit=limit, title="pods")
 
     except ApiException as e:
         raise Exception(f"Error listing pods in namespace '{namespace}': {e}")
@@ -74,8 +139,7 @@ def get_pod_details(pod_name: str, namespace: str = "default") -> Dict[str, Any]
     Returns:
         Dictionary containing detailed pod information
     """
-    load_k8s_config()
-    v1 = client.CoreV1Api()
+    v1 = core_v1()
 
     try:
         pod = v1.read_namespaced_pod(name=pod_name, namespace=namespace)
@@ -117,61 +181,86 @@ def get_pod_logs(
     pod_name: str,
     namespace: str = "default",
     container: Optional[str] = None,
-    tail_lines: Optional[int] = None
+    tail_lines: Optional[int] = None,
+    since_seconds: Optional[int] = None,
+    limit_bytes: Optional[int] = None,
+    grep: Optional[str] = None,
+    ignore_case: bool = False,
+    new_only: bool = False,
+    previous: bool = False
 ) -> str:
     """
-    Get logs from a specific pod.
+    Get logs from a specific pod, bounded in size.
+
+    Without tail_lines, since_seconds or new_only the last 200 lines are
+    returned. When the log is longer than the output size, the newest lines
+    are kept.
 
     Args:
         pod_name: Name of the pod
         namespace: The Kubernetes namespace (default: "default")
         container: Specific container name (optional, required for multi-container pods)
         tail_lines: Number of lines to retrieve from the end of the logs
+        since_seconds: Only logs from the last seconds
+        limit_bytes: Maximum bytes of log to read
+        grep: Regular expression, only matching lines are returned (e.g. "ERROR|WARN")
+        ignore_case: Match grep case-insensitively
+        new_only: Only lines written since the previous get_pod_logs call for this pod/container
+        previous: Logs of the previous (e.g. crashed) container instance
 
     Returns:
         String containing the pod logs
     """
-    load_k8s_config()
-    v1 = client.CoreV1Api()
-
     try:
-        logs = v1.read_namespaced_pod_log(
-            name=pod_name,
+        return read_pod_log(
+            pod_name,
             namespace=namespace,
             container=container,
-            tail_lines=tail_lines
+            tail_lines=tail_lines,
+            since_seconds=since_seconds,
+            limit_bytes=limit_bytes,
+            grep=grep,
+            ignore_case=ignore_case,
+            new_only=new_only,
+            previous=previous
         )
-        return logs
 
+    except re.error as e:
+        raise Exception(f"Invalid grep pattern '{grep}': {e}")
     except ApiException as e:
         raise Exception(f"Error getting logs for pod '{pod_name}': {e}")
 
 
 @tool
-def list_namespaces() -> List[Dict[str, Any]]:
+def list_namespaces(limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> str:
     """
-    List all namespaces in the cluster.
+    List the namespaces in the cluster, one page at a time.
+
+    Args:
+        limit: Maximum number of namespaces to return (default: 50)
+        cursor: Cursor from the "more results" line of the previous call, omit for the first page
 
     Returns:
-        List of dictionaries containing namespace information
+        Table with one namespace per line (name, status, creation timestamp, labels)
+        and the cursor of the next page if there are more namespaces
     """
-    load_k8s_config()
-    v1 = client.CoreV1Api()
+    v1 = core_v1()
 
     try:
-        namespaces = v1.list_namespace()
+        namespaces = cached_list("namespaces", namespaces_informer)
+        if namespaces is None:
+            namespaces = v1.list_namespace().items
 
-        ns_list = []
-        for ns in namespaces.items:
-            ns_info = {
+        rows = (
+            {
                 "name": ns.metadata.name,
                 "status": ns.status.phase,
                 "labels": ns.metadata.labels or {},
                 "creation_timestamp": str(ns.metadata.creation_timestamp),
             }
-            ns_list.append(ns_info)
-
-        return ns_list
+            for ns in namespaces
+        )
+        return render_table(rows, NAMESPACE_COLUMNS, cursor=cursor, limit=limit, title="namespaces")
 
     except ApiException as e:
         raise Exception(f"Error listing namespaces: {e}")
@@ -0,0 +1,134 @@
+"""Compact, token-budgeted tool output for the LLM.
+
+List tools render their rows as a tab-separated table (one header line, one
+line per object) instead of indented JSON, page through results with an
+offset cursor and stop adding rows when the page would exceed the token
+budget. The last line tells the model how to get the next page.
+"""
+
+import itertools
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+
+DEFAULT_PAGE_SIZE = 50
+# Rough size limit of one tool result in the prompt
+TOKEN_BUDGET = int(os.environ.get("TOOL_OUTPUT_TOKEN_BUDGET", "2000"))
+CHARS_PER_TOKEN = 4  # Rough average for English text, JSON and names
+MAX_CELL_CHARS = 200
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a text (no tokenizer call)."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def compact_value(value: Any) -> str:
+    """One table cell: dicts as k=v pairs, lists comma separated, no tabs or newlines."""
+    if value is None or value == "" or value == {} or value == []:
+        text = "-"
+    elif isinstance(value, bool):
+        text = "true" if value else "false"
+    elif isinstance(value, dict):
+        text = ",".join(f"{key}={compact_value(item)}" for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        text = ",".join(compact_value(item) for item in value)
+    else:
+        text = str(value)
+    text = " ".join(text.split())
+    if len(text) > MAX_CELL_CHARS:
+        text = text[:MAX_CELL_CHARS - 3] + "..."
+    return text
+
+
+def parse_cursor(cursor: Optional[str]) -> int:
+    """
+    Offset encoded in a cursor returned by render_table.
+
+    Raises:
+        ValueError: If the cursor is not one of ours
+    """
+    if cursor in (None, "", "0"):
+        return 0
+    try:
+        offset = int(cursor)
+    except ValueError:
+        offset = -1
+    if offset < 0:
+        raise ValueError(f"Invalid cursor: {cursor}, use the cursor from the previous result")
+    return offset
+
+
+def render_table(
+    rows: Iterable[Dict[str, Any]],
+    columns: List[str],
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    token_budget: int = TOKEN_BUDGET,
+    title: str = "rows"
+) -> str:
+    """
+    Render one page of rows as a table within a token budget.
+
+    Rows are consumed lazily, so with a generator only the rows up to the end
+    of the page (plus one, to know whether there are more) are produced.
+
+    Args:
+        rows: Dicts with (at least) the given columns, in a stable order
+        columns: Keys to show, in order
+        cursor: Cursor of the page (None: first page)
+        limit: Maximum rows per page
+        token_budget: Maximum approximate tokens of the output
+        title: Name of the rows in the footer, e.g. "pods"
+
+    Returns:
+        Header, rows and a footer with the cursor of the next page if there is one
+
+    Raises:
+        ValueError: For an invalid cursor
+    """
+    offset = parse_cursor(cursor)
+    limit = max(1, limit)
+    iterator = itertools.islice(rows, offset, None)
+
+    lines = ["\t".join(column.upper() for column in columns)]
+    used = estimate_tokens(lines[0])
+    shown = 0
+    more = False
+    for row in iterator:
+        line = "\t".join(compact_value(row.get(column)) for column in columns)
+        cost = estimate_tokens(line)
+        if shown >= limit or (shown and used + cost > token_budget):
+            more = True
+            break
+        lines.append(line)
+        used += cost
+        shown += 1
+
+    if not shown:
+        return f"No {title}" + (f" after cursor {cursor}" if offset else "")
+    footer = f"{title} {offset + 1}-{offset + shown}"
+    if more:
+        footer += f", more results: call again with cursor=\"{offset + shown}\""
+    else:
+        footer += f" of {offset + shown}"
+    lines.append(f"({footer})")
+    return "\n".join(lines)
+
+
+def budget_text(text: str, token_budget: int = TOKEN_BUDGET) -> str:
+    """Cut a text to the token budget, keeping its head and tail."""
+    if estimate_tokens(text) <= token_budget:
+        return text
+    keep = token_budget * CHARS_PER_TOKEN
+    head, tail = text[:keep * 3 // 4], text[-(keep // 4):]
+    omitted = len(text) - len(head) - len(tail)
+    return f"{head}\n... [{omitted} characters omitted, output exceeded {token_budget} tokens] ...\n{tail}"
+
+
+def to_text(observation: Any) -> str:
+    """Tool result as prompt text: strings as is, anything else as compact JSON."""
+    if isinstance(observation, str):
+        return observation
+    return json.dumps(observation, separators=(",", ":"), default=str)
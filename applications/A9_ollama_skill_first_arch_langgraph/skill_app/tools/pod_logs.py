@@ -0,0 +1,204 @@
+"""Bounded reads of pod logs.
+
+A log is never loaded as a whole: the request is limited on the API server
+(tail_lines, since_seconds, limit_bytes) and the response is streamed
+(`_preload_content=False`) and read until MAX_READ_BYTES. Lines are filtered
+by a regular expression while they are read, and only the last matching lines
+that fit into the output size are kept.
+
+The log of every pod/container remembers the timestamp of the last line read
+(the cursor), so a follow-up call with `new_only=True` asks the API server for
+the lines since then and drops the ones already seen.
+"""
+
+import collections
+import math
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Deque, Dict, Optional, Tuple
+
+from tools.k8s_client import core_v1
+from tools.output_format import CHARS_PER_TOKEN, TOKEN_BUDGET
+
+
+DEFAULT_TAIL_LINES = 200  # Without tail_lines/since_seconds/new_only
+MAX_READ_BYTES = 16 * 1024 * 1024  # Stop streaming after this much, even if nothing matched
+# Output size, the filtered log should fit the tool output budget
+DEFAULT_OUTPUT_BYTES = TOKEN_BUDGET * CHARS_PER_TOKEN
+CHUNK_SIZE = 64 * 1024
+# Lines may be timestamped by the node, whose clock can be ahead of ours
+CLOCK_SKEW_SECONDS = 5
+
+# (seconds "2024-01-02T03:04:05", nanoseconds): tuples compare in time order
+_Timestamp = Tuple[str, int]
+_CursorKey = Tuple[str, str, str]  # (namespace, pod, container)
+
+_cursors_lock = threading.Lock()
+_cursors: Dict[_CursorKey, _Timestamp] = {}
+
+
+def parse_timestamp(value: str) -> Optional[_Timestamp]:
+    """Parse the RFC3339(Nano) timestamp the API server puts in front of a line with timestamps=True."""
+    seconds, _, rest = value.rstrip("Z").partition(".")
+    if len(seconds) != 19 or seconds[10] != "T":
+        return None
+    digits = rest[:9]
+    if digits and not digits.isdigit():
+        return None
+    return seconds, int(digits.ljust(9, "0")) if digits else 0
+
+
+def seconds_since(timestamp: _Timestamp) -> int:
+    """Whole seconds from a log timestamp until now, rounded up."""
+    moment = datetime.strptime(timestamp[0], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+    elapsed = (datetime.now(timezone.utc) - moment).total_seconds() + timestamp[1] / 1e9
+    return max(1, math.ceil(elapsed))
+
+
+def get_cursor(namespace: str, pod_name: str, container: Optional[str]) -> Optional[_Timestamp]:
+    with _cursors_lock:
+        return _cursors.get((namespace, pod_name, container or ""))
+
+
+def reset_cursors() -> None:
+    """Forget all log positions."""
+    with _cursors_lock:
+        _cursors.clear()
+
+
+def _advance_cursor(key: _CursorKey, timestamp: _Timestamp) -> None:
+    with _cursors_lock:
+        if key not in _cursors or _cursors[key] < timestamp:
+            _cursors[key] = timestamp
+
+
+def read_pod_log(
+    pod_name: str,
+    namespace: str = "default",
+    container: Optional[str] = None,
+    tail_lines: Optional[int] = None,
+    since_seconds: Optional[int] = None,
+    limit_bytes: Optional[int] = None,
+    grep: Optional[str] = None,
+    ignore_case: bool = False,
+    new_only: bool = False,
+    previous: bool = False,
+    max_read_bytes: int = MAX_READ_BYTES,
+    output_bytes: int = DEFAULT_OUTPUT_BYTES
+) -> str:
+    """
+    Read a pod log within fixed memory and output limits.
+
+    Args:
+        pod_name: Name of the pod
+        namespace: The Kubernetes namespace
+        container: Container name (required for multi-container pods)
+        tail_lines: Only the last lines of the log
+        since_seconds: Only lines of the last seconds
+        limit_bytes: Bytes the API server sends at most
+        grep: Regular expression, only matching lines are returned
+        ignore_case: Case-insensitive grep
+        new_only: Only lines after the last line of the previous read of this log
+        previous: Log of the previous (crashed) container instance
+        max_read_bytes: Stop reading the stream after this many bytes
+        output_bytes: Size of the returned lines, the newest ones are kept
+
+    Returns:
+        The (filtered) log lines and a note when lines were left out
+
+    Raises:
+        re.error: For an invalid grep pattern
+        ApiException: For API errors
+    """
+    pattern = re.compile(grep, re.IGNORECASE if ignore_case else 0) if grep else None
+    key = (namespace, pod_name, container or "")
+
+    cursor = get_cursor(namespace, pod_name, container) if new_only else None
+    if cursor is not None:
+        since = seconds_since(cursor) + CLOCK_SKEW_SECONDS
+        since_seconds = min(since_seconds, since) if since_seconds else since
+    if tail_lines is None and since_seconds is None:
+        tail_lines = DEFAULT_TAIL_LINES
+    if limit_bytes is not None:
+        max_read_bytes = min(max_read_bytes, limit_bytes)
+
+    response = core_v1().read_namespaced_pod_log(
+        name=pod_name,
+        namespace=namespace,
+        container=container,
+        tail_lines=tail_lines,
+        since_seconds=since_seconds,
+        limit_bytes=max_read_bytes,
+        previous=previous,
+        timestamps=True,
+        _preload_content=False
+    )
+
+    kept: Deque[str] = collections.deque()
+    kept_bytes = 0
+    read_bytes = 0
+    total = matched = dropped = 0
+    last: Optional[_Timestamp] = None
+    truncated = False
+    pending = b""
+
+    def take(raw: bytes) -> None:
+        nonlocal kept_bytes, total, matched, dropped, last
+        line = raw.decode("utf-8", errors="replace").rstrip("\r")
+        stamp, _, text = line.partition(" ")
+        timestamp = parse_timestamp(stamp)
+        if timestamp is None:
+            # Not timestamped (continuation of a split line)
+            text = line
+        else:
+            if cursor is not None and timestamp <= cursor:
+                return
+            last = timestamp
+        total += 1
+        if pattern is not None and not pattern.search(text):
+            return
+        matched += 1
+        kept.append(text)
+        kept_bytes += len(text) + 1
+        while kept_bytes > output_bytes and len(kept) > 1:
+            kept_bytes -= len(kept.popleft()) + 1
+            dropped += 1
+
+    try:
+        for chunk in response.stream(CHUNK_SIZE, decode_content=True):
+            read_bytes += len(chunk)
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for raw in lines:
+                take(raw)
+            if read_bytes >= max_read_bytes:
+                truncated = True
+                break
+    finally:
+        response.release_conn()
+    if pending and not truncated:
+        take(pending)
+
+    if last is not None:
+        _advance_cursor(key, last)
+
+    notes = []
+    if dropped:
+        notes.append(f"{dropped} older {'matching ' if pattern else ''}lines omitted")
+    if pattern is not None:
+        notes.append(f"{matched} of {total} lines match {grep!r}")
+    if truncated:
+        notes.append(f"stopped after {read_bytes} bytes, use since_seconds, tail_lines or new_only to read further")
+    if new_only and cursor is not None and not total:
+        notes.append("no new lines")
+
+    text = "\n".join(kept)
+    if not text and not notes:
+        return "No log lines"
+    if len(text) > output_bytes:
+        # A single line longer than the output size
+        text = text[-output_bytes:]
+    if notes:
+        text += ("\n" if text else "") + f"({'; '.join(notes)})"
+    return text
@@ -0,0 +1,301 @@
+"""
+Compact binary storage for knowledge graphs.
+
+JSON exports of large graphs are verbose and every load has to parse the whole
+file. This format stores the graph as flat arrays that are memory-mapped and
+wrapped in NumPy views, so opening a file costs the same for 10 nodes and for
+10M edges; strings and properties are only decoded when they are accessed.
+
+Layout (little-endian, every section 8-byte aligned):
+
+    header      magic, version, node/edge/string counts, section table
+    strings     interned ids, node types and relationship labels:
+                u64 offsets[n_strings + 1] + utf-8 data
+    nodes       u32 id string[n_nodes], u32 type string[n_nodes]
+    adjacency   CSR: u64 indptr[n_nodes + 1], u32 target[n_edges],
+                u32 label string[n_edges] (edges sorted by source node)
+    properties  JSON blobs: u64 offsets[n + 1] + utf-8 data, for nodes and for
+                edges (empty properties take no space)
+
+The format only knows about plain tuples; A3 and A6 convert their own graph
+models to and from it, which lets both apps open each other's stored graphs.
+"""
+
+import json
+import mmap
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+MAGIC = b"KGSTORE\0"
+VERSION = 1
+
+_SECTIONS = (
+    "string_offsets",
+    "string_data",
+    "node_ids",
+    "node_types",
+    "indptr",
+    "edge_targets",
+    "edge_labels",
+    "node_property_offsets",
+    "node_property_data",
+    "edge_property_offsets",
+    "edge_property_data",
+)
+_SECTION_DTYPES = {
+    "string_offsets": np.uint64,
+    "node_ids": np.uint32,
+    "node_types": np.uint32,
+    "indptr": np.uint64,
+    "edge_targets": np.uint32,
+    "edge_labels": np.uint32,
+    "node_property_offsets": np.uint64,
+    "edge_property_offsets": np.uint64,
+}
+_HEADER = struct.Struct("<8sIIQQQ" + "QQ" * len(_SECTIONS))
+
+# (id, type, properties)
+StoredNode = Tuple[str, str, Dict[str, Any]]
+# (source node index, target node index, label, properties)
+StoredEdge = Tuple[int, int, str, Dict[str, Any]]
+
+
+class _StringTable:
+    """Interns strings to consecutive indexes."""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+
+    def intern(self, value: Any) -> int:
+        value = str(value)
+        position = self.index.get(value)
+        if position is None:
+            position = len(self.index)
+            self.index[value] = position
+        return position
+
+
+def _blob(values: List[bytes]) -> Tuple[np.ndarray, bytes]:
+    """Concatenate byte strings and return (offsets, data)."""
+    offsets = np.zeros(len(values) + 1, dtype=np.uint64)
+    np.cumsum([len(value) for value in values], out=offsets[1:])
+    return offsets, b"".join(values)
+
+
+def _encode_properties(properties: Optional[Dict[str, Any]]) -> bytes:
+    if not properties:
+        return b""
+    return json.dumps(properties, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def write_graph_store(path: str, nodes: Sequence[StoredNode], edges: Sequence[StoredEdge]) -> None:
+    """
+    Write a graph in the binary format.
+
+    Args:
+        path: Destination file
+        nodes: Nodes as (id, type, properties); ids and types are stored as strings
+        edges: Edges as (source index, target index, label, properties), the
+            indexes referring to positions in `nodes`
+    """
+    strings = _StringTable()
+    node_ids = np.fromiter((strings.intern(node[0]) for node in nodes), dtype=np.uint32, count=len(nodes))
+    node_types = np.fromiter((strings.intern(node[1]) for node in nodes), dtype=np.uint32, count=len(nodes))
+
+    sources = np.fromiter((edge[0] for edge in edges), dtype=np.int64, count=len(edges))
+    if len(edges) and (sources.min() < 0 or sources.max() >= len(nodes)):
+        raise ValueError("Edge source index out of range")
+    order = np.argsort(sources, kind="stable")
+    targets = np.fromiter((edges[i][1] for i in order), dtype=np.uint32, count=len(edges))
+    if len(edges) and targets.max() >= len(nodes):
+        raise ValueError("Edge target index out of range")
+    labels = np.fromiter((strings.intern(edges[i][2]) for i in order), dtype=np.uint32, count=len(edges))
+    indptr = np.zeros(len(nodes) + 1, dtype=np.uint64)
+    np.cumsum(np.bincount(sources, minlength=len(nodes)), out=indptr[1:])
+
+    string_offsets, string_data = _blob([value.encode("utf-8") for value in strings.index])
+    node_property_offsets, node_property_data = _blob([_encode_properties(node[2]) for node in nodes])
+    edge_property_offsets, edge_property_data = _blob([_encode_properties(edges[i][3]) for i in order])
+
+    payloads = {
+        "string_offsets": string_offsets.tobytes(),
+        "string_data": string_data,
+        "node_ids": node_ids.tobytes(),
+        "node_types": node_types.tobytes(),
+        "indptr": indptr.tobytes(),
+        "edge_targets": targets.tobytes(),
+        "edge_labels": labels.tobytes(),
+        "node_property_offsets": node_property_offsets.tobytes(),
+        "node_property_data": node_property_data,
+        "edge_property_offsets": edge_property_offsets.tobytes(),
+        "edge_property_data": edge_property_data,
+    }
+
+    table = []
+    position = _HEADER.size
+    for name in _SECTIONS:
+        position += -position % 8
+        table += [position, len(payloads[name])]
+        position += len(payloads[name])
+
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, len(nodes), len(edges), len(strings.index), *table))
+        for name, offset in zip(_SECTIONS, table[::2]):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(payloads[name])
+
+
+def is_graph_store(path: str) -> bool:
+    """True if the file starts with the graph store magic bytes."""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class GraphStore:
+    """
+    Read-only, memory-mapped view of a stored graph.
+
+    Arrays (`node_ids`, `node_types`, `indptr`, `edge_targets`, `edge_labels`)
+    are NumPy views on the file; strings and properties are decoded on access.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a stored graph.
+
+        Args:
+            path: File written by write_graph_store
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header = _HEADER.unpack_from(self._mmap, 0)
+        magic, version, _, self.n_nodes, self.n_edges, self.n_strings = header[:6]
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a graph store file")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported graph store version {version} in {path}")
+
+        self._sections: Dict[str, Any] = {}
+        for i, name in enumerate(_SECTIONS):
+            offset, length = header[6 + 2 * i], header[7 + 2 * i]
+            dtype = _SECTION_DTYPES.get(name)
+            if dtype is None:
+                self._sections[name] = memoryview(self._mmap)[offset:offset + length]
+            else:
+                self._sections[name] = np.frombuffer(
+                    self._mmap, dtype=dtype, count=length // np.dtype(dtype).itemsize, offset=offset
+                )
+
+        self.node_ids: np.ndarray = self._sections["node_ids"]
+        self.node_types: np.ndarray = self._sections["node_types"]
+        self.indptr: np.ndarray = self._sections["indptr"]
+        self.edge_targets: np.ndarray = self._sections["edge_targets"]
+        self.edge_labels: np.ndarray = self._sections["edge_labels"]
+        self._string_cache: Dict[int, str] = {}
+        self._node_index: Optional[Dict[Tuple[str, Optional[str]], int]] = None
+
+    def __enter__(self) -> "GraphStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the memory map (views obtained from this store become invalid)."""
+        for name in list(getattr(self, "_sections", {})):
+            section = self._sections.pop(name)
+            if isinstance(section, memoryview):
+                section.release()
+        for name in ("node_ids", "node_types", "indptr", "edge_targets", "edge_labels"):
+            self.__dict__.pop(name, None)
+        if not self._mmap.closed:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Arrays handed out by this store are still alive, the map is
+                # released when they are garbage collected
+                pass
+        self._file.close()
+
+    def string(self, index: int) -> str:
+        """Decode an interned string."""
+        value = self._string_cache.get(index)
+        if value is None:
+            offsets = self._sections["string_offsets"]
+            start, end = int(offsets[index]), int(offsets[index + 1])
+            value = bytes(self._sections["string_data"][start:end]).decode("utf-8")
+            self._string_cache[index] = value
+        return value
+
+    def _properties(self, kind: str, index: int) -> Dict[str, Any]:
+        offsets = self._sections[f"{kind}_property_offsets"]
+        start, end = int(offsets[index]), int(offsets[index + 1])
+        if start == end:
+            return {}
+        return json.loads(bytes(self._sections[f"{kind}_property_data"][start:end]))
+
+    def node(self, index: int) -> StoredNode:
+        """Return node `index` as (id, type, properties)."""
+        return (
+            self.string(int(self.node_ids[index])),
+            self.string(int(self.node_types[index])),
+            self._properties("node", index),
+        )
+
+    def edge(self, index: int) -> StoredEdge:
+        """Return edge `index` (in CSR order) as (source, target, label, properties)."""
+        source = int(np.searchsorted(self.indptr, index, side="right")) - 1
+        return (
+            source,
+            int(self.edge_targets[index]),
+            self.string(int(self.edge_labels[index])),
+            self._properties("edge", index),
+        )
+
+    def neighbors(self, node_index: int) -> np.ndarray:
+        """Target node indexes of the outgoing edges of a node (a view, no copy)."""
+        return self.edge_targets[int(self.indptr[node_index]):int(self.indptr[node_index + 1])]
+
+    def iter_nodes(self) -> Iterator[StoredNode]:
+        """Iterate over all nodes in index order."""
+        for index in range(self.n_nodes):
+            yield self.node(index)
+
+    def iter_edges(self) -> Iterator[StoredEdge]:
+        """Iterate over all edges, grouped by source node."""
+        for source in range(self.n_nodes):
+            for index in range(int(self.indptr[source]), int(self.indptr[source + 1])):
+                yield (
+                    source,
+                    int(self.edge_targets[index]),
+                    self.string(int(self.edge_labels[index])),
+                    self._properties("edge", index),
+                )
+
+    def find_node(self, node_id: Any, node_type: Optional[str] = None) -> Optional[int]:
+        """
+        Look up a node index by id (and optionally type).
+
+        The id index is built on the first call.
+
+        Args:
+            node_id: Node id
+            node_type: Node type, None matches the first node with that id
+
+        Returns:
+            Node index, or None if there is no such node
+        """
+        if self._node_index is None:
+            self._node_index = {}
+            for index in range(self.n_nodes):
+                node_id_string = self.string(int(self.node_ids[index]))
+                self._node_index.setdefault((node_id_string, self.string(int(self.node_types[index]))), index)
+                self._node_index.setdefault((node_id_string, None), index)
+        return self._node_index.get((str(node_id), node_type))
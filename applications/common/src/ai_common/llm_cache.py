@@ -0,0 +1,313 @@
+"""
+In-memory LLM response cache with TTL, LRU eviction and optional semantic matching.
+
+`LLMResponseCache` implements LangChain's `BaseCache`, so it plugs into any
+chat model with `SharedChatOllama(..., cache=cache)` (or `ChatOllama`):
+
+- exact match on the model configuration (model, temperature, bound tool
+  schemas, output format, ...) and the normalized message list. Message and
+  tool call ids, which differ on every run, are not part of the key.
+- optional semantic match: with an `embedder`, a prompt whose last message is
+  from the user also matches a cached prompt with the same configuration and
+  the same earlier messages whose last user message is at least
+  `similarity_threshold` cosine-similar ("list pods in default namespace" vs
+  "list the pods in the default namespace"). Prompts ending in a tool result
+  are only matched exactly, tool output is live data.
+- per-entry TTL: `ttl` for every entry, or `ttl_policy(messages)` to choose it
+  per prompt (None = never expires)
+- LRU eviction above `max_entries` or `max_bytes`
+
+Counters: `hits`, `semantic_hits`, `misses`, `evictions`, `expirations`.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL = 300.0
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+
+# texts -> one embedding vector per text
+Embedder = Callable[[List[str]], Sequence[Sequence[float]]]
+# normalized messages -> TTL in seconds (None: no expiry)
+TTLPolicy = Callable[[List[Dict[str, Any]]], Optional[float]]
+
+
+def normalize_messages(prompt: str) -> List[Dict[str, Any]]:
+    """
+    Reduce a serialized LangChain message list to what the model sees.
+
+    Args:
+        prompt: Prompt string passed to BaseCache.lookup (dumps() of the messages)
+
+    Returns:
+        One {"type", "content", ...} dict per message; ids are dropped,
+        tool calls are kept as (name, args)
+    """
+    try:
+        items = json.loads(prompt)
+    except ValueError:
+        return [{"type": "text", "content": prompt}]
+    if not isinstance(items, list):
+        items = [items]
+
+    messages = []
+    for item in items:
+        fields = item.get("kwargs", item) if isinstance(item, dict) else {"content": item}
+        message = {"type": fields.get("type"), "content": fields.get("content")}
+        if fields.get("name"):
+            message["name"] = fields["name"]
+        if fields.get("tool_calls"):
+            message["tool_calls"] = [
+                {"name": call.get("name"), "args": call.get("args")} for call in fields["tool_calls"]
+            ]
+        messages.append(message)
+    return messages
+
+
+def _digest(*parts: Any) -> str:
+    data = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _text(content: Any) -> str:
+    """Text of a message content (str or list of content blocks)."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(
+            block.get("text", "") if isinstance(block, dict) else str(block) for block in content
+        )
+    return str(content)
+
+
+@dataclass
+class _Entry:
+    value: RETURN_VAL_TYPE
+    size: int  # Serialized size in bytes
+    expires_at: Optional[float]
+    context: Optional[str]  # Semantic lookup group (None: exact match only)
+    vector: Optional[np.ndarray]
+
+
+class LLMResponseCache(BaseCache):
+    """Thread-safe in-memory response cache for chat models."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = DEFAULT_TTL,
+        ttl_policy: Optional[TTLPolicy] = None,
+        embedder: Optional[Embedder] = None,
+        similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD
+    ):
+        """
+        Create a cache.
+
+        Args:
+            max_entries: Maximum number of cached responses
+            max_bytes: Maximum total size of the cached responses (None: no limit)
+            ttl: Seconds an entry stays valid (None: no expiry)
+            ttl_policy: Chooses the TTL per prompt, overrides `ttl`
+            embedder: Enables semantic matching, e.g. ollama_embedder()
+            similarity_threshold: Minimum cosine similarity of a semantic match
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.ttl_policy = ttl_policy
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Semantic lookup group -> keys of its entries
+        self._contexts: Dict[str, List[str]] = {}
+        self._bytes = 0
+
+        # Counters
+        self.hits = 0  # Exact hits
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    # --- keys ----------------------------------------------------------
+
+    def _keys(self, prompt: str, llm_string: str) -> tuple:
+        """(exact key, semantic group or None, normalized messages, text to embed)."""
+        messages = normalize_messages(prompt)
+        key = _digest(llm_string, messages)
+        if self.embedder is None or not messages or messages[-1]["type"] != "human":
+            return key, None, messages, None
+        return key, _digest(llm_string, messages[:-1]), messages, _text(messages[-1]["content"])
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        try:
+            vector = np.asarray(self.embedder([text])[0], dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Embedding failed, semantic cache lookup skipped: {e}")
+            return None
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
+
+    # --- entries -------------------------------------------------------
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        if entry.context is not None:
+            keys = self._contexts.get(entry.context, [])
+            if key in keys:
+                keys.remove(key)
+            if not keys:
+                self._contexts.pop(entry.context, None)
+
+    def _expired(self, key: str, now: float) -> bool:
+        """Drop the entry if its TTL has passed."""
+        expires_at = self._entries[key].expires_at
+        if expires_at is not None and expires_at <= now:
+            self._remove(key)
+            self.expirations += 1
+            return True
+        return False
+
+    def _get(self, key: str, now: float) -> Optional[_Entry]:
+        if key not in self._entries or self._expired(key, now):
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def _semantic_match(self, context: str, vector: np.ndarray, now: float) -> Optional[_Entry]:
+        keys = [key for key in list(self._contexts.get(context, [])) if not self._expired(key, now)]
+        if not keys:
+            return None
+        similarities = np.stack([self._entries[key].vector for key in keys]) @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+        self._entries.move_to_end(keys[best])
+        return self._entries[keys[best]]
+
+    # --- BaseCache -----------------------------------------------------
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Return the cached generations of a prompt, None on a miss."""
+        key, context, _, text = self._keys(prompt, llm_string)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._get(key, now)
+            if entry is not None:
+                self.hits += 1
+                return [generation.model_copy(deep=True) for generation in entry.value]
+            if context is None or context not in self._contexts:
+                self.misses += 1
+                return None
+
+        vector = self._embed(text)
+        with self._lock:
+            entry = self._semantic_match(context, vector, now) if vector is not None else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.semantic_hits += 1
+            return [generation.model_copy(deep=True) for generation in entry.value]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Store the generations of a prompt."""
+        key, context, messages, text = self._keys(prompt, llm_string)
+        ttl = self.ttl_policy(messages) if self.ttl_policy is not None else self.ttl
+        vector = self._embed(text) if context is not None else None
+        value = [generation.model_copy(deep=True) for generation in return_val]
+        size = sum(len(generation.model_dump_json()) for generation in value)
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, size, expires_at, context if vector is not None else None, vector)
+            self._bytes += size
+            if vector is not None:
+                self._contexts.setdefault(context, []).append(key)
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self, **kwargs: Any) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._contexts.clear()
+            self._bytes = 0
+
+    # --- reporting -----------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters, size and the share of lookups answered from the cache."""
+        with self._lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.semantic_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def ollama_embedder(model: str = "nomic-embed-text", base_url: Optional[str] = None) -> Embedder:
+    """
+    Embedder for the semantic match, using the shared Ollama client.
+
+    Args:
+        model: Ollama embedding model
+        base_url: Server URL(s), see get_client
+
+    Returns:
+        Callable mapping texts to vectors
+    """
+    from .ollama_client import get_client
+
+    client = get_client(base_url)
+    return lambda texts: client.embed(model, texts)
+
+
+def tool_result_ttl(ttl: Optional[float], live_ttl: Optional[float]) -> TTLPolicy:
+    """
+    TTL policy giving prompts that contain tool results a different TTL.
+
+    Answers built from tool output (pod lists, logs, ...) describe live state;
+    the rest (e.g. which tools to call for a question) stays valid longer.
+
+    Args:
+        ttl: TTL of prompts without tool results
+        live_ttl: TTL of prompts with tool results
+
+    Returns:
+        Policy for LLMResponseCache(ttl_policy=...)
+    """
+    def policy(messages: List[Dict[str, Any]]) -> Optional[float]:
+        return live_ttl if any(message["type"] == "tool" for message in messages) else ttl
+    return policy
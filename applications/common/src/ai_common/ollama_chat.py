@@ -0,0 +1,80 @@
+"""
+ChatOllama backed by the shared, concurrency-limited Ollama client.
+
+`SharedChatOllama` is a drop-in replacement for `langchain_ollama.ChatOllama`:
+all instances talking to the same server share one `OllamaClient` (connection
+pool, OLLAMA_NUM_PARALLEL limit, retries, coalescing of identical requests).
+`invoke`/`ainvoke` send non-streaming requests, so identical concurrent
+prompts are answered once; `stream`/`astream` still stream token by token.
+
+Requires langchain-ollama (installed by every app that uses ChatOllama).
+"""
+
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from langchain_ollama import ChatOllama
+from pydantic import model_validator
+
+from .ollama_client import OllamaClient, get_client
+
+
+class _SyncAdapter:
+    """Stands in for `ollama.Client`, which ChatOllama calls as `.chat(**params)`."""
+
+    def __init__(self, client: OllamaClient):
+        self.client = client
+
+    def chat(self, **params: Any) -> Union[Dict[str, Any], Iterator[Dict[str, Any]]]:
+        if params.get("stream"):
+            return self.client.stream("/api/chat", params)
+        return self.client.request("/api/chat", params)
+
+
+class _AsyncAdapter:
+    """Stands in for `ollama.AsyncClient`."""
+
+    def __init__(self, client: OllamaClient):
+        self.client = client
+
+    async def chat(self, **params: Any) -> Union[Dict[str, Any], AsyncIterator[Dict[str, Any]]]:
+        if params.get("stream"):
+            return self.client.astream("/api/chat", params)
+        return await self.client.arequest("/api/chat", params)
+
+
+class SharedChatOllama(ChatOllama):
+    """ChatOllama whose requests go through the process-wide OllamaClient."""
+
+    @model_validator(mode="after")
+    def _use_shared_client(self) -> "SharedChatOllama":
+        client = get_client(self.base_url)
+        self._client = _SyncAdapter(client)
+        self._async_client = _AsyncAdapter(client)
+        return self
+
+    @property
+    def shared_client(self) -> OllamaClient:
+        """The OllamaClient (and its counters) used by this model."""
+        return self._client.client
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        kwargs.setdefault("stream", False)
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        kwargs.setdefault("stream", False)
+        return await super()._agenerate(messages, stop, run_manager, **kwargs)
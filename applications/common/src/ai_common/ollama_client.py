@@ -0,0 +1,497 @@
+"""
+Concurrency-limited HTTP client for the Ollama API.
+
+One client per server is shared by everything in the process (see
+`get_client`):
+
+- at most `max_concurrency` requests are sent at a time, matching the
+  server's OLLAMA_NUM_PARALLEL; more would only queue inside the server
+- connections are pooled and kept alive
+- connection errors, timeouts, 429 and 5xx responses are retried with
+  exponential backoff and jitter
+- identical non-streaming requests that are in flight at the same time are
+  sent once, every caller gets the same response
+
+Both a blocking API (`request`, `stream`, `chat`, ...) and an asyncio API
+(`arequest`, `astream`, `achat`, ...) are provided. The limit is enforced
+separately for the blocking API and per event loop for the asyncio API.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Union
+
+import httpx
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "http://localhost:11434"
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 300.0
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+MAX_BACKOFF = 10.0
+
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class OllamaError(Exception):
+    """Request rejected by the server or failed after all retries."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def default_base_url() -> str:
+    """Server URL from OLLAMA_HOST (as used by the ollama CLI), else localhost."""
+    host = os.environ.get("OLLAMA_HOST", "").strip()
+    if not host:
+        return DEFAULT_BASE_URL
+    if "://" not in host:
+        host = f"http://{host}"
+    return host.rstrip("/")
+
+
+def default_concurrency() -> int:
+    """Concurrent requests the server serves, from OLLAMA_NUM_PARALLEL (default 4)."""
+    try:
+        return max(1, int(os.environ.get("OLLAMA_NUM_PARALLEL", DEFAULT_CONCURRENCY)))
+    except ValueError:
+        return DEFAULT_CONCURRENCY
+
+
+def request_key(path: str, payload: Dict[str, Any]) -> str:
+    """Hash identifying identical requests (used for coalescing)."""
+    data = json.dumps([path, payload], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _clean(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop unset fields, the server applies its own defaults."""
+    return {key: value for key, value in payload.items() if value is not None}
+
+
+class Coalescer:
+    """Runs identical concurrent calls once and hands the result to every caller."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._async_inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.coalesced = 0  # Calls answered by an identical in-flight call
+
+    def run(self, key: str, call: Callable[[], Any]) -> Any:
+        """Return call(), or the result of the in-flight call with the same key."""
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.coalesced += 1
+        if not leader:
+            return copy.deepcopy(future.result())
+
+        try:
+            result = call()
+            future.set_result(result)
+            return copy.deepcopy(result)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def arun(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Asyncio version of `run` (calls are shared within one event loop)."""
+        inflight = self._async_inflight.setdefault(asyncio.get_running_loop(), {})
+        future = inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(call())
+            inflight[key] = future
+            future.add_done_callback(lambda _: inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # shield: a cancelled caller must not cancel the shared call
+        return copy.deepcopy(await asyncio.shield(future))
+
+
+class _AsyncState:
+    """Per event loop part of the client (asyncio objects are bound to a loop)."""
+
+    def __init__(self, client: httpx.AsyncClient, max_concurrency: int):
+        self.client = client
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+
+class OllamaClient:
+    """Shared, concurrency-limited client for one Ollama server."""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        coalesce: bool = True
+    ):
+        """
+        Create a client.
+
+        Args:
+            base_url: Server URL (default: OLLAMA_HOST or http://localhost:11434)
+            max_concurrency: Requests in flight at a time (default: OLLAMA_NUM_PARALLEL or 4)
+            timeout: Read timeout in seconds (generation can take minutes)
+            max_retries: Retries after the first attempt
+            backoff: Base delay in seconds, doubled after every retry
+            coalesce: Share responses between identical in-flight requests
+        """
+        self.base_url = (base_url or default_base_url()).rstrip("/")
+        self.max_concurrency = max_concurrency or default_concurrency()
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.coalesce = coalesce
+        self._timeout = httpx.Timeout(timeout, connect=DEFAULT_CONNECT_TIMEOUT)
+        self._limits = httpx.Limits(
+            max_connections=None,
+            max_keepalive_connections=self.max_concurrency,
+            keepalive_expiry=60.0
+        )
+
+        self._client = httpx.Client(base_url=self.base_url, timeout=self._timeout, limits=self._limits)
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._coalescer = Coalescer()
+        self._async_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _AsyncState]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+        # Counters
+        self.requests = 0  # Requests sent to the server (retries not included)
+        self.retries = 0
+
+    @property
+    def coalesced(self) -> int:
+        """Requests answered by an identical in-flight request."""
+        return self._coalescer.coalesced
+
+    def __enter__(self) -> "OllamaClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the pooled connections of the blocking API."""
+        self._client.close()
+
+    async def aclose(self) -> None:
+        """Close the pooled connections of the current event loop."""
+        state = self._async_states.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state.client.aclose()
+
+    # --- retries -------------------------------------------------------
+
+    def _delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff."""
+        return random.uniform(0, min(MAX_BACKOFF, self.backoff * 2 ** attempt))
+
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if isinstance(error, OllamaError):
+            return error.status_code in _RETRY_STATUS
+        return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+    @staticmethod
+    def _check(response: httpx.Response) -> None:
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("error", response.text)
+            except ValueError:
+                message = response.text
+            raise OllamaError(f"Ollama returned {response.status_code}: {message}", response.status_code)
+
+    # --- blocking API --------------------------------------------------
+
+    def _send(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            try:
+                with self._semaphore:
+                    with self._lock:
+                        self.requests += 1
+                    response = self._client.post(path, json=payload)
+                    self._check(response)
+                    return response.json()
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                delay = self._delay(attempt)
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                logger.warning(f"Ollama request to {path} failed ({e}), retry {attempt} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def request(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a non-streaming request.
+
+        Args:
+            path: API path, e.g. "/api/chat"
+            payload: Request body ("stream" is forced to False, None values are dropped)
+
+        Returns:
+            Decoded JSON response
+
+        Raises:
+            OllamaError: Rejected by the server or still failing after the retries
+            httpx.HTTPError: Connection problem that persisted over the retries
+        """
+        payload = _clean({**payload, "stream": False})
+        if not self.coalesce:
+            return self._send(path, payload)
+
+        return self._coalescer.run(request_key(path, payload), lambda: self._send(path, payload))
+
+    def stream(self, path: str, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Send a streaming request and yield the response parts.
+
+        Streams are not coalesced; a concurrency slot is held until the
+        stream is exhausted or closed. Failures before the first part are
+        retried.
+
+        Args:
+            path: API path, e.g. "/api/chat"
+            payload: Request body ("stream" is forced to True)
+
+        Yields:
+            Decoded JSON parts
+        """
+        payload = _clean({**payload, "stream": True})
+        attempt = 0
+        while True:
+            started = False
+            try:
+                with self._semaphore:
+                    with self._lock:
+                        self.requests += 1
+                    with self._client.stream("POST", path, json=payload) as response:
+                        if response.status_code >= 400:
+                            response.read()
+                        self._check(response)
+                        for line in response.iter_lines():
+                            if line:
+                                started = True
+                                yield json.loads(line)
+                return
+            except Exception as e:
+                if started or not self._should_retry(e, attempt):
+                    raise
+                delay = self._delay(attempt)
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                logger.warning(f"Ollama stream to {path} failed ({e}), retry {attempt} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def chat(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        options: Optional[Dict[str, Any]] = None,
+        format: Optional[Union[str, Dict[str, Any]]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        keep_alive: Optional[Union[str, float]] = None
+    ) -> Dict[str, Any]:
+        """Chat completion (/api/chat), returns the full response."""
+        return self.request("/api/chat", {
+            "model": model,
+            "messages": messages,
+            "options": options,
+            "format": format,
+            "tools": tools,
+            "keep_alive": keep_alive,
+        })
+
+    def generate(
+        self,
+        model: str,
+        prompt: str,
+        options: Optional[Dict[str, Any]] = None,
+        format: Optional[Union[str, Dict[str, Any]]] = None,
+        keep_alive: Optional[Union[str, float]] = None
+    ) -> Dict[str, Any]:
+        """Text completion (/api/generate), returns the full response."""
+        return self.request("/api/generate", {
+            "model": model,
+            "prompt": prompt,
+            "options": options,
+            "format": format,
+            "keep_alive": keep_alive,
+        })
+
+    def embed(self, model: str, input: Union[str, List[str]]) -> List[List[float]]:
+        """Embeddings (/api/embed), one vector per input."""
+        return self.request("/api/embed", {"model": model, "input": input})["embeddings"]
+
+    # --- asyncio API ---------------------------------------------------
+
+    def _async_state(self) -> _AsyncState:
+        loop = asyncio.get_running_loop()
+        state = self._async_states.get(loop)
+        if state is None:
+            client = httpx.AsyncClient(base_url=self.base_url, timeout=self._timeout, limits=self._limits)
+            state = _AsyncState(client, self.max_concurrency)
+            self._async_states[loop] = state
+        return state
+
+    async def _asend(self, state: _AsyncState, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            try:
+                async with state.semaphore:
+                    self.requests += 1
+                    response = await state.client.post(path, json=payload)
+                    self._check(response)
+                    return response.json()
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                delay = self._delay(attempt)
+                attempt += 1
+                self.retries += 1
+                logger.warning(f"Ollama request to {path} failed ({e}), retry {attempt} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def arequest(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Asyncio version of `request`."""
+        state = self._async_state()
+        payload = _clean({**payload, "stream": False})
+        if not self.coalesce:
+            return await self._asend(state, path, payload)
+
+        return await self._coalescer.arun(
+            request_key(path, payload), lambda: self._asend(state, path, payload)
+        )
+
+    async def astream(self, path: str, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Asyncio version of `stream`."""
+        state = self._async_state()
+        payload = _clean({**payload, "stream": True})
+        attempt = 0
+        while True:
+            started = False
+            try:
+                async with state.semaphore:
+                    self.requests += 1
+                    async with state.client.stream("POST", path, json=payload) as response:
+                        if response.status_code >= 400:
+                            await response.aread()
+                        self._check(response)
+                        async for line in response.aiter_lines():
+                            if line:
+                                started = True
+                                yield json.loads(line)
+                return
+            except Exception as e:
+                if started or not self._should_retry(e, attempt):
+                    raise
+                delay = self._delay(attempt)
+                attempt += 1
+                self.retries += 1
+                logger.warning(f"Ollama stream to {path} failed ({e}), retry {attempt} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def achat(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        options: Optional[Dict[str, Any]] = None,
+        format: Optional[Union[str, Dict[str, Any]]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        keep_alive: Optional[Union[str, float]] = None
+    ) -> Dict[str, Any]:
+        """Asyncio version of `chat`."""
+        return await self.arequest("/api/chat", {
+            "model": model,
+            "messages": messages,
+            "options": options,
+            "format": format,
+            "tools": tools,
+            "keep_alive": keep_alive,
+        })
+
+    async def agenerate(
+        self,
+        model: str,
+        prompt: str,
+        options: Optional[Dict[str, Any]] = None,
+        format: Optional[Union[str, Dict[str, Any]]] = None,
+        keep_alive: Optional[Union[str, float]] = None
+    ) -> Dict[str, Any]:
+        """Asyncio version of `generate`."""
+        return await self.arequest("/api/generate", {
+            "model": model,
+            "prompt": prompt,
+            "options": options,
+            "format": format,
+            "keep_alive": keep_alive,
+        })
+
+    async def aembed(self, model: str, input: Union[str, List[str]]) -> List[List[float]]:
+        """Asyncio version of `embed`."""
+        return (await self.arequest("/api/embed", {"model": model, "input": input}))["embeddings"]
+
+
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(base_url: Optional[str] = None) -> Any:
+    """
+    Return the process-wide client of a server, creating it on first use.
+
+    Several comma-separated URLs (in `base_url`, or in OLLAMA_HOSTS when no
+    URL is given) return a shared OllamaRouter instead, using the strategy
+    from OLLAMA_ROUTING ("least_outstanding" or "model_affinity").
+
+    Args:
+        base_url: Server URL (default: OLLAMA_HOSTS, OLLAMA_HOST or http://localhost:11434)
+
+    Returns:
+        Shared OllamaClient or OllamaRouter
+    """
+    base_url = base_url or os.environ.get("OLLAMA_HOSTS") or default_base_url()
+    urls = [url.strip().rstrip("/") for url in base_url.split(",") if url.strip()]
+    key = ",".join(urls)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            if len(urls) > 1:
+                from .ollama_router import OllamaRouter
+                client = OllamaRouter(urls, strategy=os.environ.get("OLLAMA_ROUTING", "least_outstanding"))
+            else:
+                client = OllamaClient(key)
+            _clients[key] = client
+        return client
@@ -0,0 +1,426 @@
+"""
+Client-side load balancing over several Ollama servers.
+
+`OllamaRouter` has the same request API as `OllamaClient` and sends each
+request to one of N replicated servers:
+
+- "least_outstanding": the healthy server with the fewest requests in flight
+- "model_affinity": prefer servers that already have the requested model
+  loaded (a model load takes seconds and, beyond OLLAMA_MAX_LOADED_MODELS,
+  evicts another model). Other servers are only used when every server with
+  the model is at its OLLAMA_NUM_PARALLEL limit, and then the one with a free
+  model slot is picked first.
+
+Servers are health checked in the background (GET /api/ps, which also
+reports the loaded models). A server that fails a request or a check, or
+whose check latency exceeds `slow_threshold`, is ejected for `eject_seconds`
+and the request fails over to another server. If every server is ejected,
+all of them are tried again rather than failing outright.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+import httpx
+
+from .ollama_client import (
+    DEFAULT_CONNECT_TIMEOUT,
+    Coalescer,
+    OllamaClient,
+    OllamaError,
+    _clean,
+    default_concurrency,
+    request_key,
+)
+
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("least_outstanding", "model_affinity")
+DEFAULT_MAX_LOADED_MODELS = 3
+DEFAULT_HEALTH_INTERVAL = 10.0
+DEFAULT_SLOW_THRESHOLD = 2.0
+DEFAULT_EJECT_SECONDS = 30.0
+# Weight of the newest sample in the latency moving average
+LATENCY_ALPHA = 0.3
+
+
+def default_max_loaded_models() -> int:
+    """Models a server keeps loaded, from OLLAMA_MAX_LOADED_MODELS (default 3)."""
+    try:
+        return max(1, int(os.environ.get("OLLAMA_MAX_LOADED_MODELS", DEFAULT_MAX_LOADED_MODELS)))
+    except ValueError:
+        return DEFAULT_MAX_LOADED_MODELS
+
+
+class Backend:
+    """One Ollama server as seen by the router."""
+
+    def __init__(self, client: OllamaClient, max_loaded_models: int):
+        self.client = client
+        self.max_loaded_models = max_loaded_models
+        self.outstanding = 0
+        # Loaded models, least recently used first
+        self.models: "OrderedDict[str, None]" = OrderedDict()
+        self.ejected_until = 0.0
+        self.latency: Optional[float] = None  # Health check latency (moving average)
+        self.failures = 0
+
+    @property
+    def base_url(self) -> str:
+        return self.client.base_url
+
+    def available(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def saturated(self) -> bool:
+        return self.outstanding >= self.client.max_concurrency
+
+    def has_model(self, model: str) -> bool:
+        return model in self.models
+
+    def use_model(self, model: str) -> None:
+        """Record that the server has (just) served `model`."""
+        self.models[model] = None
+        self.models.move_to_end(model)
+        while len(self.models) > self.max_loaded_models:
+            self.models.popitem(last=False)
+
+    def __repr__(self) -> str:
+        return (f"Backend({self.base_url}, outstanding={self.outstanding}, "
+                f"models={list(self.models)}, ejected={time.monotonic() < self.ejected_until})")
+
+
+class OllamaRouter:
+    """Routes Ollama requests over several servers (same API as OllamaClient)."""
+
+    def __init__(
+        self,
+        base_urls: Sequence[str],
+        strategy: str = "least_outstanding",
+        max_concurrency: Optional[int] = None,
+        max_loaded_models: Optional[int] = None,
+        health_interval: Optional[float] = DEFAULT_HEALTH_INTERVAL,
+        slow_threshold: float = DEFAULT_SLOW_THRESHOLD,
+        eject_seconds: float = DEFAULT_EJECT_SECONDS,
+        coalesce: bool = True,
+        **client_kwargs: Any
+    ):
+        """
+        Create a router.
+
+        Args:
+            base_urls: Server URLs
+            strategy: "least_outstanding" or "model_affinity"
+            max_concurrency: Requests in flight per server (default: OLLAMA_NUM_PARALLEL or 4)
+            max_loaded_models: Models per server (default: OLLAMA_MAX_LOADED_MODELS or 3)
+            health_interval: Seconds between background health checks, None
+                disables the background thread (call check_health() yourself)
+            slow_threshold: Health check latency in seconds above which a
+                server is ejected
+            eject_seconds: How long an ejected server receives no requests
+            coalesce: Share responses between identical in-flight requests
+            **client_kwargs: Passed to every server's OllamaClient (timeout, max_retries, ...)
+        """
+        if not base_urls:
+            raise ValueError("OllamaRouter needs at least one server URL")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown routing strategy {strategy!r}, expected one of {STRATEGIES}")
+
+        max_concurrency = max_concurrency or default_concurrency()
+        max_loaded_models = max_loaded_models or default_max_loaded_models()
+        # Failover to another server replaces most of the per-server retries
+        client_kwargs.setdefault("max_retries", 1)
+        self.backends = [
+            Backend(
+                OllamaClient(url, max_concurrency=max_concurrency, coalesce=False, **client_kwargs),
+                max_loaded_models
+            )
+            for url in base_urls
+        ]
+        self.strategy = strategy
+        self.slow_threshold = slow_threshold
+        self.eject_seconds = eject_seconds
+        self.coalesce = coalesce
+        self.max_concurrency = max_concurrency * len(self.backends)
+
+        self._lock = threading.Lock()
+        self._coalescer = Coalescer()
+        self._round_robin = 0
+        self._health_client = httpx.Client(timeout=httpx.Timeout(slow_threshold * 2, connect=DEFAULT_CONNECT_TIMEOUT))
+        self._stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+        if health_interval:
+            self._health_thread = threading.Thread(
+                target=self._health_loop, args=(health_interval,), name="ollama-health", daemon=True
+            )
+            self._health_thread.start()
+
+        # Counters
+        self.failovers = 0
+
+    @property
+    def base_url(self) -> str:
+        return ",".join(backend.base_url for backend in self.backends)
+
+    @property
+    def coalesced(self) -> int:
+        return self._coalescer.coalesced
+
+    @property
+    def requests(self) -> int:
+        return sum(backend.client.requests for backend in self.backends)
+
+    @property
+    def retries(self) -> int:
+        return sum(backend.client.retries for backend in self.backends)
+
+    def __enter__(self) -> "OllamaRouter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the health checks and close all connections."""
+        self._stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join(timeout=5)
+        self._health_client.close()
+        for backend in self.backends:
+            backend.client.close()
+
+    # --- health --------------------------------------------------------
+
+    def eject(self, backend: Backend, reason: str) -> None:
+        """Take a server out of rotation for eject_seconds."""
+        with self._lock:
+            backend.ejected_until = time.monotonic() + self.eject_seconds
+            backend.failures += 1
+        logger.warning(f"Ejecting Ollama server {backend.base_url} for {self.eject_seconds:.0f}s: {reason}")
+
+    def check_health(self) -> None:
+        """Probe every server once (GET /api/ps) and update loaded models and ejections."""
+        for backend in self.backends:
+            started = time.monotonic()
+            try:
+                response = self._health_client.get(f"{backend.base_url}/api/ps")
+                response.raise_for_status()
+                loaded = [model["name"] for model in response.json().get("models", [])]
+            except Exception as e:
+                self.eject(backend, f"health check failed ({e})")
+                continue
+            latency = time.monotonic() - started
+            with self._lock:
+                backend.latency = latency if backend.latency is None else (
+                    LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * backend.latency
+                )
+                # The server's own list is authoritative
+                backend.models = OrderedDict((name, None) for name in loaded)
+                slow = backend.latency > self.slow_threshold
+                recovered = not slow and backend.ejected_until > time.monotonic()
+                if recovered:
+                    backend.ejected_until = 0.0
+            if slow:
+                self.eject(backend, f"slow, health check latency {backend.latency:.2f}s")
+            elif recovered:
+                logger.info(f"Ollama server {backend.base_url} is healthy again")
+
+    def _health_loop(self, interval: float) -> None:
+        while True:
+            try:
+                self.check_health()
+            except Exception as e:
+                logger.error(f"Ollama health check error: {e}", exc_info=True)
+            if self._stop.wait(interval):
+                return
+
+    # --- routing -------------------------------------------------------
+
+    def _least_outstanding(self, candidates: List[Backend]) -> Backend:
+        lowest = min(backend.outstanding for backend in candidates)
+        tied = [backend for backend in candidates if backend.outstanding == lowest]
+        # Rotate between equally loaded servers
+        self._round_robin += 1
+        return tied[self._round_robin % len(tied)]
+
+    def _pick(self, model: Optional[str], exclude: List[Backend]) -> Backend:
+        """Choose a server and count the request as outstanding on it (under the lock)."""
+        now = time.monotonic()
+        candidates = [b for b in self.backends if b not in exclude and b.available(now)]
+        if not candidates:
+            # Everything is ejected: better to try than to fail
+            candidates = [b for b in self.backends if b not in exclude] or list(self.backends)
+
+        if self.strategy == "model_affinity" and model:
+            warm = [b for b in candidates if b.has_model(model) and not b.saturated()]
+            if warm:
+                candidates = warm
+            else:
+                free = [b for b in candidates if not b.saturated()] or candidates
+                # Prefer a server that can load the model without evicting another one
+                fewest = min(len(b.models) for b in free)
+                candidates = [b for b in free if len(b.models) == fewest]
+
+        backend = self._least_outstanding(candidates)
+        backend.outstanding += 1
+        return backend
+
+    def _route(self, model: Optional[str], send: Callable[[Backend], Any]) -> Any:
+        tried: List[Backend] = []
+        while True:
+            with self._lock:
+                backend = self._pick(model, tried)
+            tried.append(backend)
+            try:
+                result = send(backend)
+            except Exception as e:
+                if not self._failover(backend, e, len(tried)):
+                    raise
+                continue
+            finally:
+                with self._lock:
+                    backend.outstanding -= 1
+            if model:
+                with self._lock:
+                    backend.use_model(model)
+            return result
+
+    def _failover(self, backend: Backend, error: Exception, attempts: int) -> bool:
+        """Eject a failing server; True if the request should go to another one."""
+        if isinstance(error, OllamaError) and error.status_code is not None and error.status_code < 500 \
+                and error.status_code != 429:
+            # The request itself is wrong, another server would reject it too
+            return False
+        if not isinstance(error, (OllamaError, httpx.HTTPError)):
+            return False
+        self.eject(backend, str(error))
+        if attempts >= len(self.backends):
+            return False
+        with self._lock:
+            self.failovers += 1
+        return True
+
+    # --- blocking API --------------------------------------------------
+
+    def request(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a non-streaming request to one of the servers (see OllamaClient.request)."""
+        payload = _clean({**payload, "stream": False})
+
+        def send() -> Dict[str, Any]:
+            return self._route(payload.get("model"), lambda backend: backend.client.request(path, payload))
+
+        if not self.coalesce:
+            return send()
+        return self._coalescer.run(request_key(path, payload), send)
+
+    def stream(self, path: str, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Stream a request from one of the servers; fails over only before the first part."""
+        model = payload.get("model")
+        tried: List[Backend] = []
+        while True:
+            with self._lock:
+                backend = self._pick(model, tried)
+            tried.append(backend)
+            started = False
+            try:
+                for part in backend.client.stream(path, payload):
+                    started = True
+                    yield part
+            except Exception as e:
+                if started or not self._failover(backend, e, len(tried)):
+                    raise
+                continue
+            finally:
+                with self._lock:
+                    backend.outstanding -= 1
+            if model:
+                with self._lock:
+                    backend.use_model(model)
+            return
+
+    def chat(self, model: str, messages: List[Dict[str, Any]], **kwargs: Any) -> Dict[str, Any]:
+        """Chat completion (/api/chat), see OllamaClient.chat."""
+        return self.request("/api/chat", {"model": model, "messages": messages, **kwargs})
+
+    def generate(self, model: str, prompt: str, **kwargs: Any) -> Dict[str, Any]:
+        """Text completion (/api/generate), see OllamaClient.generate."""
+        return self.request("/api/generate", {"model": model, "prompt": prompt, **kwargs})
+
+    def embed(self, model: str, input: Union[str, List[str]]) -> List[List[float]]:
+        """Embeddings (/api/embed), one vector per input."""
+        return self.request("/api/embed", {"model": model, "input": input})["embeddings"]
+
+    # --- asyncio API ---------------------------------------------------
+
+    async def _aroute(self, model: Optional[str], send: Callable[[Backend], Any]) -> Any:
+        tried: List[Backend] = []
+        while True:
+            with self._lock:
+                backend = self._pick(model, tried)
+            tried.append(backend)
+            try:
+                result = await send(backend)
+            except Exception as e:
+                if not self._failover(backend, e, len(tried)):
+                    raise
+                continue
+            finally:
+                with self._lock:
+                    backend.outstanding -= 1
+            if model:
+                with self._lock:
+                    backend.use_model(model)
+            return result
+
+    async def arequest(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Asyncio version of `request`."""
+        payload = _clean({**payload, "stream": False})
+
+        async def send() -> Dict[str, Any]:
+            return await self._aroute(payload.get("model"), lambda backend: backend.client.arequest(path, payload))
+
+        if not self.coalesce:
+            return await send()
+        return await self._coalescer.arun(request_key(path, payload), send)
+
+    async def astream(self, path: str, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Asyncio version of `stream`."""
+        model = payload.get("model")
+        tried: List[Backend] = []
+        while True:
+            with self._lock:
+                backend = self._pick(model, tried)
+            tried.append(backend)
+            started = False
+            try:
+                async for part in backend.client.astream(path, payload):
+                    started = True
+                    yield part
+            except Exception as e:
+                if started or not self._failover(backend, e, len(tried)):
+                    raise
+                continue
+            finally:
+                with self._lock:
+                    backend.outstanding -= 1
+            if model:
+                with self._lock:
+                    backend.use_model(model)
+            return
+
+    async def achat(self, model: str, messages: List[Dict[str, Any]], **kwargs: Any) -> Dict[str, Any]:
+        """Asyncio version of `chat`."""
+        return await self.arequest("/api/chat", {"model": model, "messages": messages, **kwargs})
+
+    async def agenerate(self, model: str, prompt: str, **kwargs: Any) -> Dict[str, Any]:
+        """Asyncio version of `generate`."""
+        return await self.arequest("/api/generate", {"model": model, "prompt": prompt, **kwargs})
+
+    async def aembed(self, model: str, input: Union[str, List[str]]) -> List[List[float]]:
+        """Asyncio version of `embed`."""
+        return (await self.arequest("/api/embed", {"model": model, "input": input}))["embeddings"]
@@ -0,0 +1,328 @@
+"""
+Size-bounded capture of command output for tool results.
+
+Shell and kubectl tools used to return the complete output of a command to
+the model, so one `find /` or `kubectl get pods -A` put megabytes into the
+next prompt. `OutputCapture` takes the output as it is produced and keeps
+
+- the first `head_bytes` and, in a ring buffer, the last `tail_bytes`, so
+  memory stays bounded however much a command prints;
+- optionally the complete output in a spool file (only once the output is
+  larger than what is kept, at most `MAX_SPOOL_BYTES`).
+
+`CapturedOutput.to_text()` is head + elision marker + tail, cut at line
+boundaries where possible. When the output was spooled, the marker names its
+id and the offset of the omitted part, and `read_spooled(output_id, offset,
+length)` (exposed by the apps as a "read more" tool) returns other parts of it.
+
+Sizes default to `TOOL_OUTPUT_TOKEN_BUDGET` tokens (default 2000, about 4
+bytes per token), three quarters head and one quarter tail.
+"""
+
+import atexit
+import os
+import secrets
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Union
+
+
+TOKEN_BUDGET = int(os.environ.get("TOOL_OUTPUT_TOKEN_BUDGET", "2000"))
+BYTES_PER_TOKEN = 4
+DEFAULT_MAX_BYTES = TOKEN_BUDGET * BYTES_PER_TOKEN
+MAX_SPOOL_BYTES = 64 * 1024 * 1024  # Per output, the rest is dropped
+MAX_SPOOLED = 32  # Spool files kept, the oldest are deleted
+DEFAULT_READ_BYTES = DEFAULT_MAX_BYTES
+
+
+class SpoolStore:
+    """Spool files of captured outputs in a private temp directory, deleted at exit."""
+
+    def __init__(self, max_files: int = MAX_SPOOLED):
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._directory: Optional[str] = None
+        self._files: "OrderedDict[str, str]" = OrderedDict()
+
+    def create(self):
+        """New spool file: (output id, open binary file)."""
+        with self._lock:
+            if self._directory is None:
+                self._directory = tempfile.mkdtemp(prefix="tool-output-")
+                atexit.register(self.clear)
+            output_id = secrets.token_hex(4)
+            path = os.path.join(self._directory, output_id)
+            self._files[output_id] = path
+            while len(self._files) > self.max_files:
+                _, old_path = self._files.popitem(last=False)
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+        return output_id, open(path, "wb")
+
+    def path(self, output_id: str) -> Optional[str]:
+        with self._lock:
+            return self._files.get(output_id)
+
+    def clear(self) -> None:
+        """Delete all spool files."""
+        with self._lock:
+            directory, self._directory = self._directory, None
+            self._files.clear()
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+spool_store = SpoolStore()
+
+
+@dataclass
+class CapturedOutput:
+    """Kept part of an output."""
+    head: bytes
+    tail: bytes
+    total_bytes: int
+    output_id: Optional[str] = None  # Set when the complete output was spooled
+    spooled_bytes: int = 0
+
+    @property
+    def omitted_bytes(self) -> int:
+        return self.total_bytes - len(self.head) - len(self.tail)
+
+    @property
+    def complete(self) -> bool:
+        return self.omitted_bytes == 0
+
+    def to_text(self) -> str:
+        """Head, elision marker and tail as text for the model."""
+        if self.complete:
+            return (self.head + self.tail).decode("utf-8", errors="replace")
+        head, tail = self.head, self.tail
+        # Cut at line boundaries if that doesn't lose too much
+        newline = head.rfind(b"\n")
+        if newline >= len(head) // 2:
+            head = head[:newline + 1]
+        newline = tail.find(b"\n")
+        if 0 <= newline < len(tail) // 2:
+            tail = tail[newline + 1:]
+        start = len(head)
+        omitted = self.total_bytes - len(head) - len(tail)
+        marker = f"... [{omitted} bytes omitted (bytes {start}-{start + omitted} of {self.total_bytes})"
+        if self.output_id is not None:
+            marker += f", read them with read_output(output_id=\"{self.output_id}\", offset={start})"
+            if self.spooled_bytes < self.total_bytes:
+                marker += f", only the first {self.spooled_bytes} bytes were saved"
+        marker += "] ..."
+        text = head.decode("utf-8", errors="replace")
+        if text and not text.endswith("\n"):
+            text += "\n"
+        return text + marker + "\n" + tail.decode("utf-8", errors="replace")
+
+
+class OutputCapture:
+    """Takes output chunks as they are produced, keeps head, tail and (optionally) a spool file."""
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        spool: bool = True,
+        max_spool_bytes: int = MAX_SPOOL_BYTES,
+        store: SpoolStore = spool_store
+    ):
+        """
+        Args:
+            max_bytes: Bytes kept for the model, 3/4 head and 1/4 tail
+            spool: Save the complete output when it is larger than max_bytes
+            max_spool_bytes: Size limit of the spool file
+            store: Where spool files are kept
+        """
+        self.head_bytes = max_bytes * 3 // 4
+        self.tail_bytes = max_bytes - self.head_bytes
+        self.spool = spool
+        self.max_spool_bytes = max_spool_bytes
+        self.store = store
+
+        self._head = bytearray()
+        # Ring buffer of the last tail_bytes after the head
+        self._ring = bytearray(self.tail_bytes)
+        self._ring_start = 0
+        self._ring_length = 0
+        self.total_bytes = 0
+
+        self._spool_file = None
+        self.output_id: Optional[str] = None
+        self.spooled_bytes = 0
+
+        # write() may run in a reader thread that outlives close()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _ring_write(self, data: bytes) -> None:
+        size = self.tail_bytes
+        if not size:
+            return
+        if len(data) >= size:
+            self._ring[:] = data[-size:]
+            self._ring_start, self._ring_length = 0, size
+            return
+        end = (self._ring_start + self._ring_length) % size
+        first = min(len(data), size - end)
+        self._ring[end:end + first] = data[:first]
+        self._ring[:len(data) - first] = data[first:]
+        overflow = max(self._ring_length + len(data) - size, 0)
+        self._ring_start = (self._ring_start + overflow) % size
+        self._ring_length = min(self._ring_length + len(data), size)
+
+    def _ring_bytes(self) -> bytes:
+        end = self._ring_start + self._ring_length
+        if end <= self.tail_bytes:
+            return bytes(self._ring[self._ring_start:end])
+        return bytes(self._ring[self._ring_start:]) + bytes(self._ring[:end - self.tail_bytes])
+
+    def _spool_write(self, data: bytes) -> None:
+        room = self.max_spool_bytes - self.spooled_bytes
+        if room <= 0:
+            return
+        self._spool_file.write(data[:room])
+        self.spooled_bytes += min(len(data), room)
+
+    def write(self, data: Union[bytes, str]) -> None:
+        """Add an output chunk (ignored once the capture is closed)."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if not data:
+            return
+        with self._lock:
+            if not self._closed:
+                self._write(data)
+
+    def _write(self, data: bytes) -> None:
+        if self._spool_file is not None:
+            self._spool_write(data)
+        elif self.spool and self.total_bytes + len(data) > self.head_bytes + self.tail_bytes:
+            # The output doesn't fit anymore: from now on keep all of it on disk
+            self.output_id, self._spool_file = self.store.create()
+            self._spool_write(bytes(self._head) + self._ring_bytes())
+            self._spool_write(data)
+        self.total_bytes += len(data)
+
+        room = self.head_bytes - len(self._head)
+        if room > 0:
+            self._head.extend(data[:room])
+            data = data[room:]
+        if data:
+            self._ring_write(data)
+
+    def close(self) -> CapturedOutput:
+        """Finish the capture, later writes are dropped."""
+        with self._lock:
+            self._closed = True
+            if self._spool_file is not None:
+                self._spool_file.close()
+                self._spool_file = None
+            return CapturedOutput(
+                head=bytes(self._head),
+                tail=self._ring_bytes(),
+                total_bytes=self.total_bytes,
+                output_id=self.output_id,
+                spooled_bytes=self.spooled_bytes
+            )
+
+
+def capture_text(text: Union[str, bytes], max_bytes: int = DEFAULT_MAX_BYTES, spool: bool = True) -> CapturedOutput:
+    """Capture an output that is already complete (e.g. the answer of an API call)."""
+    capture = OutputCapture(max_bytes=max_bytes, spool=spool)
+    capture.write(text)
+    return capture.close()
+
+
+def read_spooled(output_id: str, offset: int = 0, length: int = DEFAULT_READ_BYTES) -> str:
+    """
+    Part of a spooled output, for the "read more" tools.
+
+    Args:
+        output_id: Id from the elision marker
+        offset: Byte offset to start at
+        length: Bytes to read (at most DEFAULT_READ_BYTES)
+
+    Returns:
+        The bytes as text plus a line with the range and the next offset
+    """
+    path = spool_store.path(output_id)
+    if path is None or not os.path.exists(path):
+        return f"Error: no saved output with id {output_id}"
+    length = max(1, min(length, DEFAULT_READ_BYTES))
+    size = os.path.getsize(path)
+    offset = max(0, min(offset, size))
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(length)
+    end = offset + len(data)
+    footer = f"[bytes {offset}-{end} of {size}"
+    footer += f", next: read_output(output_id=\"{output_id}\", offset={end})]" if end < size else ", end of output]"
+    text = data.decode("utf-8", errors="replace")
+    return text + ("" if text.endswith("\n") or not text else "\n") + footer
+
+
+@dataclass
+class ProcessResult:
+    """Result of run_captured."""
+    exit_code: Optional[int]  # None after a timeout
+    stdout: CapturedOutput
+    stderr: CapturedOutput
+    timed_out: bool
+    duration: float
+
+
+def run_captured(
+    command: List[str],
+    timeout: float,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    spool: bool = True
+) -> ProcessResult:
+    """
+    Run a process and capture stdout/stderr while it runs (instead of
+    `subprocess.run(capture_output=True)`, which keeps all of it in memory).
+
+    Raises:
+        OSError: If the program can't be started
+    """
+    started = time.monotonic()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.DEVNULL)
+    stdout = OutputCapture(max_bytes=max_bytes, spool=spool)
+    stderr = OutputCapture(max_bytes=max_bytes // 4, spool=False)
+
+    def pump(stream, capture: OutputCapture) -> None:
+        for chunk in iter(lambda: stream.read1(65536), b""):
+            capture.write(chunk)
+
+    readers = [
+        threading.Thread(target=pump, args=(process.stdout, stdout), daemon=True),
+        threading.Thread(target=pump, args=(process.stderr, stderr), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+    timed_out = False
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        process.kill()
+        process.wait()
+    for reader in readers:
+        # Grandchildren may keep the pipes open, don't wait for them: a reader
+        # still running after this is cut off by close() (its writes are dropped)
+        reader.join(timeout=1.0)
+    return ProcessResult(
+        exit_code=None if timed_out else process.returncode,
+        stdout=stdout.close(),
+        stderr=stderr.close(),
+        timed_out=timed_out,
+        duration=time.monotonic() - started
+    )
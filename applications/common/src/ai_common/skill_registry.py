@@ -0,0 +1,323 @@
+"""
+Indexed, hot-reloading registry of markdown skills.
+
+A skill is a folder with a markdown file named like the folder (or
+`SKILL.md`) that starts with YAML frontmatter (Anthropic format):
+
+    skills/
+      kubectl_skill/
+        kubectl_skill.md        ---\\nname: kubectl-skill\\ndescription: ...\\n---\\n<body>
+        scripts/check.sh        resources, any depth
+      diagnostics/              plain folders group skills, any depth
+        pod_skill/pod_skill.md
+
+- only the frontmatter is read when a skill is discovered; the body is read
+  on first access of `skill["content"]` and memoized
+- lookup by name is a dict access
+- hot reload: `refresh()` re-stats the skill files and re-parses only the
+  added or modified ones. With `poll_interval` every access refreshes at most
+  once per interval; `watch()` polls in a background thread instead. Skills
+  whose file changed get a new entry, so memoized bodies never go stale.
+
+Entries are read-only mappings with the keys `name`, `description` and
+`content`, so code written for the old list of skill dicts keeps working.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DESCRIPTION = "A skill to help with specific tasks"
+DEFAULT_POLL_INTERVAL = 2.0
+SKILL_FILE = "SKILL.md"
+# Human documentation next to a skill, not offered as a resource
+IGNORED_RESOURCES = {"README.md"}
+
+# (mtime_ns, size) of a skill file
+_Signature = Tuple[int, int]
+
+
+def parse_frontmatter(path: Path) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Read name and description from a skill file's frontmatter without reading the body.
+
+    Args:
+        path: Skill markdown file
+
+    Returns:
+        (name, description), None for missing fields or without frontmatter
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if f.readline().strip() != "---":
+            return None, None
+        lines = []
+        for line in f:
+            if line.strip() == "---":
+                break
+            lines.append(line)
+        else:
+            return None, None
+    frontmatter = "".join(lines)
+    name = re.search(r'^name:\s*(.+)$', frontmatter, re.MULTILINE)
+    description = re.search(r'^description:\s*(.+)$', frontmatter, re.MULTILINE)
+    return (name.group(1).strip() if name else None,
+            description.group(1).strip() if description else None)
+
+
+def read_body(path: Path) -> str:
+    """Skill file content after the frontmatter (the whole file without frontmatter)."""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    match = re.match(r'^---\s*\n.*?\n---\s*\n(.*)$', content, re.DOTALL)
+    return match.group(1) if match else content
+
+
+class SkillEntry(Mapping):
+    """One skill: frontmatter fields plus the lazily loaded body."""
+
+    def __init__(self, name: str, description: str, path: Path, signature: _Signature):
+        self.name = name
+        self.description = description
+        self.path = path
+        self.folder = path.parent
+        self.signature = signature
+        self._content: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def content(self) -> str:
+        """Skill body, read on first access."""
+        if self._content is None:
+            with self._lock:
+                if self._content is None:
+                    self._content = read_body(self.path)
+        return self._content
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the body has been read."""
+        return self._content is not None
+
+    def resources(self) -> List[str]:
+        """Other files of the skill folder, as paths relative to it."""
+        resources = []
+        for root, dirs, files in os.walk(self.folder):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for file_name in sorted(files):
+                path = Path(root) / file_name
+                if path == self.path or file_name in IGNORED_RESOURCES or file_name.startswith("."):
+                    continue
+                resources.append(path.relative_to(self.folder).as_posix())
+        return resources
+
+    def read_resource(self, relative_path: str) -> str:
+        """
+        Read a file of the skill folder.
+
+        Args:
+            relative_path: Path relative to the skill folder, as listed by resources()
+
+        Raises:
+            ValueError: If the path points outside the skill folder
+        """
+        folder = self.folder.resolve()
+        path = (folder / relative_path).resolve()
+        if not path.is_relative_to(folder):
+            raise ValueError(f"{relative_path} is outside of skill {self.name}")
+        return path.read_text(encoding="utf-8")
+
+    # --- Mapping (compatibility with the old skill dicts) --------------
+
+    _KEYS = ("name", "description", "content")
+
+    def __getitem__(self, key: str):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    def __repr__(self) -> str:
+        return f"SkillEntry(name={self.name!r}, path={str(self.path)!r})"
+
+
+class SkillRegistry:
+    """Thread-safe name -> skill index over a skills directory."""
+
+    def __init__(self, skills_dir: Union[str, Path], poll_interval: Optional[float] = DEFAULT_POLL_INTERVAL):
+        """
+        Discover the skills (frontmatter only).
+
+        Args:
+            skills_dir: Directory containing the skill folders
+            poll_interval: Check for changed skill files on access at most this
+                often, in seconds (None: only on refresh() or with watch())
+        """
+        self.skills_dir = Path(skills_dir)
+        self.poll_interval = poll_interval
+        self.version = 0  # Incremented on every change of the skill set
+
+        self._lock = threading.RLock()
+        self._by_name: Dict[str, SkillEntry] = {}
+        self._by_path: Dict[Path, SkillEntry] = {}
+        self._last_scan = 0.0
+        self._listeners: List[Callable[["SkillRegistry"], None]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.refresh()
+
+    # --- discovery -----------------------------------------------------
+
+    def _skill_files(self) -> Iterator[Path]:
+        """Skill markdown files; folders below a skill folder are its resources."""
+        if not self.skills_dir.is_dir():
+            return
+        pending = [self.skills_dir]
+        while pending:
+            directory = pending.pop()
+            try:
+                children = sorted(
+                    (entry for entry in os.scandir(directory) if entry.is_dir() and not entry.name.startswith(".")),
+                    key=lambda entry: entry.name
+                )
+            except OSError as e:
+                logger.warning(f"Could not list {directory}: {e}")
+                continue
+            for child in children:
+                folder = Path(child.path)
+                for file_name in (f"{child.name}.md", SKILL_FILE):
+                    if (folder / file_name).is_file():
+                        yield folder / file_name
+                        break
+                else:
+                    pending.append(folder)
+
+    def _parse(self, path: Path, signature: _Signature) -> Optional[SkillEntry]:
+        try:
+            name, description = parse_frontmatter(path)
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Could not read skill {path}: {e}")
+            return None
+        return SkillEntry(name or path.parent.name, description or DEFAULT_DESCRIPTION, path, signature)
+
+    def refresh(self) -> bool:
+        """
+        Pick up added, modified and removed skill files.
+
+        Returns:
+            True if the skill set changed
+        """
+        with self._lock:
+            self._last_scan = time.monotonic()
+            by_path: Dict[Path, SkillEntry] = {}
+            changed = False
+            for path in self._skill_files():
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                signature = (stat.st_mtime_ns, stat.st_size)
+                entry = self._by_path.get(path)
+                if entry is None or entry.signature != signature:
+                    entry = self._parse(path, signature)
+                    changed = True
+                    if entry is None:
+                        continue
+                by_path[path] = entry
+            changed = changed or by_path.keys() != self._by_path.keys()
+            if not changed:
+                return False
+
+            by_name: Dict[str, SkillEntry] = {}
+            for entry in by_path.values():
+                if entry.name in by_name:
+                    logger.warning(f"Duplicate skill name {entry.name}: {entry.path} hides {by_name[entry.name].path}")
+                by_name[entry.name] = entry
+            self._by_path = by_path
+            self._by_name = by_name
+            self.version += 1
+            listeners = list(self._listeners)
+        logger.info(f"Skill registry {self.skills_dir}: {len(by_name)} skills (version {self.version})")
+        for listener in listeners:
+            try:
+                listener(self)
+            except Exception as e:
+                logger.error(f"Skill registry listener failed: {e}", exc_info=True)
+        return True
+
+    def _maybe_refresh(self) -> None:
+        if self.poll_interval is not None and time.monotonic() - self._last_scan >= self.poll_interval:
+            self.refresh()
+
+    def on_change(self, listener: Callable[["SkillRegistry"], None]) -> None:
+        """Call `listener(registry)` after every change of the skill set."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def watch(self, interval: float = DEFAULT_POLL_INTERVAL) -> "SkillRegistry":
+        """Poll the skills directory in a background thread (daemon) every `interval` seconds."""
+        if self._watcher is None:
+            def run():
+                while not self._stop.wait(interval):
+                    try:
+                        self.refresh()
+                    except Exception as e:
+                        logger.error(f"Skill registry refresh failed: {e}", exc_info=True)
+
+            self._stop.clear()
+            self._watcher = threading.Thread(target=run, name="skill-registry-watcher", daemon=True)
+            self._watcher.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the background watcher."""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    # --- lookup --------------------------------------------------------
+
+    def get(self, name: str) -> Optional[SkillEntry]:
+        """Skill by name, None if there is no such skill."""
+        self._maybe_refresh()
+        return self._by_name.get(name)
+
+    def __getitem__(self, name: str) -> SkillEntry:
+        skill = self.get(name)
+        if skill is None:
+            raise KeyError(name)
+        return skill
+
+    def __contains__(self, name: object) -> bool:
+        return self.get(name) is not None
+
+    def names(self) -> List[str]:
+        """Skill names, sorted."""
+        self._maybe_refresh()
+        return sorted(self._by_name)
+
+    def __iter__(self) -> Iterator[SkillEntry]:
+        """Skills sorted by name (a snapshot, safe while the registry reloads)."""
+        self._maybe_refresh()
+        by_name = self._by_name
+        return iter([by_name[name] for name in sorted(by_name)])
+
+    def __len__(self) -> int:
+        self._maybe_refresh()
+        return len(self._by_name)
+
+    def __repr__(self) -> str:
+        return f"SkillRegistry({str(self.skills_dir)!r}, {len(self._by_name)} skills)"
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Run against the source tree, also without `uv sync`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,189 @@
+"""OllamaRouter against local stub Ollama servers (http.server)."""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ai_common.ollama_router import OllamaRouter
+
+
+class StubOllama:
+    """Answers /api/chat and /api/ps like an Ollama server; delays and failures are set per test."""
+
+    def __init__(self, name, models=()):
+        self.name = name
+        self.models = list(models)  # Reported by /api/ps
+        self.chat_delay = 0.0
+        self.ps_delay = 0.0
+        self.failing = False
+        self.chats = []  # Model of every /api/chat request
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                time.sleep(stub.ps_delay)
+                if stub.failing:
+                    return self.reply(500, {"error": "down"})
+                self.reply(200, {"models": [{"name": model} for model in stub.models]})
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if stub.failing:
+                    return self.reply(500, {"error": "down"})
+                with stub._lock:
+                    stub.chats.append(payload["model"])
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                time.sleep(stub.chat_delay)
+                with stub._lock:
+                    stub.in_flight -= 1
+                    if payload["model"] not in stub.models:
+                        stub.models.append(payload["model"])
+                self.reply(200, {"model": payload["model"], "done": True,
+                                 "message": {"role": "assistant", "content": stub.name}})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stubs():
+    servers = [StubOllama("a"), StubOllama("b"), StubOllama("c")]
+    yield servers
+    for server in servers:
+        server.close()
+
+
+def make_router(stubs, **kwargs):
+    kwargs.setdefault("max_concurrency", 4)
+    return OllamaRouter(
+        [stub.url for stub in stubs],
+        health_interval=None,  # Health checks are run by the tests
+        max_retries=0,
+        coalesce=False,
+        **kwargs
+    )
+
+
+def chat(router, model, text="hi"):
+    return router.chat(model, [{"role": "user", "content": text}])["message"]["content"]
+
+
+def test_least_outstanding_spreads_concurrent_requests(stubs):
+    for stub in stubs:
+        stub.chat_delay = 0.3
+    with make_router(stubs) as router:
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            answers = list(pool.map(lambda i: chat(router, "llama3.1:8b", f"question {i}"), range(6)))
+    assert sorted(answers) == ["a", "a", "b", "b", "c", "c"]
+    assert all(stub.max_in_flight == 2 for stub in stubs)
+
+
+def test_least_outstanding_rotates_sequential_requests(stubs):
+    with make_router(stubs) as router:
+        answers = [chat(router, "llama3.1:8b", f"question {i}") for i in range(6)]
+    assert sorted(answers) == ["a", "a", "b", "b", "c", "c"]
+
+
+def test_model_affinity_prefers_loaded_models(stubs):
+    a, b, c = stubs
+    a.models = ["llama3.1:8b"]
+    b.models = ["gemma3:4b"]
+    c.models = ["qwen3:8b", "mistral:7b"]
+    with make_router(stubs, strategy="model_affinity") as router:
+        router.check_health()
+        assert {chat(router, "llama3.1:8b", f"q{i}") for i in range(4)} == {"a"}
+        assert {chat(router, "gemma3:4b", f"q{i}") for i in range(4)} == {"b"}
+        # A model no server has goes to the server with the fewest loaded models
+        assert chat(router, "phi4:14b") in ("a", "b")
+
+
+def test_model_affinity_spills_over_when_saturated(stubs):
+    a, b, c = stubs
+    a.models = ["llama3.1:8b"]
+    b.models = ["gemma3:4b", "qwen3:8b"]
+    c.models = []
+    a.chat_delay = 0.5
+    with make_router(stubs, strategy="model_affinity", max_concurrency=1) as router:
+        router.check_health()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            first = pool.submit(chat, router, "llama3.1:8b", "first")
+            time.sleep(0.1)
+            second = pool.submit(chat, router, "llama3.1:8b", "second")
+            # a is at its limit: the server with a free model slot (c) takes the request
+            assert second.result() == "c"
+            assert first.result() == "a"
+        assert router.backends[2].has_model("llama3.1:8b")
+
+
+def test_failing_server_is_ejected_and_readmitted(stubs):
+    a, b, c = stubs
+    b.failing = True
+    with make_router(stubs, eject_seconds=60) as router:
+        answers = [chat(router, "llama3.1:8b", f"q{i}") for i in range(6)]
+        assert "b" not in answers
+        assert router.failovers == 1
+        assert not router.backends[1].available(time.monotonic())
+        assert b.chats == []
+
+        # Still down: the health check keeps it out
+        router.check_health()
+        assert not router.backends[1].available(time.monotonic())
+
+        b.failing = False
+        router.check_health()
+        assert router.backends[1].available(time.monotonic())
+        answers = [chat(router, "llama3.1:8b", f"again {i}") for i in range(6)]
+        assert answers.count("b") == 2
+
+
+def test_slow_server_is_ejected_and_readmitted(stubs):
+    a, b, c = stubs
+    c.ps_delay = 0.3
+    with make_router(stubs, slow_threshold=0.15, eject_seconds=60) as router:
+        router.check_health()
+        assert not router.backends[2].available(time.monotonic())
+        assert {chat(router, "llama3.1:8b", f"q{i}") for i in range(6)} == {"a", "b"}
+
+        # The latency average has to come down below the threshold again
+        c.ps_delay = 0.0
+        for _ in range(10):
+            router.check_health()
+            if router.backends[2].available(time.monotonic()):
+                break
+        assert router.backends[2].available(time.monotonic())
+        assert "c" in {chat(router, "llama3.1:8b", f"again {i}") for i in range(6)}
+
+
+def test_all_servers_ejected_still_tries(stubs):
+    with make_router(stubs, eject_seconds=60) as router:
+        for backend in router.backends:
+            router.eject(backend, "test")
+        assert chat(router, "llama3.1:8b") in ("a", "b", "c")